@@ -1,12 +1,27 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routes import data_routes, suggestion_engine
-from database import engine
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from starlette.routing import Match
+from routes import data_routes, suggestion_engine, system_routes
+from database import engine, SessionLocal, add_missing_columns
 import models
+from services.dataset_files import backfill_content_hashes
+from utils.http_cache import NotModified
+from utils.metrics import current_route, http_request_duration, http_requests, metrics_registry
+from utils.request_profiler import PROFILE_HEADER, end_request_profile, profiling_authorized, start_request_profile
+from utils.worker_pools import PoolSaturatedError, shutdown_pools
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
 
+# create_all skips columns and indexes of tables that already exist, so add new ones explicitly
+add_missing_columns(models.Dataset.__table__)
+add_missing_columns(models.DatasetProfile.__table__)
+for table in (models.Dataset.__table__, models.DataRecord.__table__):
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
 app = FastAPI(
     title="Data Visualization Dashboard API",
     description="Backend API for data visualization dashboard with upload and suggestion capabilities",
@@ -22,9 +37,73 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _route_template(request: Request) -> str:
+    """Find the template of the route a request is dispatched to, as the router does"""
+    partial = None
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or "unmatched"
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request and count it by route template and status"""
+    start = time.perf_counter()
+    # Label by route template rather than raw path, so dataset ids don't explode the series count.
+    # The route is resolved up front so the stage spans of the request, including those in pool threads, carry it too
+    route = _route_template(request)
+    token = current_route.set(route)
+    try:
+        response = await call_next(request)
+    finally:
+        current_route.reset(token)
+    http_request_duration.observe(time.perf_counter() - start, method=request.method, route=route)
+    http_requests.inc(method=request.method, route=route, status=str(response.status_code))
+    return response
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """Profile the worker pool tasks of requests that carry the admin profiling token"""
+    # Profile lookups send the token too, but profiling them would only add noise
+    if request.url.path.startswith("/api/system/profiles/") or not profiling_authorized(request.headers.get(PROFILE_HEADER)):
+        return await call_next(request)
+
+    profile, token = start_request_profile(f"{request.method} {request.url.path}")
+    try:
+        response = await call_next(request)
+    finally:
+        end_request_profile(profile, token)
+    response.headers["X-Profile-Id"] = profile.profile_id
+    return response
+
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    """Tell clients to back off when a worker pool queue is full"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(NotModified)
+async def not_modified_handler(request: Request, exc: NotModified):
+    """Send 304 with the current validators when the client's copy is up to date"""
+    return Response(status_code=304, headers=exc.headers)
+
+@app.on_event("startup")
+def hash_existing_uploads():
+    """Content-hash datasets stored before uploads were deduplicated"""
+    with SessionLocal() as db:
+        backfill_content_hashes(db)
+
+@app.on_event("shutdown")
+def shutdown_worker_pools():
+    """Stop worker threads and processes on shutdown"""
+    shutdown_pools()
+
 # Include routers
 app.include_router(data_routes.router, prefix="/api/data", tags=["data"])
 app.include_router(suggestion_engine.router, prefix="/api/suggestions", tags=["suggestions"])
+app.include_router(system_routes.router, prefix="/api/system", tags=["system"])
 
 @app.get("/")
 async def root():
@@ -36,10 +115,23 @@ async def root():
             "/api/data/upload": "POST - Upload data files",
             "/api/data/summary": "GET - Get data summary",
             "/api/data/data": "GET - Get processed data",
-            "/api/suggestions/suggestions": "GET - Get chart suggestions"
+            "/api/data/aggregate": "POST - Get grouped aggregates for charts",
+            "/api/data/downsample": "GET - Get downsampled line and scatter series",
+            "/api/data/resample": "GET - Get numeric series bucketed by time period",
+            "/api/data/export": "GET - Stream a whole dataset as NDJSON or CSV",
+            "/api/suggestions/suggestions": "GET - Get chart suggestions",
+            "/api/system/cache": "GET - Get DataFrame and result cache statistics",
+            "/api/system/pools": "GET - Get worker pool utilization",
+            "/api/system/profiles/{profile_id}": "GET - Get the top functions of a profiled request",
+            "/metrics": "GET - Get request and stage timings in Prometheus text format"
         }
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose request, stage and ingestion timings for Prometheus scraping"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -0,0 +1,113 @@
+"""
+Benchmark DataRecord ingestion: legacy per-row ORM path vs bulk path
+
+Run from the backend directory:
+    python benchmarks/bench_record_insert.py --sizes 1000 100000 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Base  # noqa: E402
+from models import Dataset, DataRecord  # noqa: E402
+from services import data_processing  # noqa: E402
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build a mixed-type frame with roughly 5% missing values per column"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "id": np.arange(rows),
+        "category": rng.choice(["Yes", "No", "Maybe"], rows).astype(object),
+        "amount": rng.normal(100, 25, rows).round(2),
+        "count": rng.integers(0, 1000, rows),
+        "label": rng.choice([f"label_{i}" for i in range(50)], rows).astype(object),
+    })
+    for col in ["category", "amount", "label"]:
+        df.loc[rng.random(rows) < 0.05, col] = np.nan
+    return df
+
+
+def legacy_store(db, dataset_id: int, df: pd.DataFrame) -> None:
+    """The original per-row loop: iterrows, pd.isna per cell, one ORM object per row"""
+    for _, row in df.iterrows():
+        record_data = row.to_dict()
+        for key, value in record_data.items():
+            if pd.isna(value):
+                record_data[key] = None
+        db.add(DataRecord(dataset_id=dataset_id, json_data=json.dumps(record_data, default=str)))
+    db.commit()
+
+
+def bulk_store(db, df: pd.DataFrame) -> None:
+    """The current bulk path in store_dataset_in_db"""
+    success, message, _ = data_processing.store_dataset_in_db(
+        db, {"filename": "bench.csv", "file_path": "bench.csv"}, df=df
+    )
+    if not success:
+        raise RuntimeError(message)
+
+
+def fresh_session(db_path: str):
+    """Create an empty SQLite database file and return a session on it"""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(bind=engine)()
+
+
+def run(sizes, skip_legacy_above: int, db_path: str) -> None:
+    # Store every row of the frame so both paths insert the same amount of data
+    data_processing.STORED_RECORDS_LIMIT = 0
+
+    print(f"{'rows':>10} {'legacy_s':>10} {'bulk_s':>10} {'speedup':>8}")
+    for rows in sizes:
+        df = make_frame(rows)
+
+        legacy_s = None
+        if rows <= skip_legacy_above:
+            engine, db = fresh_session(db_path)
+            dataset = Dataset(filename="bench.csv", file_path="bench.csv")
+            db.add(dataset)
+            db.commit()
+            start = time.perf_counter()
+            legacy_store(db, dataset.id, df)
+            legacy_s = time.perf_counter() - start
+            db.close()
+            engine.dispose()
+
+        engine, db = fresh_session(db_path)
+        start = time.perf_counter()
+        bulk_store(db, df)
+        bulk_s = time.perf_counter() - start
+        stored = db.query(DataRecord).count()
+        db.close()
+        engine.dispose()
+        assert stored == rows, f"expected {rows} records, found {stored}"
+
+        legacy_text = f"{legacy_s:10.3f}" if legacy_s is not None else f"{'skipped':>10}"
+        speedup = f"{legacy_s / bulk_s:7.1f}x" if legacy_s is not None else f"{'-':>8}"
+        print(f"{rows:>10} {legacy_text} {bulk_s:10.3f} {speedup}")
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--skip-legacy-above", type=int, default=10_000_000,
+                        help="Skip the slow legacy path for sizes above this row count")
+    parser.add_argument("--db-path", default="bench_records.db")
+    args = parser.parse_args()
+    run(args.sizes, args.skip_legacy_above, args.db_path)
@@ -0,0 +1,99 @@
+"""
+Benchmark ranked chart suggestions across column counts
+
+Profiles are synthesized directly, so the numbers cover scoring and
+ranking only, not profiling. Run from the backend directory:
+    python benchmarks/bench_suggestions.py --columns 10 100 1000 10000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.chart_ranking import rank_chart_candidates  # noqa: E402
+from services.correlation import PROFILE_CORRELATION_PAIRS  # noqa: E402
+from services.suggestion_engine import generate_chart_suggestions  # noqa: E402
+
+
+def make_profile(columns: int, rows: int = 100_000, seed: int = 0):
+    """
+    Build column analysis, summary statistics and correlations for a mixed table
+
+    Roughly half the columns are continuous, a third categorical, a few
+    datetime-like and the rest low-cardinality numeric.
+    """
+    rng = np.random.default_rng(seed)
+    kinds = rng.choice(["continuous", "categorical", "datetime", "discrete"], columns, p=[0.5, 0.33, 0.02, 0.15])
+    column_analysis, column_info = {}, {}
+    for i, kind in enumerate(kinds):
+        name = f"{kind}_{i}"
+        nulls = int(rng.integers(0, rows // 10))
+        is_numeric = kind in ("continuous", "discrete")
+        unique = {
+            "continuous": int(rng.integers(1_000, rows)),
+            "categorical": int(rng.integers(2, 40)),
+            "datetime": int(rng.integers(100, rows)),
+            "discrete": int(rng.integers(2, 20)),
+        }[kind]
+        info = {
+            "name": name,
+            "dtype": "float64" if is_numeric else "object",
+            "unique_count": unique,
+            "null_count": nulls,
+            "total_count": rows,
+            "is_numeric": is_numeric,
+            "is_categorical": kind in ("categorical", "discrete"),
+            "is_datetime": kind == "datetime",
+            "is_continuous": kind == "continuous",
+        }
+        if is_numeric:
+            mean, std = float(rng.normal(100, 50)), float(rng.uniform(1, 50))
+            info.update({"mean": mean, "std": std, "min": mean - 3 * std, "max": mean + 3 * std})
+        column_analysis[name] = info
+
+        if kind == "categorical":
+            counts = np.sort(rng.dirichlet(np.ones(unique)) * (rows - nulls))[::-1][:5]
+            column_info[name] = {"top_values": {f"v{j}": int(count) for j, count in enumerate(counts)}}
+
+    numeric = [name for name, info in column_analysis.items() if info["is_numeric"]]
+    pairs = []
+    if len(numeric) >= 2:
+        for _ in range(PROFILE_CORRELATION_PAIRS):
+            x, y = rng.choice(len(numeric), 2, replace=False)
+            pairs.append({"x": numeric[x], "y": numeric[y], "correlation": float(rng.uniform(-1, 1))})
+        pairs.sort(key=lambda pair: -abs(pair["correlation"]))
+    correlations = {"method": "pearson", "columns": numeric, "top_pairs": pairs}
+    return column_analysis, {"column_info": column_info}, correlations
+
+
+def run(column_counts, top_k: int, column_budget: int, repeats: int) -> None:
+    print(f"{'columns':>8} {'rank_ms':>9} {'suggest_ms':>11} {'kept':>5} {'types':>5} {'budget_hit':>10}")
+    for columns in column_counts:
+        column_analysis, summary_stats, correlations = make_profile(columns)
+
+        rank_times, suggest_times = [], []
+        for _ in range(repeats):
+            candidates, stats = rank_chart_candidates(column_analysis, correlations, summary_stats, top_k, column_budget)
+            rank_times.append(stats["elapsed_ms"])
+
+            start = time.perf_counter()
+            generate_chart_suggestions(column_analysis, correlations, summary_stats, top_k)
+            suggest_times.append((time.perf_counter() - start) * 1000)
+
+        print(f"{columns:>8} {np.median(rank_times):9.2f} {np.median(suggest_times):11.2f} "
+              f"{len(candidates):>5} {len(stats['scored']):>5} {str(stats['budget_exhausted']):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--columns", type=int, nargs="+", default=[10, 100, 1_000, 10_000])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--column-budget", type=int, default=10**9,
+                        help="Column scorings allowed; lower it to see chart types being skipped")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.columns, args.top_k, args.column_budget, args.repeats)
@@ -0,0 +1,326 @@
+"""
+Backend benchmark suite over synthetic datasets
+
+Drives the service functions and the FastAPI app in-process, in a
+scratch directory with its own SQLite database and uploads folder.
+Run from the backend directory:
+    python benchmarks/bench_suite.py run --tiers small medium --output results.json
+    python benchmarks/bench_suite.py run --tiers small --baseline baseline.json
+    python benchmarks/bench_suite.py compare baseline.json results.json
+
+Every operation is timed once cold, with the in-process caches cleared,
+and then --repeats times warm. compare exits with status 1 when an
+operation got slower than --threshold times its baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import DATASET_FORMATS, generate_dataset, parse_type_mix  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dataset sizes; xlsx is skipped above MAX_XLSX_ROWS since openpyxl alone would dominate
+TIERS = {
+    "small": {"rows": 1_000, "columns": 10},
+    "medium": {"rows": 100_000, "columns": 20},
+    "large": {"rows": 1_000_000, "columns": 20},
+    "wide": {"rows": 10_000, "columns": 500},
+}
+MAX_XLSX_ROWS = 100_000
+
+# Seconds to wait for an ingestion job before giving up
+JOB_TIMEOUT_SECONDS = 600
+
+
+def measure(operation: Callable[[], Any], repeats: int, reset: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """
+    Time an operation once cold and repeats times warm
+
+    Args:
+        operation: Callable to time; a falsy first tuple item counts as failure
+        repeats: Number of warm runs
+        reset: Called before the cold run to clear caches
+
+    Returns:
+        Dictionary with cold_ms, warm_median_ms and warm_min_ms
+    """
+    if reset is not None:
+        reset()
+
+    def timed() -> float:
+        start = time.perf_counter()
+        result = operation()
+        elapsed = (time.perf_counter() - start) * 1000
+        if isinstance(result, tuple) and not result[0]:
+            raise RuntimeError(f"operation failed: {result[1]}")
+        return elapsed
+
+    cold = timed()
+    warm = [timed() for _ in range(repeats)]
+    return {
+        "cold_ms": round(cold, 3),
+        "warm_median_ms": round(statistics.median(warm), 3) if warm else None,
+        "warm_min_ms": round(min(warm), 3) if warm else None,
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Current commit of the backend checkout, if it is a git repository"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def upload(client, path: str) -> Dict[str, Any]:
+    """Upload a file through the API and wait for its ingestion job"""
+    with open(path, "rb") as f:
+        response = client.post("/api/data/upload", files={"file": (os.path.basename(path), f)})
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+
+    deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/data/jobs/{job_id}").json()
+        if job["status"] == "completed":
+            return job
+        if job["status"] == "failed":
+            raise RuntimeError(f"ingestion failed: {job['message']}")
+        time.sleep(0.005)
+    raise TimeoutError(f"ingestion of {path} did not finish in {JOB_TIMEOUT_SECONDS} seconds")
+
+
+def run_case(client, path: str, repeats: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Benchmark every operation on one dataset file
+
+    Returns:
+        Measurements keyed by operation name
+    """
+    # Imported here because they read the database and upload settings on import
+    from database import SessionLocal
+    from services.data_processing import process_uploaded_file, store_dataset_in_db, get_dataset_summary, get_dataset_data
+    from services.suggestion_engine import get_suggestions_for_dataset, get_insights_for_dataset
+    from utils.dataframe_cache import dataframe_cache
+    from utils.file_utils import read_file_with_pandas
+    from utils.result_cache import result_cache
+
+    def clear_caches() -> None:
+        dataframe_cache.clear()
+        result_cache.clear()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    filename = os.path.basename(path)
+
+    results["process_uploaded_file"] = measure(lambda: process_uploaded_file(path, filename), repeats)
+
+    _, _, df = read_file_with_pandas(path)
+    _, _, data_info = process_uploaded_file(path, filename, df=df)
+    with SessionLocal() as db:
+        results["store_dataset_in_db"] = measure(lambda: store_dataset_in_db(db, data_info, df=df), repeats)
+
+    # The first upload runs the whole pipeline; identical re-uploads take the deduplicated path
+    jobs = []
+    results["upload"] = measure(lambda: jobs.append(upload(client, path)), 0)
+    results["upload_duplicate"] = measure(lambda: upload(client, path), max(repeats - 1, 0))
+    dataset_id = jobs[0]["dataset_id"]
+
+    with SessionLocal() as db:
+        results["get_dataset_summary"] = measure(lambda: get_dataset_summary(db, dataset_id), repeats, clear_caches)
+        results["get_suggestions_for_dataset"] = measure(lambda: get_suggestions_for_dataset(db, dataset_id), repeats, clear_caches)
+        results["get_insights_for_dataset"] = measure(lambda: get_insights_for_dataset(db, dataset_id), repeats, clear_caches)
+        results["get_dataset_data"] = measure(lambda: get_dataset_data(db, dataset_id), repeats, clear_caches)
+
+    def endpoint(url: str) -> Callable[[], Any]:
+        def call() -> Any:
+            response = client.get(url)
+            return response.is_success, response.text[:200]
+        return call
+
+    results["GET /summary"] = measure(endpoint(f"/api/data/summary?dataset_id={dataset_id}"), repeats, clear_caches)
+    results["GET /suggestions"] = measure(endpoint(f"/api/suggestions/suggestions?dataset_id={dataset_id}"), repeats, clear_caches)
+    results["GET /insights"] = measure(endpoint(f"/api/suggestions/suggestions/{dataset_id}/insights"), repeats, clear_caches)
+    results["GET /data"] = measure(endpoint(f"/api/data/data?dataset_id={dataset_id}&limit=100"), repeats, clear_caches)
+    return results
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Generate the datasets, run every case and collect the report"""
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="dataviz-bench-"))
+    os.makedirs(os.path.join(workdir, "datasets"), exist_ok=True)
+
+    # The app keeps its database and uploads relative to the working directory
+    os.chdir(workdir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    sys.path.insert(0, BACKEND_DIR)
+    from fastapi.testclient import TestClient
+    from app import app
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "repeats": args.repeats,
+            "cardinality": args.cardinality,
+            "null_rate": args.null_rate,
+            "type_mix": args.type_mix,
+        },
+        "results": [],
+    }
+
+    with TestClient(app) as client:
+        # Start the worker processes before anything is timed
+        warmup = generate_dataset(os.path.join(workdir, "datasets", "warmup.csv"), 10, 3, seed=args.seed)
+        upload(client, warmup)
+
+        for tier in args.tiers:
+            size = TIERS[tier]
+            for dataset_format in args.formats:
+                if dataset_format == "xlsx" and size["rows"] > MAX_XLSX_ROWS:
+                    print(f"{tier:>8} {dataset_format:>5}  skipped (more than {MAX_XLSX_ROWS} rows)")
+                    continue
+
+                path = os.path.join(workdir, "datasets", f"{tier}.{dataset_format}")
+                if not os.path.exists(path):
+                    generate_dataset(path, size["rows"], size["columns"], type_mix=args.type_mix,
+                                     cardinality=args.cardinality, null_rate=args.null_rate, seed=args.seed)
+
+                for operation, timing in run_case(client, path, args.repeats).items():
+                    report["results"].append(dict(
+                        tier=tier, format=dataset_format, rows=size["rows"], columns=size["columns"],
+                        operation=operation, **timing
+                    ))
+                    warm = f"{timing['warm_median_ms']:10.1f}" if timing["warm_median_ms"] is not None else f"{'-':>10}"
+                    print(f"{tier:>8} {dataset_format:>5} {operation:<28} {timing['cold_ms']:10.1f} {warm}")
+    return report
+
+
+def _result_key(result: Dict[str, Any]) -> tuple:
+    return result["tier"], result["format"], result["operation"]
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float, min_delta_ms: float) -> List[Dict[str, Any]]:
+    """
+    Compare two reports operation by operation
+
+    Warm medians are compared where both reports have them, cold times
+    otherwise. A regression is a time above threshold times the baseline
+    that is also at least min_delta_ms slower, so tiny timings do not trip
+    on noise.
+
+    Args:
+        baseline: Earlier report
+        current: New report
+        threshold: Allowed ratio of current to baseline time
+        min_delta_ms: Smallest absolute slowdown reported as a regression
+
+    Returns:
+        One row per operation present in both reports, with the compared
+        times, their ratio and whether it is a regression
+    """
+    baseline_results = {_result_key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = baseline_results.get(_result_key(result))
+        if before is None:
+            continue
+        metric = "warm_median_ms" if result["warm_median_ms"] is not None and before["warm_median_ms"] is not None else "cold_ms"
+        old, new = before[metric], result[metric]
+        ratio = new / old if old else float("inf")
+        rows.append({
+            "tier": result["tier"],
+            "format": result["format"],
+            "operation": result["operation"],
+            "metric": metric,
+            "baseline_ms": old,
+            "current_ms": new,
+            "ratio": round(ratio, 3),
+            "regression": ratio > threshold and new - old >= min_delta_ms,
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> bool:
+    """Print a comparison table; returns True if any operation regressed"""
+    print(f"{'tier':>8} {'format':>6} {'operation':<28} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['tier']:>8} {row['format']:>6} {row['operation']:<28} "
+              f"{row['baseline_ms']:10.1f} {row['current_ms']:10.1f} {row['ratio']:7.2f}{flag}")
+    return any(row["regression"] for row in rows)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write a JSON report")
+    run_parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=["small", "medium"])
+    run_parser.add_argument("--formats", nargs="+", choices=DATASET_FORMATS, default=list(DATASET_FORMATS))
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--type-mix", type=parse_type_mix, default=None,
+                            help="Shares of column kinds, e.g. float=0.5,categorical=0.3,datetime=0.2")
+    run_parser.add_argument("--cardinality", type=int, default=50)
+    run_parser.add_argument("--null-rate", type=float, default=0.05)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--workdir", help="Scratch directory (default: a new temporary directory)")
+    run_parser.add_argument("--output", default="bench_results.json")
+    run_parser.add_argument("--baseline", help="Report to compare the new results against")
+
+    compare_parser = commands.add_parser("compare", help="Compare two JSON reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+
+    for sub_parser in (run_parser, compare_parser):
+        sub_parser.add_argument("--threshold", type=float, default=1.2,
+                                help="Flag operations slower than this ratio of the baseline")
+        sub_parser.add_argument("--min-delta-ms", type=float, default=5.0,
+                                help="Ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        rows = compare(load_report(args.baseline), load_report(args.current), args.threshold, args.min_delta_ms)
+        return 1 if print_comparison(rows) else 0
+
+    # Paths given on the command line are relative to where the suite was started
+    output = os.path.abspath(args.output)
+    baseline = load_report(os.path.abspath(args.baseline)) if args.baseline else None
+    print(f"{'tier':>8} {'format':>5} {'operation':<28} {'cold_ms':>10} {'warm_ms':>10}")
+    report = run(args)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if baseline is not None:
+        rows = compare(baseline, report, args.threshold, args.min_delta_ms)
+        return 1 if print_comparison(rows) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
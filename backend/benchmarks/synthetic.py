@@ -0,0 +1,161 @@
+"""
+Synthetic dataset generators for benchmarks
+
+Write a dataset from the backend directory:
+    python benchmarks/synthetic.py data.csv --rows 100000 --columns 20
+    python benchmarks/synthetic.py data.xlsx --rows 1000 --type-mix float=0.5,categorical=0.5
+"""
+import argparse
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Column kinds the generator can produce
+COLUMN_KINDS = ("float", "integer", "categorical", "text", "datetime", "boolean")
+
+# Share of columns of each kind when no mix is given
+DEFAULT_TYPE_MIX = {"float": 0.35, "integer": 0.2, "categorical": 0.25, "text": 0.05, "datetime": 0.1, "boolean": 0.05}
+
+# File formats the upload endpoint accepts
+DATASET_FORMATS = ("csv", "xlsx", "json")
+
+
+def parse_type_mix(text: str) -> Dict[str, float]:
+    """
+    Parse a type mix like "float=0.5,categorical=0.3,datetime=0.2"
+
+    Raises:
+        ValueError: If a kind is unknown or a share is not a number
+    """
+    mix = {}
+    for item in text.split(","):
+        kind, _, share = item.partition("=")
+        kind = kind.strip()
+        if kind not in COLUMN_KINDS:
+            raise ValueError(f"unknown column kind '{kind}', expected one of {', '.join(COLUMN_KINDS)}")
+        mix[kind] = float(share)
+    return mix
+
+
+def column_kinds(columns: int, type_mix: Dict[str, float], rng: np.random.Generator) -> np.ndarray:
+    """Assign a kind to every column in proportion to the mix, in shuffled order"""
+    kinds = list(type_mix)
+    shares = np.array([type_mix[kind] for kind in kinds], dtype=np.float64)
+    shares = shares / shares.sum()
+
+    # Largest-remainder rounding, so the counts add up to columns
+    counts = np.floor(shares * columns).astype(np.int64)
+    counts[np.argsort(counts - shares * columns)[:columns - counts.sum()]] += 1
+    assigned = np.repeat(np.array(kinds, dtype=object), counts)
+    rng.shuffle(assigned)
+    return assigned
+
+
+def make_column(kind: str, rows: int, cardinality: int, rng: np.random.Generator) -> np.ndarray:
+    """Generate the values of one column"""
+    if kind == "float":
+        return rng.normal(100, 25, rows).round(3)
+    if kind == "integer":
+        return rng.integers(0, 10_000, rows)
+    if kind == "categorical":
+        # Zipf-like frequencies, as real category columns tend to have
+        weights = 1.0 / np.arange(1, cardinality + 1)
+        labels = np.array([f"cat_{i}" for i in range(cardinality)], dtype=object)
+        return labels[rng.choice(cardinality, rows, p=weights / weights.sum())]
+    if kind == "text":
+        return np.char.add("id-", rng.integers(0, 10**9, rows).astype(str)).astype(object)
+    if kind == "datetime":
+        seconds = rng.integers(0, 3 * 365 * 24 * 3600, rows)
+        return np.datetime64("2020-01-01T00:00:00") + seconds.astype("timedelta64[s]")
+    if kind == "boolean":
+        return rng.random(rows) < 0.5
+    raise ValueError(f"unknown column kind '{kind}'")
+
+
+def make_frame(
+    rows: int,
+    columns: int,
+    type_mix: Optional[Dict[str, float]] = None,
+    cardinality: int = 50,
+    null_rate: float = 0.05,
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    Build a DataFrame with a controlled mix of column kinds
+
+    Args:
+        rows: Number of rows
+        columns: Number of columns
+        type_mix: Share of columns per kind in COLUMN_KINDS (default:
+            DEFAULT_TYPE_MIX); shares are normalized
+        cardinality: Distinct values of categorical columns
+        null_rate: Fraction of missing values in every column
+        seed: Random seed; equal arguments give equal frames
+
+    Returns:
+        DataFrame with columns named after their kind and position
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for position, kind in enumerate(column_kinds(columns, type_mix or DEFAULT_TYPE_MIX, rng)):
+        values = pd.Series(make_column(kind, rows, cardinality, rng))
+        if null_rate > 0:
+            values = values.mask(rng.random(rows) < null_rate)
+        data[f"{kind}_{position}"] = values
+    return pd.DataFrame(data)
+
+
+def write_dataset(df: pd.DataFrame, path: str) -> str:
+    """
+    Write a DataFrame in the format given by the file extension
+
+    JSON is written as a list of records, the shape the upload endpoint
+    reads back.
+
+    Raises:
+        ValueError: If the extension is not a supported dataset format
+    """
+    extension = Path(path).suffix.lower().lstrip(".")
+    if extension == "csv":
+        df.to_csv(path, index=False)
+    elif extension == "xlsx":
+        df.to_excel(path, index=False)
+    elif extension == "json":
+        df.to_json(path, orient="records", date_format="iso")
+    else:
+        raise ValueError(f"unsupported dataset format '{extension}', expected one of {', '.join(DATASET_FORMATS)}")
+    return path
+
+
+def generate_dataset(path: str, rows: int, columns: int, **options) -> str:
+    """
+    Generate a synthetic dataset file
+
+    Args:
+        path: Output path; its extension selects the format
+        rows: Number of rows
+        columns: Number of columns
+        **options: Passed to make_frame
+
+    Returns:
+        The output path
+    """
+    return write_dataset(make_frame(rows, columns, **options), path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Output file (.csv, .xlsx or .json)")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--type-mix", type=parse_type_mix, default=None,
+                        help="Shares of column kinds, e.g. float=0.5,categorical=0.3,datetime=0.2")
+    parser.add_argument("--cardinality", type=int, default=50)
+    parser.add_argument("--null-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_dataset(args.path, args.rows, args.columns, type_mix=args.type_mix,
+                     cardinality=args.cardinality, null_rate=args.null_rate, seed=args.seed)
+    print(args.path)
@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text, Table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+from typing import List
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dashboard.db")
@@ -24,4 +25,29 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def add_missing_columns(table: Table) -> List[str]:
+    """
+    Add columns of a model table that the existing database table lacks
+    
+    create_all never alters existing tables, so columns introduced after a
+    database was created are added here. Only additive changes are made,
+    so new columns must be nullable.
+    
+    Args:
+        table: SQLAlchemy table of a model
+        
+    Returns:
+        Names of the columns that were added
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    added = []
+    with engine.begin() as connection:
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            added.append(column.name)
+    return added
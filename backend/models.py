@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from datetime import datetime
+from typing import Optional
 from database import Base
 
 
@@ -13,9 +14,15 @@ class Dataset(Base):
     upload_date: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     file_path: Mapped[str] = mapped_column(String(500), nullable=False)
     
+    # SHA-256 of the file; datasets with equal hashes share one file on disk
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), index=True, nullable=True)
+    
     # Relationship with data records
     records = relationship("DataRecord", back_populates="dataset", cascade="all, delete-orphan")
     
+    # Relationship with the precomputed profile
+    profile = relationship("DatasetProfile", back_populates="dataset", uselist=False, cascade="all, delete-orphan")
+    
     def __repr__(self):
         return f"<Dataset(id={self.id}, filename={self.filename})>"
 
@@ -30,5 +37,36 @@ class DataRecord(Base):
     # Relationship with dataset
     dataset = relationship("Dataset", back_populates="records")
     
+    # Serves keyset pagination: rows of one dataset in id order
+    __table_args__ = (Index("ix_data_records_dataset_id_id", "dataset_id", "id"),)
+    
+    def __repr__(self):
+        return f"<DataRecord(id={self.id}, dataset_id={self.dataset_id})>"
+
+class DatasetProfile(Base):
+    """Dataset profile model for storing statistics computed once at ingest"""
+    __tablename__ = "dataset_profiles"
+    
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    dataset_id: Mapped[int] = mapped_column(ForeignKey("datasets.id"), unique=True, index=True, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    rows: Mapped[int] = mapped_column(Integer, nullable=False)
+    columns: Mapped[int] = mapped_column(Integer, nullable=False)
+    
+    # JSON strings of the profiling outputs
+    column_names: Mapped[str] = mapped_column(Text, nullable=False)
+    column_analysis: Mapped[str] = mapped_column(Text, nullable=False)
+    summary_stats: Mapped[str] = mapped_column(Text, nullable=False)
+    basic_insights: Mapped[str] = mapped_column(Text, nullable=False)
+    column_insights: Mapped[str] = mapped_column(Text, nullable=False)
+    data_quality: Mapped[str] = mapped_column(Text, nullable=False)
+    
+    # Added after the first profiles were stored, so older rows have none
+    correlations: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    
+    # Relationship with dataset
+    dataset = relationship("Dataset", back_populates="profile")
+    
     def __repr__(self):
-        return f"<DataRecord(id={self.id}, dataset_id={self.dataset_id})>"
\ No newline at end of file
+        return f"<DatasetProfile(dataset_id={self.dataset_id}, version={self.version})>"
\ No newline at end of file
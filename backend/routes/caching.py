@@ -0,0 +1,40 @@
+from fastapi import Depends, Request, Response
+from sqlalchemy.orm import Session
+from database import get_db
+from services.dataset_files import get_dataset_version
+from utils.http_cache import NotModified, cache_headers, dataset_etag, is_not_modified
+from utils.worker_pools import run_io
+
+
+async def dataset_conditional_get(
+    dataset_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+) -> None:
+    """
+    Answer conditional requests for data derived from a dataset
+
+    Only the dataset row is read. When the client's ETag or date is
+    current, NotModified is raised and a 304 is sent before the endpoint
+    runs; otherwise the validators are added to the endpoint's response.
+    Unknown datasets pass through, so the endpoint reports them as usual.
+
+    Args:
+        dataset_id: ID of the dataset, from the path or the query string
+        request: Incoming request
+        response: Response whose headers the endpoint's result inherits
+        db: Database session dependency
+
+    Raises:
+        NotModified: If the client's copy is current
+    """
+    success, _, version = await run_io(get_dataset_version, db, dataset_id)
+    if not success or version is None:
+        return
+
+    etag = dataset_etag(dataset_id, version["content_version"])
+    headers = cache_headers(etag, version["last_modified"])
+    if is_not_modified(request.headers, etag, version["last_modified"]):
+        raise NotModified(headers)
+    response.headers.update(headers)
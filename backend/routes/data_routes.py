@@ -1,95 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import get_db
 from schemas import (
     DatasetResponse, SummaryResponse, UploadResponse, 
-    DataResponse, DataRecordResponse
-)
-from services.data_processing import (
-    process_uploaded_file, store_dataset_in_db, 
-    get_dataset_summary, get_dataset_data
+    DataResponse, DataRecordResponse, JobStatusResponse,
+    AggregateRequest, AggregateResponse, DownsampleResponse, CorrelationResponse,
+    ResampleResponse
 )
+from services.data_processing import get_dataset_summary, get_dataset_page, delete_dataset_with_files
+from services.aggregation import get_aggregated_data
+from services.downsampling import get_downsampled_data, MAX_DOWNSAMPLE_POINTS
+from services.resampling import get_resampled_data, MAX_RESAMPLE_BUCKETS
+from services.correlation import get_correlation_matrix
+from services.export import get_dataset_export, iter_dataset_export
+from services.dataset_files import release_dataset_file
+from services.jobs import start_ingestion_job, job_registry
 from utils.file_utils import save_uploaded_file
+from utils.worker_pools import run_io, PoolSaturatedError
+from routes.caching import dataset_conditional_get
 import os
 
 router = APIRouter()
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_file(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
-):
+@router.post("/upload", response_model=UploadResponse, status_code=202)
+async def upload_file(file: UploadFile = File(...)):
     """
-    Upload and process a data file (CSV, Excel, or JSON)
+    Upload a data file (CSV, Excel, or JSON) for background processing
     
-    This endpoint accepts file uploads, processes them with pandas,
-    and stores the results in the database for later analysis.
+    This endpoint returns as soon as the file is on disk. Parsing,
+    profiling and record storage run in the worker pools; poll
+    /jobs/{job_id} for progress and the resulting dataset ID. Files are
+    stored by content hash, so re-uploading identical content reuses the
+    stored file and profile instead of processing it again.
     
     Args:
         file: The uploaded file (CSV, Excel, or JSON)
-        db: Database session dependency
         
     Returns:
-        UploadResponse with success status and dataset information
+        UploadResponse with the ID of the ingestion job
     """
     
     # Validate file type
     allowed_extensions = {'.csv', '.xlsx', '.xls', '.json'}
     file_extension = os.path.splitext(str(file.filename))[1].lower()
     
+    if not file or not file.filename:
+        raise HTTPException(status_code=400, detail="No file or filename provided")
     if file_extension not in allowed_extensions:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}"
         )
     
-    # Save uploaded file
-    success, message, file_path = save_uploaded_file(file)
-    if not success:
+    # Stream uploaded file to disk without blocking the event loop
+    success, message, saved_file = await run_io(save_uploaded_file, file)
+    if not success or saved_file is None:
+        if "exceeds" in message.lower():
+            raise HTTPException(status_code=413, detail=message)
         raise HTTPException(status_code=500, detail=message)
+    file_path = saved_file["file_path"]
     
     try:
-
-
-        if not file or not file.filename:
-            raise HTTPException(status_code=400, detail="No file or filename provided")
-        if not file_path:
-            raise HTTPException(status_code=400, detail="Invalid file path")
-
-
-        # Process the file
-        success, message, data_info = process_uploaded_file(file_path, file.filename)
-        if not success:
-            # Clean up file on processing error
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            raise HTTPException(status_code=400, detail=message)
-        
-        # Store in database
-        success, message, dataset_id = store_dataset_in_db(db, data_info)
-        if not success:
-            # Clean up file on database error
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            raise HTTPException(status_code=500, detail=message)
-        
-        return UploadResponse(
-            success=True,
-            message=f"File uploaded and processed successfully. {data_info['rows']} rows and {data_info['columns']} columns detected.",
-            dataset_id=dataset_id,
-            filename=file.filename
-        )
-        
-    except HTTPException:
+        # The job takes over the upload's claim on the file
+        job_id = start_ingestion_job(file_path, file.filename, saved_file["sha256"])
+    except PoolSaturatedError:
+        # Clean up file when the worker pools cannot take the upload, unless other datasets share it
+        await run_io(release_dataset_file, file_path)
         raise
     except Exception as e:
-        # Clean up file on unexpected error
-        if file_path and os.path.exists(file_path):
-            os.remove(file_path)
+        await run_io(release_dataset_file, file_path)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+    
+    return UploadResponse(
+        success=True,
+        message="File uploaded successfully, processing has started.",
+        job_id=job_id,
+        filename=file.filename
+    )
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """
+    Get the status of a background ingestion job
+    
+    Args:
+        job_id: ID returned by the upload endpoint
+        
+    Returns:
+        JobStatusResponse with status, progress and per-stage timings
+    """
+    
+    job = job_registry.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job
 
-@router.get("/summary", response_model=SummaryResponse)
+@router.get("/summary", response_model=SummaryResponse, dependencies=[Depends(dataset_conditional_get)])
 async def get_summary(
     dataset_id: int,
     db: Session = Depends(get_db)
@@ -99,6 +108,8 @@ async def get_summary(
     
     This endpoint returns comprehensive information about a dataset including
     row/column counts, data types, missing values, and basic insights.
+    Responses carry an ETag; a request whose If-None-Match still matches
+    gets 304 Not Modified without the summary being rebuilt.
     
     Args:
         dataset_id: ID of the dataset to analyze
@@ -108,7 +119,7 @@ async def get_summary(
         SummaryResponse with dataset statistics and insights
     """
     
-    success, message, summary = get_dataset_summary(db, dataset_id)
+    success, message, summary = await run_io(get_dataset_summary, db, dataset_id)
     if not success:
         if "not found" in message.lower():
             raise HTTPException(status_code=404, detail=message)
@@ -116,21 +127,27 @@ async def get_summary(
     
     return summary
 
-@router.get("/data", response_model=DataResponse)
+@router.get("/data", response_model=DataResponse, dependencies=[Depends(dataset_conditional_get)])
 async def get_data(
     dataset_id: int,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """
     Retrieve processed dataset for visualization
     
     This endpoint returns the actual data records from a dataset,
-    formatted and ready for frontend visualization components.
+    formatted and ready for frontend visualization components. Pass
+    the returned next_cursor back as cursor to fetch the following page;
+    paging continues past the stored records to the end of the dataset.
+    Pages are answered with 304 Not Modified while the client's ETag
+    matches.
     
     Args:
         dataset_id: ID of the dataset to retrieve
         limit: Maximum number of records to return (default: 100, max: 1000)
+        cursor: next_cursor from the previous page (default: first page)
         db: Database session dependency
         
     Returns:
@@ -143,31 +160,231 @@ async def get_data(
     elif limit < 1:
         limit = 1
     
-    success, message, data_list = get_dataset_data(db, dataset_id, limit)
-    if not success:
+    success, message, page = await run_io(get_dataset_page, db, dataset_id, limit, cursor)
+    if not success or page is None:
+        if message.startswith("Invalid cursor"):
+            raise HTTPException(status_code=400, detail=message)
         if "not found" in message.lower():
             raise HTTPException(status_code=404, detail=message)
         raise HTTPException(status_code=500, detail=message)
     
     # Get dataset info for metadata
     from models import Dataset
-    dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+    dataset = await run_io(lambda: db.query(Dataset).filter(Dataset.id == dataset_id).first())
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
     
     metadata = {
         "filename": dataset.filename,
         "upload_date": dataset.upload_date.isoformat(),
-        "total_records_returned": len(data_list),
-        "limit_applied": limit
+        "total_records_returned": len(page["data"]),
+        "limit_applied": limit,
+        "cursor": cursor,
+        "next_cursor": page["next_cursor"],
+        "has_more": page["has_more"]
     }
     
     return DataResponse(
         dataset_id=dataset_id,
-        data=data_list,
+        data=page["data"],
         metadata=metadata
     )
 
+@router.get("/export")
+async def export_data(
+    dataset_id: int,
+    export_format: str = Query("ndjson", alias="format", description="Export format: ndjson or csv"),
+    db: Session = Depends(get_db)
+):
+    """
+    Stream a whole dataset as NDJSON or CSV
+    
+    The dataset is read and encoded in row chunks while the response is
+    being sent, so server memory stays flat regardless of dataset size.
+    
+    Args:
+        dataset_id: ID of the dataset to export
+        export_format: ndjson (default) or csv
+        db: Database session dependency
+        
+    Returns:
+        Chunked StreamingResponse with the dataset rows
+    """
+    
+    success, message, export_info = await run_io(get_dataset_export, db, dataset_id, export_format.lower())
+    if not success or export_info is None:
+        if message.startswith("Unsupported"):
+            raise HTTPException(status_code=400, detail=message)
+        if "not found" in message.lower():
+            raise HTTPException(status_code=404, detail=message)
+        raise HTTPException(status_code=500, detail=message)
+    
+    filename = export_info["filename"].replace('"', "")
+    return StreamingResponse(
+        iter_dataset_export(export_info["file_path"], export_format.lower()),
+        media_type=export_info["media_type"],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/aggregate", response_model=AggregateResponse)
+async def aggregate_data(
+    request: AggregateRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Aggregate a dataset server-side for bar and pie charts
+    
+    This endpoint groups the full dataset, not just the stored sample,
+    and returns one record per group. Results are cached per dataset
+    and query.
+    
+    Args:
+        request: Dataset ID, group-by columns, value columns and aggregations
+        db: Database session dependency
+        
+    Returns:
+        AggregateResponse with aggregated records and metadata
+    """
+    
+    success, message, result = await run_io(
+        get_aggregated_data, db, request.dataset_id, request.group_by, request.values,
+        request.aggs, request.sort_by, request.descending, request.limit
+    )
+    if not success or result is None:
+        if message.startswith("Invalid aggregation"):
+            raise HTTPException(status_code=400, detail=message)
+        if "not found" in message.lower():
+            raise HTTPException(status_code=404, detail=message)
+        raise HTTPException(status_code=500, detail=message)
+    
+    return AggregateResponse(dataset_id=request.dataset_id, **result)
+
+@router.get("/downsample", response_model=DownsampleResponse)
+async def downsample_data(
+    dataset_id: int,
+    x: str = Query(..., description="Column for the x axis (numeric or datetime-like)"),
+    y: List[str] = Query(..., description="Numeric columns, one series each"),
+    method: str = Query("lttb", description="lttb for line charts, sample for scatter plots"),
+    max_points: int = Query(2000, ge=3, le=MAX_DOWNSAMPLE_POINTS, description="Maximum points per series"),
+    stratify: Optional[str] = Query(None, description="Column to stratify the sample by (sample only)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Downsample line and scatter chart data over the full dataset
+    
+    Line charts use Largest-Triangle-Three-Buckets, which keeps the
+    visual shape of a series. Scatter plots use a random sample,
+    optionally stratified by a categorical column. Results are cached
+    per dataset and query.
+    
+    Args:
+        dataset_id: ID of the dataset
+        x: Column for the x axis
+        y: Numeric columns, one series each
+        method: Downsampling method
+        max_points: Maximum points per series
+        stratify: Optional stratification column
+        db: Database session dependency
+        
+    Returns:
+        DownsampleResponse with one series per y column
+    """
+    
+    success, message, result = await run_io(
+        get_downsampled_data, db, dataset_id, x, y, method, max_points, stratify
+    )
+    if not success or result is None:
+        if message.startswith("Invalid downsampling"):
+            raise HTTPException(status_code=400, detail=message)
+        if "not found" in message.lower():
+            raise HTTPException(status_code=404, detail=message)
+        raise HTTPException(status_code=500, detail=message)
+    
+    return DownsampleResponse(dataset_id=dataset_id, **result)
+
+@router.get("/resample", response_model=ResampleResponse)
+async def resample_data(
+    dataset_id: int,
+    x: str = Query(..., description="Datetime column to bucket by"),
+    y: List[str] = Query(..., description="Numeric columns, one series each"),
+    frequency: str = Query("auto", description="hour, day, week, month, year or auto"),
+    agg: str = Query("mean", description="Aggregation within each bucket: count, sum, mean, min or max"),
+    max_points: int = Query(500, ge=1, le=MAX_RESAMPLE_BUCKETS, description="Target number of buckets for auto"),
+    db: Session = Depends(get_db)
+):
+    """
+    Aggregate numeric series into calendar buckets over the full dataset
+    
+    Line charts over time get one point per hour, day, week, month or
+    year instead of raw rows. With frequency=auto the finest bucket size
+    giving at most max_points buckets is used. Results are cached per
+    dataset and query.
+    
+    Args:
+        dataset_id: ID of the dataset
+        x: Datetime column
+        y: Numeric columns, one series each
+        frequency: Bucket size
+        agg: Aggregation function
+        max_points: Target number of buckets for auto
+        db: Database session dependency
+        
+    Returns:
+        ResampleResponse with one series per y column
+    """
+    
+    success, message, result = await run_io(
+        get_resampled_data, db, dataset_id, x, y, frequency.lower(), agg.lower(), max_points
+    )
+    if not success or result is None:
+        if message.startswith("Invalid resampling"):
+            raise HTTPException(status_code=400, detail=message)
+        if "not found" in message.lower():
+            raise HTTPException(status_code=404, detail=message)
+        raise HTTPException(status_code=500, detail=message)
+    
+    return ResampleResponse(dataset_id=dataset_id, **result)
+
+@router.get("/correlation", response_model=CorrelationResponse)
+async def correlation_matrix(
+    dataset_id: int,
+    method: str = Query("pearson", description="pearson or spearman"),
+    columns: Optional[List[str]] = Query(None, description="Numeric columns to correlate (default: all numeric columns)"),
+    top_k: int = Query(10, ge=0, le=1000, description="Number of most correlated pairs to return"),
+    db: Session = Depends(get_db)
+):
+    """
+    Compute the correlation matrix of a dataset's numeric columns
+    
+    Coefficients use every row where both columns have a value. The
+    matrix is computed over the full dataset and cached per dataset and
+    query, so heatmaps can be redrawn without recomputing it. Large CSV
+    datasets are answered from the Pearson matrix of their profile, and
+    Spearman is rejected with a 400 for them.
+    
+    Args:
+        dataset_id: ID of the dataset
+        method: Correlation method
+        columns: Optional subset of numeric columns
+        top_k: Number of strongest pairs to report
+        db: Database session dependency
+        
+    Returns:
+        CorrelationResponse with the matrix and the strongest pairs
+    """
+    
+    success, message, result = await run_io(
+        get_correlation_matrix, db, dataset_id, method.lower(), columns, top_k
+    )
+    if not success or result is None:
+        if message.startswith("Invalid correlation"):
+            raise HTTPException(status_code=400, detail=message)
+        if "not found" in message.lower():
+            raise HTTPException(status_code=404, detail=message)
+        raise HTTPException(status_code=500, detail=message)
+    
+    return CorrelationResponse(dataset_id=dataset_id, **result)
+
 @router.get("/datasets", response_model=List[DatasetResponse])
 async def list_datasets(db: Session = Depends(get_db)):
     """
@@ -186,7 +403,7 @@ async def list_datasets(db: Session = Depends(get_db)):
     from models import Dataset
     
     try:
-        datasets = db.query(Dataset).order_by(Dataset.upload_date.desc()).all()
+        datasets = await run_io(lambda: db.query(Dataset).order_by(Dataset.upload_date.desc()).all())
         return [
             DatasetResponse(
                 id=dataset.id,
@@ -195,6 +412,8 @@ async def list_datasets(db: Session = Depends(get_db)):
             )
             for dataset in datasets
         ]
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving datasets: {str(e)}")
 
@@ -217,27 +436,10 @@ async def delete_dataset(
         Success message
     """
     
-    from models import Dataset
-    from utils.file_utils import cleanup_file
+    success, message = await run_io(delete_dataset_with_files, db, dataset_id)
+    if not success:
+        if "not found" in message.lower():
+            raise HTTPException(status_code=404, detail=message)
+        raise HTTPException(status_code=500, detail=message)
     
-    try:
-        # Get dataset
-        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
-        if not dataset:
-            raise HTTPException(status_code=404, detail="Dataset not found")
-        
-        # Clean up file
-        if os.path.exists(dataset.file_path):
-            cleanup_file(dataset.file_path)
-        
-        # Delete from database (cascade will handle related records)
-        db.delete(dataset)
-        db.commit()
-        
-        return {"success": True, "message": "Dataset deleted successfully"}
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error deleting dataset: {str(e)}")
\ No newline at end of file
+    return {"success": True, "message": message}
\ No newline at end of file
@@ -2,11 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from database import get_db
 from schemas import SuggestionsResponse
-from services.suggestion_engine import get_suggestions_for_dataset
+from services.suggestion_engine import get_suggestions_for_dataset, get_insights_for_dataset
+from utils.worker_pools import run_io, PoolSaturatedError
+from routes.caching import dataset_conditional_get
 
 router = APIRouter()
 
-@router.get("/suggestions", response_model=SuggestionsResponse)
+@router.get("/suggestions", response_model=SuggestionsResponse, dependencies=[Depends(dataset_conditional_get)])
 async def get_suggestions(
     dataset_id: int = Query(..., description="ID of the dataset to analyze"),
     db: Session = Depends(get_db)
@@ -22,7 +24,9 @@ async def get_suggestions(
     - Best practices for different chart types
     
     The suggestions include specific chart types, column recommendations,
-    and reasoning for why each chart would be effective.
+    and reasoning for why each chart would be effective. Responses carry
+    an ETag, and requests whose If-None-Match still matches get 304 Not
+    Modified.
     
     Args:
         dataset_id: ID of the dataset to analyze
@@ -36,7 +40,7 @@ async def get_suggestions(
     """
     
     try:
-        success, message, suggestions_response = get_suggestions_for_dataset(db, dataset_id)
+        success, message, suggestions_response = await run_io(get_suggestions_for_dataset, db, dataset_id)
         
         if not success:
             if "not found" in message.lower():
@@ -50,13 +54,15 @@ async def get_suggestions(
         
     except HTTPException:
         raise
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Unexpected error generating suggestions: {str(e)}"
         )
 
-@router.get("/suggestions/{dataset_id}/insights")
+@router.get("/suggestions/{dataset_id}/insights", dependencies=[Depends(dataset_conditional_get)])
 async def get_dataset_insights(
     dataset_id: int,
     db: Session = Depends(get_db)
@@ -66,7 +72,8 @@ async def get_dataset_insights(
     
     This endpoint provides in-depth analysis of the dataset structure,
     including column types, data quality issues, and strategic insights
-    for creating effective visualizations.
+    for creating effective visualizations. Conditional requests are
+    answered with 304 Not Modified while the client's ETag matches.
     
     Args:
         dataset_id: ID of the dataset to analyze
@@ -80,57 +87,22 @@ async def get_dataset_insights(
     """
     
     try:
-        from models import Dataset
-        from utils.file_utils import read_file_with_pandas
-        from services.suggestion_engine import analyze_column_types, get_column_insights
-        
-        # Get dataset
-        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
-        if not dataset:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Dataset with ID {dataset_id} not found"
-            )
-        
-        # Read the dataset file
-        file_path: str = str(dataset.file_path)
-        success, message, df = read_file_with_pandas(file_path)
-        if not success or df is None:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error reading dataset: {message}"
-            )
-        
-        # Analyze columns
-        column_analysis = analyze_column_types(df)
-        insights = get_column_insights(df)
+        success, message, detailed_insights = await run_io(get_insights_for_dataset, db, dataset_id)
         
-        # Compile detailed insights
-        detailed_insights = {
-            "dataset_id": dataset_id,
-            "filename": dataset.filename,
-            "upload_date": dataset.upload_date.isoformat(),
-            "shape": {"rows": len(df), "columns": len(df.columns)},
-            "column_analysis": column_analysis,
-            "strategic_insights": insights,
-            "data_quality": {
-                "missing_data_percentage": round((df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100, 2),
-                "duplicate_rows": df.duplicated().sum(),
-                "columns_with_missing_data": df.columns[df.isnull().any()].tolist(),
-                "memory_usage_mb": round(df.memory_usage(deep=True).sum() / 1024**2, 2)
-            },
-            "recommendations": {
-                "best_for_trends": [col for col, info in column_analysis.items() if info.get("is_datetime")],
-                "best_for_categories": [col for col, info in column_analysis.items() if info.get("is_categorical") and info["unique_count"] <= 10],
-                "best_for_distributions": [col for col, info in column_analysis.items() if info.get("is_continuous")],
-                "best_for_correlations": [col for col, info in column_analysis.items() if info.get("is_numeric")][:5]
-            }
-        }
+        if not success:
+            if "not found" in message.lower():
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Dataset with ID {dataset_id} not found"
+                )
+            raise HTTPException(status_code=500, detail=message)
         
         return detailed_insights
         
     except HTTPException:
         raise
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -213,6 +185,6 @@ async def get_supported_chart_types():
         "data_size_recommendations": {
             "small_datasets": "< 100 rows - All chart types suitable",
             "medium_datasets": "100-1000 rows - Consider sampling for scatter plots",
-            "large_datasets": "> 1000 rows - Use aggregation or sampling"
+            "large_datasets": "> 1000 rows - Use aggregation (/api/data/aggregate) or sampling (/api/data/downsample)"
         }
     }
\ No newline at end of file
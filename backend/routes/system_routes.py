@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Header, HTTPException
+from typing import Optional
+from utils.dataframe_cache import dataframe_cache
+from utils.request_profiler import get_profile_summary, profiling_authorized
+from utils.result_cache import result_cache
+from utils.worker_pools import get_pool_stats
+
+router = APIRouter()
+
+@router.get("/cache")
+async def get_cache_stats():
+    """
+    Get statistics for the in-process DataFrame and query result caches
+    
+    Returns:
+        Dictionary with the DataFrame cache's entry count, memory usage and
+        hit/miss/eviction counters, plus the result cache's counters
+    """
+    
+    return dict(dataframe_cache.stats(), results=result_cache.stats())
+
+@router.get("/pools")
+async def get_worker_pool_stats():
+    """
+    Get utilization metrics for the CPU and I/O worker pools
+    
+    Returns:
+        Dictionary keyed by pool name with worker counts, queue depth,
+        utilization and task counters
+    """
+    
+    return get_pool_stats()
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    """
+    Get the top functions of a profiled request
+    
+    Send the admin profiling token in X-Profile-Token with any request to
+    profile it; its response carries the X-Profile-Id to look up here.
+    The full stats are written to PROFILE_OUTPUT_DIR as <id>.prof.
+    
+    Args:
+        profile_id: ID from the X-Profile-Id response header
+        x_profile_token: The admin profiling token
+        
+    Returns:
+        Dictionary with the profile's status, wall time, pool task count
+        and top functions by cumulative time
+    """
+    
+    # Answer as if the profile didn't exist, so the endpoint reveals nothing without the token
+    if not profiling_authorized(x_profile_token):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    summary = get_profile_summary(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    return summary
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import List, Dict, Any, Optional
+from services.aggregation import MAX_AGGREGATE_GROUPS
 
 class DatasetBase(BaseModel):
     """Base dataset schema"""
@@ -52,6 +53,11 @@ class ChartSuggestion(BaseModel):
     description: str = Field(..., description="Description of what the chart shows")
     columns: List[str] = Field(..., description="Columns to be used in the chart")
     reasoning: str = Field(..., description="Why this chart is suggested")
+    aggregate: Optional[Dict[str, Any]] = Field(None, description="Query for /api/data/aggregate that returns this chart's data")
+    downsample: Optional[Dict[str, Any]] = Field(None, description="Query for /api/data/downsample that returns this chart's points")
+    resample: Optional[Dict[str, Any]] = Field(None, description="Query for /api/data/resample that returns this chart's time buckets")
+    correlation: Optional[Dict[str, Any]] = Field(None, description="Query for /api/data/correlation that returns this chart's matrix")
+    score: Optional[float] = Field(None, description="Ranking score; higher means more likely to be informative")
 
 class SuggestionsResponse(BaseModel):
     """Response schema for chart suggestions"""
@@ -64,9 +70,83 @@ class UploadResponse(BaseModel):
     message: str = Field(..., description="Success or error message")
     dataset_id: Optional[int] = Field(None, description="ID of the created dataset")
     filename: Optional[str] = Field(None, description="Name of the uploaded file")
+    job_id: Optional[str] = Field(None, description="ID of the background ingestion job")
+    timings: Optional[Dict[str, float]] = Field(None, description="Duration of each ingestion stage in milliseconds")
+
+class JobStatusResponse(BaseModel):
+    """Background ingestion job status schema"""
+    job_id: str = Field(..., description="Unique identifier for the job")
+    status: str = Field(..., description="One of 'queued', 'processing', 'storing', 'completed' or 'failed'")
+    stage: Optional[str] = Field(None, description="Ingestion stage currently running")
+    stages: List[str] = Field(..., description="Stages this job runs, in order")
+    progress: float = Field(..., description="Fraction of the job's stages finished before the current one, from 0 to 1")
+    filename: str = Field(..., description="Name of the uploaded file")
+    dataset_id: Optional[int] = Field(None, description="ID of the created dataset once completed")
+    message: str = Field(..., description="Progress or error message")
+    timings: Dict[str, float] = Field(..., description="Duration of each finished ingestion stage in milliseconds")
+    created_at: datetime = Field(..., description="When the job was created")
+    updated_at: datetime = Field(..., description="When the job last changed")
 
 class DataResponse(BaseModel):
     """Data retrieval response schema"""
     dataset_id: int = Field(..., description="ID of the dataset")
     data: List[Dict[str, Any]] = Field(..., description="The actual data records")
-    metadata: Dict[str, Any] = Field(..., description="Additional metadata about the data")
\ No newline at end of file
+    metadata: Dict[str, Any] = Field(..., description="Additional metadata about the data")
+
+class AggregateRequest(BaseModel):
+    """Group-by aggregation request schema"""
+    dataset_id: int = Field(..., description="ID of the dataset")
+    group_by: List[str] = Field(..., min_length=1, description="Columns to group by")
+    values: List[str] = Field(default_factory=list, description="Columns to aggregate")
+    aggs: List[str] = Field(default_factory=lambda: ["count"], description="Aggregations: count, sum, mean, min, max")
+    sort_by: Optional[str] = Field(None, description="Output column to order groups by (default: group keys)")
+    descending: bool = Field(False, description="Whether to sort in descending order")
+    limit: int = Field(1000, ge=1, le=MAX_AGGREGATE_GROUPS, description="Maximum number of groups to return")
+
+class AggregateResponse(BaseModel):
+    """Group-by aggregation response schema"""
+    dataset_id: int = Field(..., description="ID of the dataset")
+    data: List[Dict[str, Any]] = Field(..., description="One record per group with its aggregated values")
+    metadata: Dict[str, Any] = Field(..., description="Output columns, group counts and cache status")
+
+class DownsampledSeries(BaseModel):
+    """One downsampled x/y series"""
+    name: str = Field(..., description="Name of the y column")
+    x: List[Any] = Field(..., description="x values of the kept points")
+    y: List[Optional[float]] = Field(..., description="y values of the kept points")
+    points: int = Field(..., description="Number of points kept")
+    source_points: int = Field(..., description="Number of points before downsampling")
+
+class DownsampleResponse(BaseModel):
+    """Downsampled chart data response schema"""
+    dataset_id: int = Field(..., description="ID of the dataset")
+    x: str = Field(..., description="Column used for the x axis")
+    method: str = Field(..., description="Downsampling method: 'lttb' or 'sample'")
+    series: List[DownsampledSeries] = Field(..., description="One series per y column")
+    metadata: Dict[str, Any] = Field(..., description="Row counts, point budget and cache status")
+
+class ResampledSeries(BaseModel):
+    """One time-bucketed series"""
+    name: str = Field(..., description="Name of the y column")
+    x: List[str] = Field(..., description="Start of each non-empty bucket, ISO formatted")
+    y: List[Optional[float]] = Field(..., description="Aggregated value of each bucket")
+    points: int = Field(..., description="Number of non-empty buckets")
+    source_points: int = Field(..., description="Number of rows aggregated")
+
+class ResampleResponse(BaseModel):
+    """Time-series resampling response schema"""
+    dataset_id: int = Field(..., description="ID of the dataset")
+    x: str = Field(..., description="Datetime column the buckets are taken over")
+    frequency: str = Field(..., description="Bucket size used: hour, day, week, month or year")
+    agg: str = Field(..., description="Aggregation applied within each bucket")
+    series: List[ResampledSeries] = Field(..., description="One series per y column")
+    metadata: Dict[str, Any] = Field(..., description="Row counts, requested frequency and cache status")
+
+class CorrelationResponse(BaseModel):
+    """Correlation matrix response schema"""
+    dataset_id: int = Field(..., description="ID of the dataset")
+    method: str = Field(..., description="Correlation method: 'pearson' or 'spearman'")
+    columns: List[str] = Field(..., description="Columns in matrix order")
+    matrix: List[List[Optional[float]]] = Field(..., description="Correlation coefficients; null where a pair has no coefficient")
+    top_pairs: List[Dict[str, Any]] = Field(..., description="Most correlated column pairs, strongest absolute correlation first")
+    metadata: Dict[str, Any] = Field(..., description="Row and column counts and cache status")
\ No newline at end of file
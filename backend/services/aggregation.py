@@ -0,0 +1,190 @@
+import json
+import pandas as pd
+from typing import List, Dict, Any, Tuple, Optional
+from sqlalchemy.orm import Session
+from models import Dataset
+from services.dataset_handle import open_dataset_handle
+from utils.dtype_compaction import widen_compacted_floats
+from utils.file_utils import get_file_info
+from utils.result_cache import result_cache
+
+# Aggregation functions accepted by the aggregate endpoint
+AGGREGATION_FUNCTIONS = ("count", "sum", "mean", "min", "max")
+
+# Aggregations that also apply to datetime columns
+DATETIME_AGGREGATIONS = ("count", "min", "max")
+
+# Upper bound on the number of groups a single query may return
+MAX_AGGREGATE_GROUPS = 10000
+
+
+def resolve_columns(df: pd.DataFrame, names: List[str]) -> List[Any]:
+    """
+    Map requested column names to the DataFrame's column labels
+
+    Labels are matched by their string form, since JSON uploads can
+    produce non-string column labels.
+
+    Raises:
+        ValueError: If a name matches no column
+    """
+    labels = {str(col): col for col in df.columns}
+    unknown = [name for name in names if name not in labels]
+    if unknown:
+        raise ValueError(f"unknown column(s): {', '.join(unknown)}")
+    return [labels[name] for name in names]
+
+
+def aggregate_dataframe(
+    df: pd.DataFrame,
+    group_by: List[str],
+    values: List[str],
+    aggs: List[str],
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    limit: int = 1000
+) -> Dict[str, Any]:
+    """
+    Group a DataFrame and aggregate value columns in one vectorized pass
+
+    Output columns are the group-by columns followed by one column per
+    value and aggregation, named "<value>_<agg>". Without value columns
+    the only allowed aggregation is "count", giving each group's row count.
+    Datetime columns support only DATETIME_AGGREGATIONS.
+
+    Args:
+        df: Pandas DataFrame
+        group_by: Columns to group by
+        values: Columns to aggregate
+        aggs: Aggregation functions from AGGREGATION_FUNCTIONS
+        sort_by: Output column to order groups by (default: group keys)
+        descending: Whether to sort in descending order
+        limit: Maximum number of groups to return, capped at MAX_AGGREGATE_GROUPS
+
+    Returns:
+        Dictionary with data (list of records) and metadata; metadata's
+        truncated flag is set when groups beyond the limit were dropped
+
+    Raises:
+        ValueError: If the query is invalid for this DataFrame
+    """
+    if not group_by:
+        raise ValueError("at least one group-by column is required")
+    unsupported = [agg for agg in aggs if agg not in AGGREGATION_FUNCTIONS]
+    if not aggs or unsupported:
+        raise ValueError(f"aggregations must be from {', '.join(AGGREGATION_FUNCTIONS)}")
+    if not values and aggs != ["count"]:
+        raise ValueError("only 'count' can be used without value columns")
+
+    group_cols = resolve_columns(df, group_by)
+    value_cols = resolve_columns(df, values)
+    for value, col in zip(values, value_cols):
+        dtype = df[col].dtype
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            if any(agg not in DATETIME_AGGREGATIONS for agg in aggs):
+                raise ValueError(f"column '{value}' holds dates and only supports {', '.join(DATETIME_AGGREGATIONS)}")
+        elif any(agg != "count" for agg in aggs) and not pd.api.types.is_numeric_dtype(dtype):
+            raise ValueError(f"column '{value}' is not numeric and only supports 'count'")
+
+    # Compacted float32 columns would otherwise be summed and averaged in float32
+    df = widen_compacted_floats(df)
+    grouped = df.groupby(group_cols, dropna=False, sort=False, observed=True)
+    if value_cols:
+        result = grouped[value_cols].agg(aggs)
+        result.columns = [f"{value}_{agg}" for value, agg in result.columns]
+    else:
+        result = grouped.size().to_frame("count")
+    result = result.reset_index()
+    result.columns = [str(col) for col in result.columns]
+
+    if sort_by is not None:
+        if sort_by not in result.columns:
+            raise ValueError(f"cannot sort by '{sort_by}', it is not an output column")
+        result = result.sort_values(sort_by, ascending=not descending, na_position="last", kind="stable")
+    else:
+        try:
+            result = result.sort_values(list(group_by), ascending=not descending, na_position="last", kind="stable")
+        except TypeError:
+            # Mixed-type group keys cannot be ordered; keep first-seen order
+            pass
+
+    limit = min(limit, MAX_AGGREGATE_GROUPS)
+    total_groups = len(result)
+    result = result.head(limit)
+
+    # Same encoding as stored records, so float aggregates keep their full precision;
+    # imported here since schemas, which data_processing imports, imports this module
+    from services.data_processing import serialize_records
+    records = [json.loads(line) for line in serialize_records(result)]
+    return {
+        "data": records,
+        "metadata": {
+            "columns": list(result.columns),
+            "rows_aggregated": len(df),
+            "total_groups": total_groups,
+            "groups_returned": len(records),
+            "limit_applied": limit,
+            "truncated": total_groups > len(records),
+        }
+    }
+
+
+def get_aggregated_data(
+    db: Session,
+    dataset_id: int,
+    group_by: List[str],
+    values: List[str],
+    aggs: List[str],
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    limit: int = 1000
+) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Aggregate a whole dataset, reusing cached results of identical queries
+
+    Args:
+        db: Database session
+        dataset_id: ID of the dataset
+        group_by: Columns to group by
+        values: Columns to aggregate
+        aggs: Aggregation functions from AGGREGATION_FUNCTIONS
+        sort_by: Output column to order groups by (default: group keys)
+        descending: Whether to sort in descending order
+        limit: Maximum number of groups to return
+
+    Returns:
+        Tuple of (success, message, result) where result holds data and
+        metadata. Invalid queries return a message starting with
+        "Invalid aggregation".
+    """
+    try:
+        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+        if not dataset:
+            return False, "Dataset not found", None
+
+        file_info = get_file_info(str(dataset.file_path))
+        if not file_info["exists"]:
+            return False, "Dataset file not found on disk", None
+
+        version = (file_info["modified"], file_info["size"])
+        key = ("aggregate", tuple(group_by), tuple(values), tuple(aggs), sort_by, descending, limit)
+        cached = result_cache.get(str(dataset.file_path), key, version)
+        if cached is not None:
+            return True, "Aggregation loaded from cache", dict(cached, metadata=dict(cached["metadata"], cached=True))
+
+        success, message, handle = open_dataset_handle(str(dataset.file_path))
+        if not success or handle is None:
+            return False, f"Error reading dataset: {message}", None
+
+        try:
+            # Only the columns the query touches are read
+            df = handle.select(group_by + values)
+            result = aggregate_dataframe(df, group_by, values, aggs, sort_by, descending, limit)
+        except ValueError as e:
+            return False, f"Invalid aggregation: {str(e)}", None
+
+        result_cache.put(str(dataset.file_path), key, version, result)
+        return True, "Aggregation computed", dict(result, metadata=dict(result["metadata"], cached=False))
+
+    except Exception as e:
+        return False, f"Error aggregating data: {str(e)}", None
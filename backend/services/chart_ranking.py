@@ -0,0 +1,331 @@
+import heapq
+import os
+import time
+import numpy as np
+from typing import List, Dict, Any, Tuple, Optional
+
+# Number of suggestions returned by default
+SUGGESTION_TOP_K = int(os.getenv("SUGGESTION_TOP_K", "10"))
+
+# Work budget for scoring, in column scorings: each chart type scores every
+# column once, and chart types that would take the total past the budget are
+# skipped. A count rather than a time, so a profile always gets the same
+# suggestions and their ETags stay valid.
+SUGGESTION_COLUMN_BUDGET = int(os.getenv("SUGGESTION_COLUMN_BUDGET", "250000"))
+
+# Chart types in the order they are scored, with the weight applied to
+# their scores and the most suggestions of each type that are kept
+CHART_TYPES = {
+    "bar": {"weight": 0.9, "limit": 3},
+    "histogram": {"weight": 0.8, "limit": 2},
+    "scatter": {"weight": 1.0, "limit": 2},
+    "line": {"weight": 1.0, "limit": 1},
+    "box": {"weight": 0.85, "limit": 2},
+    "pie": {"weight": 0.6, "limit": 1},
+    "heatmap": {"weight": 0.8, "limit": 1},
+}
+
+# Entropy assumed for columns whose value distribution is unknown
+DEFAULT_ENTROPY = 0.5
+
+
+def normalized_entropy(top_counts: np.ndarray, non_null: np.ndarray, unique: np.ndarray) -> np.ndarray:
+    """
+    Estimate the entropy of columns' values relative to their maximum
+
+    The counts of values beyond the reported top values are assumed to
+    be equal, so the estimate is exact when every value is reported.
+
+    Args:
+        top_counts: Array of shape (columns, n) with the counts of each
+            column's most frequent values, padded with zeros
+        non_null: Number of non-missing values per column
+        unique: Number of distinct values per column
+
+    Returns:
+        Entropy divided by log(unique) per column, from 0 (one value
+        dominates) to 1 (all values equally frequent)
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shares = top_counts / non_null[:, None]
+        entropy = -np.where(shares > 0, shares * np.log(shares), 0.0).sum(axis=1)
+
+        # Spread the mass of unreported values evenly over them
+        rest_values = unique - (top_counts > 0).sum(axis=1)
+        rest_share = 1.0 - shares.sum(axis=1)
+        has_rest = (rest_values > 0) & (rest_share > 0)
+        entropy -= np.where(has_rest, rest_share * np.log(rest_share / rest_values), 0.0)
+        normalized = np.clip(entropy / np.log(unique), 0.0, 1.0)
+    return np.where((unique >= 2) & (non_null > 0), normalized, 0.0)
+
+
+def _top_counts(info: Dict[str, Any], column_info: Dict[str, Any]) -> Optional[List[float]]:
+    """Counts of a column's top values, derived from the mean of a two-valued numeric column if none are stored"""
+    if "top_values" in column_info:
+        return list(column_info["top_values"].values())
+    if info["unique_count"] == 2 and info.get("max") is not None and info["max"] != info["min"]:
+        share = (info["mean"] - info["min"]) / (info["max"] - info["min"])
+        non_null = info["total_count"] - info["null_count"]
+        return [share * non_null, (1 - share) * non_null]
+    return None
+
+
+def column_arrays(column_analysis: Dict[str, Dict[str, Any]], summary_stats: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """
+    Lay out per-column statistics as aligned arrays for vectorized scoring
+
+    Args:
+        column_analysis: Column analysis of a dataset profile
+        summary_stats: Summary statistics of the profile, used for the
+            top values behind entropy estimates
+
+    Returns:
+        Dictionary of arrays with one entry per column: names,
+        completeness, unique, entropy, spread and the type flags
+    """
+    column_info = (summary_stats or {}).get("column_info", {})
+    infos = list(column_analysis.values())
+
+    def field(name: str, default: Any = np.nan) -> np.ndarray:
+        values = [info.get(name) for info in infos]
+        return np.array([default if value is None else value for value in values], dtype=np.float64)
+
+    rows = field("total_count", 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        completeness = np.where(rows > 0, 1.0 - field("null_count", 0.0) / rows, 0.0)
+        std, mean = field("std"), field("mean")
+        # Coefficient of variation squashed into [0, 1)
+        dispersion = np.nan_to_num(std / (np.abs(mean) + std))
+
+    # Entropy is estimated where value counts are known and left NaN elsewhere
+    unique = field("unique_count", 0.0)
+    counts = [_top_counts(info, column_info.get(name, {})) for name, info in column_analysis.items()]
+    known = np.array([count is not None for count in counts], dtype=bool)
+    width = max((len(count) for count in counts if count is not None), default=0)
+    top_counts = np.zeros((len(counts), width))
+    for row, count in enumerate(counts):
+        if count is not None:
+            top_counts[row, :len(count)] = count
+    entropy = np.where(known, normalized_entropy(top_counts, rows - field("null_count", 0.0), unique), np.nan)
+
+    return {
+        "names": np.array(list(column_analysis), dtype=object),
+        "rows": rows,
+        "completeness": completeness,
+        "unique": unique,
+        "entropy": entropy,
+        "dispersion": dispersion,
+        # Distinct values on a log scale, saturating at 1000
+        "resolution": np.clip(np.log10(np.maximum(unique, 1.0)) / 3, 0.0, 1.0),
+        "is_numeric": np.array([bool(info["is_numeric"]) for info in infos], dtype=bool),
+        "is_categorical": np.array([bool(info["is_categorical"]) for info in infos], dtype=bool),
+        "is_continuous": np.array([bool(info["is_continuous"]) for info in infos], dtype=bool),
+        "is_datetime": np.array([bool(info["is_datetime"]) for info in infos], dtype=bool),
+    }
+
+
+def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest finite positive scores, highest first, ties in column order"""
+    candidates = np.flatnonzero(np.isfinite(scores) & (scores > 0))
+    if k <= 0 or len(candidates) == 0:
+        return candidates[:0]
+    if k < len(candidates):
+        candidates = np.sort(candidates[np.argpartition(-scores[candidates], k - 1)[:k]])
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _top_pairs(left: np.ndarray, right: np.ndarray, k: int) -> List[Tuple[float, int, int]]:
+    """
+    Best k (left, right) combinations by the product of their scores
+
+    Scores are non-negative, so the best products use only the best k
+    entries of each side; the outer product is never larger than k by k.
+    """
+    left_top, right_top = _top_indices(left, k), _top_indices(right, k)
+    if len(left_top) == 0 or len(right_top) == 0:
+        return []
+    products = np.outer(left[left_top], right[right_top])
+    best = _top_indices(products.ravel(), k)
+    rows, cols = np.divmod(best, len(right_top))
+    return [(float(products.flat[i]), int(left_top[r]), int(right_top[c])) for i, r, c in zip(best, rows, cols)]
+
+
+def _score_bar(table: Dict[str, np.ndarray], correlations: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Bar charts for categorical columns with 2 to 15 values, favoring balanced ones"""
+    entropy = np.nan_to_num(table["entropy"], nan=DEFAULT_ENTROPY)
+    eligible = table["is_categorical"] & (table["unique"] >= 2) & (table["unique"] <= 15)
+    scores = np.where(eligible, table["completeness"] * (0.5 + 0.5 * entropy), 0.0)
+    return [{"chart_type": "bar", "columns": [i], "score": float(scores[i])} for i in _top_indices(scores, limit)]
+
+
+def _score_histogram(table: Dict[str, np.ndarray], correlations: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Histograms for continuous columns with many distinct and widely spread values"""
+    scores = np.where(
+        table["is_continuous"],
+        table["completeness"] * (0.5 * table["resolution"] + 0.5 * table["dispersion"]),
+        0.0
+    )
+    return [{"chart_type": "histogram", "columns": [i], "score": float(scores[i])} for i in _top_indices(scores, limit)]
+
+
+def _score_scatter(table: Dict[str, np.ndarray], correlations: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Scatter plots of numeric column pairs, preferring continuous columns and boosted by their correlation"""
+    axis_scores = np.where(
+        table["is_numeric"] & ~table["is_datetime"],
+        table["completeness"] * (0.5 + 0.5 * table["resolution"]) * np.where(table["is_continuous"], 1.0, 0.6),
+        0.0
+    )
+
+    # Correlations are known only for the pairs the profile reports
+    positions = {name: i for i, name in enumerate(table["names"])}
+    known: Dict[Tuple[int, int], float] = {}
+    for pair in correlations.get("top_pairs", []):
+        if pair["x"] in positions and pair["y"] in positions and pair["x"] != pair["y"]:
+            x, y = sorted((positions[pair["x"]], positions[pair["y"]]))
+            known[(x, y)] = pair["correlation"]
+
+    # The best distinct pairs by product lie among the limit + 1 best columns; reported pairs may rank higher through their boost
+    top = _top_indices(axis_scores, limit + 1)
+    candidates = {(int(min(x, y)), int(max(x, y))) for i, x in enumerate(top) for y in top[i + 1:]}
+    candidates.update(pair for pair in known if axis_scores[pair[0]] > 0 and axis_scores[pair[1]] > 0)
+    if not candidates:
+        return []
+
+    pairs = sorted(candidates)
+    x = np.array([pair[0] for pair in pairs])
+    y = np.array([pair[1] for pair in pairs])
+    strength = np.abs(np.array([known.get(pair, 0.0) for pair in pairs]))
+    scores = axis_scores[x] * axis_scores[y] * (0.5 + 0.5 * strength)
+    return [
+        {"chart_type": "scatter", "columns": [int(x[i]), int(y[i])], "score": float(scores[i]), "correlation": known.get(pairs[i])}
+        for i in _top_indices(scores, limit)
+    ]
+
+
+def _score_line(table: Dict[str, np.ndarray], correlations: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Line charts of a numeric column over a datetime column with many distinct timestamps"""
+    time_scores = np.where(
+        table["is_datetime"],
+        table["completeness"] * np.clip(np.log10(np.maximum(table["unique"], 1.0)) / 2, 0.0, 1.0),
+        0.0
+    )
+    value_scores = np.where(
+        table["is_numeric"] & ~table["is_datetime"],
+        table["completeness"] * (0.5 + 0.5 * table["dispersion"]) * np.where(table["is_continuous"], 1.0, 0.6),
+        0.0
+    )
+    return [
+        {"chart_type": "line", "columns": [time_col, value_col], "score": score}
+        for score, time_col, value_col in _top_pairs(time_scores, value_scores, limit)
+    ]
+
+
+def _score_box(table: Dict[str, np.ndarray], correlations: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Box plots of a continuous column grouped by a categorical column with 2 to 10 values"""
+    entropy = np.nan_to_num(table["entropy"], nan=DEFAULT_ENTROPY)
+    group_scores = np.where(
+        table["is_categorical"] & (table["unique"] >= 2) & (table["unique"] <= 10),
+        table["completeness"] * (0.5 + 0.5 * entropy),
+        0.0
+    )
+    value_scores = np.where(table["is_continuous"], table["completeness"] * (0.5 + 0.5 * table["dispersion"]), 0.0)
+    return [
+        {"chart_type": "box", "columns": [group_col, value_col], "score": score}
+        for score, group_col, value_col in _top_pairs(group_scores, value_scores, limit)
+    ]
+
+
+def _score_pie(table: Dict[str, np.ndarray], correlations: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Pie charts for categorical columns with 2 to 8 balanced values, fewer being better"""
+    entropy = np.nan_to_num(table["entropy"], nan=DEFAULT_ENTROPY)
+    eligible = table["is_categorical"] & (table["unique"] >= 2) & (table["unique"] <= 8)
+    scores = np.where(eligible, table["completeness"] * entropy * (1 - (table["unique"] - 2) / 12), 0.0)
+    return [{"chart_type": "pie", "columns": [i], "score": float(scores[i])} for i in _top_indices(scores, limit)]
+
+
+def _score_heatmap(table: Dict[str, np.ndarray], correlations: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """One correlation heatmap over the columns of the strongest pairs, scored by their mean strength"""
+    positions = {name: i for i, name in enumerate(table["names"])}
+    numeric = list(correlations.get("columns", table["names"][table["is_numeric"]].tolist()))
+    if len(numeric) < 3 or limit <= 0:
+        return []
+
+    pairs = correlations.get("top_pairs", [])
+    columns = list(dict.fromkeys([name for pair in pairs for name in (pair["x"], pair["y"])] + numeric))
+    columns = [positions[name] for name in columns if name in positions][:5]
+    strength = float(np.mean([abs(pair["correlation"]) for pair in pairs[:5]])) if pairs else 0.3
+    return [{"chart_type": "heatmap", "columns": columns, "score": strength}]
+
+
+# Scorers by chart type, called in CHART_TYPES order
+_SCORERS = {
+    "bar": _score_bar,
+    "histogram": _score_histogram,
+    "scatter": _score_scatter,
+    "line": _score_line,
+    "box": _score_box,
+    "pie": _score_pie,
+    "heatmap": _score_heatmap,
+}
+
+
+def rank_chart_candidates(
+    column_analysis: Dict[str, Dict[str, Any]],
+    correlations: Optional[Dict[str, Any]] = None,
+    summary_stats: Optional[Dict[str, Any]] = None,
+    top_k: int = SUGGESTION_TOP_K,
+    column_budget: int = SUGGESTION_COLUMN_BUDGET
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Score every single-column and column-pair chart and keep the best
+
+    Each chart type scores all of its candidates at once from array
+    statistics: completeness, cardinality, entropy, dispersion and
+    correlation. Pair charts combine only the best entries of each side,
+    so their cost does not grow with the square of the column count.
+    Each type keeps at most its CHART_TYPES limit, and a heap picks the
+    overall top_k. Chart types are scored in CHART_TYPES order while the
+    columns they score fit in the column budget, so the cutoff depends
+    only on the profile.
+
+    Args:
+        column_analysis: Column analysis of a dataset profile
+        correlations: Correlation summary of the profile
+        summary_stats: Summary statistics of the profile
+        top_k: Number of candidates to return
+        column_budget: Column scorings allowed over all chart types
+
+    Returns:
+        Tuple of (candidates, stats). Candidates are dicts with chart_type,
+        column names and score, best first. Stats hold the number of
+        candidates kept per type, the elapsed time and whether the budget
+        ran out.
+    """
+    start = time.perf_counter()
+    correlations = correlations or {}
+    table = column_arrays(column_analysis, summary_stats)
+
+    candidates: List[Dict[str, Any]] = []
+    scored: Dict[str, int] = {}
+    exhausted = False
+    columns = len(column_analysis)
+    for chart_type, settings in CHART_TYPES.items():
+        # The first chart type is always scored, so some suggestion comes back
+        if scored and (len(scored) + 1) * columns > column_budget:
+            exhausted = True
+            break
+        found = _SCORERS[chart_type](table, correlations, settings["limit"])
+        for candidate in found:
+            candidate["score"] = round(candidate["score"] * settings["weight"], 4)
+            candidate["columns"] = [str(table["names"][i]) for i in candidate["columns"]]
+        scored[chart_type] = len(found)
+        candidates.extend(found)
+
+    # Ties keep scoring order, so results are deterministic
+    ranked = heapq.nlargest(top_k, enumerate(candidates), key=lambda item: (item[1]["score"], -item[0]))
+    stats = {
+        "scored": scored,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        "budget_exhausted": exhausted,
+    }
+    return [candidate for _, candidate in ranked], stats
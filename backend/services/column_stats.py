@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List
+from utils.dtype_compaction import parse_datetime_text
+
+# Maximum number of columns reduced together, bounding the 2D working copy
+COLUMN_BLOCK_SIZE = 256
+
+# Quantile ranks reported as quartiles of numeric columns
+QUARTILE_RANKS = [0.25, 0.5, 0.75]
+
+
+def _numeric_block_stats(block: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Compute per-column statistics of a homogeneous 2D array in one pass each
+
+    NaN marks missing values. Distinct counts come from a single sort along
+    the row axis instead of one hash table per column.
+
+    Args:
+        block: Array of shape (rows, columns)
+
+    Returns:
+        Dictionary of per-column arrays: count, unique_count, mean, std,
+        min, max and quartiles (one row per rank in QUARTILE_RANKS)
+    """
+    is_float = block.dtype.kind in "fc"
+    valid = ~np.isnan(block) if is_float else np.ones(block.shape, dtype=bool)
+    count = valid.sum(axis=0)
+    has_values = count > 0
+
+    # Sorting puts NaN last, so a change counts only when the new value is valid
+    ordered = np.sort(block, axis=0)
+    if len(ordered) > 1:
+        changes = ordered[1:] != ordered[:-1]
+        if is_float:
+            changes &= ~np.isnan(ordered[1:])
+        unique_count = changes.sum(axis=0) + has_values
+    else:
+        unique_count = has_values.astype(np.int64)
+
+    values = block.astype(np.float64, copy=False)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid, values, 0.0).sum(axis=0) / count
+        centered = np.where(valid, values - mean, 0.0)
+        std = np.sqrt((centered ** 2).sum(axis=0) / (count - 1))
+    std = np.where(count > 1, std, np.nan)
+
+    # The last valid entry of each sorted column is its maximum
+    last_valid = np.maximum(count - 1, 0)
+    column_index = np.arange(block.shape[1])
+    minimum = ordered[0] if len(ordered) else np.zeros(block.shape[1], dtype=block.dtype)
+    maximum = ordered[last_valid, column_index] if len(ordered) else minimum
+
+    # Quartiles interpolate linearly between sorted valid entries, as np.quantile does
+    quartiles = np.full((len(QUARTILE_RANKS), block.shape[1]), np.nan)
+    if len(ordered):
+        for row, rank in enumerate(QUARTILE_RANKS):
+            position = last_valid * rank
+            lower = np.floor(position).astype(np.int64)
+            upper = np.ceil(position).astype(np.int64)
+            low_values = ordered[lower, column_index].astype(np.float64)
+            high_values = ordered[upper, column_index].astype(np.float64)
+            quartiles[row] = low_values + (high_values - low_values) * (position - lower)
+
+    return {
+        "count": count,
+        "unique_count": unique_count,
+        "mean": np.where(has_values, mean, np.nan),
+        "std": std,
+        "min": minimum,
+        "max": maximum,
+        "quartiles": quartiles,
+        "has_values": has_values,
+    }
+
+
+def compute_column_stats(df: pd.DataFrame, top_n: int = 0) -> Dict[Any, Dict[str, Any]]:
+    """
+    Compute per-column statistics for a whole DataFrame with few reductions
+
+    Null counts come from one whole-frame reduction. Numeric columns are
+    grouped by dtype and reduced in 2D blocks. Other columns get a distinct
+    count and, when top_n is set, their most frequent values.
+
+    Args:
+        df: Pandas DataFrame
+        top_n: Number of most frequent values to report for non-numeric
+            columns (0 skips value counting)
+
+    Returns:
+        Dictionary keyed by column name with dtype, null_count,
+        unique_count, is_numeric and, for numeric columns, mean, std,
+        min, max and quartiles (None when the column has no values)
+    """
+    null_counts = df.isna().sum().to_numpy()
+    dtypes = df.dtypes.tolist()
+    stats: Dict[Any, Dict[str, Any]] = {}
+    for position, col in enumerate(df.columns):
+        dtype = dtypes[position]
+        stats[col] = {
+            "dtype": str(dtype),
+            "null_count": int(null_counts[position]),
+            "is_numeric": pd.api.types.is_numeric_dtype(dtype),
+        }
+
+    # Group plain NumPy numeric columns by dtype so each block is homogeneous
+    positions_by_dtype: Dict[np.dtype, List[int]] = {}
+    other_positions: List[int] = []
+    for position, dtype in enumerate(dtypes):
+        if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+            positions_by_dtype.setdefault(dtype, []).append(position)
+        else:
+            other_positions.append(position)
+
+    for dtype, positions in positions_by_dtype.items():
+        for start in range(0, len(positions), COLUMN_BLOCK_SIZE):
+            block_positions = positions[start:start + COLUMN_BLOCK_SIZE]
+            block = df.iloc[:, block_positions].to_numpy(dtype=dtype)
+            block_stats = _numeric_block_stats(block)
+            for offset, position in enumerate(block_positions):
+                has_values = bool(block_stats["has_values"][offset])
+                stats[df.columns[position]].update({
+                    "unique_count": int(block_stats["unique_count"][offset]),
+                    "mean": float(block_stats["mean"][offset]) if has_values else None,
+                    "std": float(block_stats["std"][offset]) if has_values else None,
+                    "min": block_stats["min"][offset].item() if has_values else None,
+                    "max": block_stats["max"][offset].item() if has_values else None,
+                    "quartiles": block_stats["quartiles"][:, offset].tolist() if has_values else None,
+                })
+
+    for position in other_positions:
+        col = df.columns[position]
+        series = df.iloc[:, position]
+        is_text = dtypes[position] == object or isinstance(dtypes[position], pd.CategoricalDtype)
+        if top_n > 0 and is_text:
+            # One value count yields both the distinct count and the top values
+            counts = series.value_counts()
+            stats[col]["unique_count"] = int((counts > 0).sum())
+            stats[col]["top_values"] = counts.head(top_n).to_dict()
+        else:
+            stats[col]["unique_count"] = int(series.nunique())
+        if stats[col]["is_numeric"]:
+            # Nullable extension numerics fall back to per-column reductions
+            has_values = stats[col]["null_count"] < len(series)
+            for name in ("mean", "std", "min", "max"):
+                stats[col][name] = getattr(series, name)() if has_values else None
+            stats[col]["quartiles"] = series.quantile(QUARTILE_RANKS).astype(float).tolist() if has_values else None
+
+    return stats
+
+
+def detect_datetime_columns(df: pd.DataFrame) -> List[Any]:
+    """
+    Find columns holding dates or date-times
+
+    Typed datetime columns count as they are. Text columns count when all
+    their values parse with one date format, the test compaction applies
+    at ingest, so frames read without compaction, like the chunks of a
+    streamed CSV, are classified the same way.
+
+    Args:
+        df: Pandas DataFrame
+
+    Returns:
+        List of datetime column names
+    """
+    found = []
+    for position, dtype in enumerate(df.dtypes):
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            found.append(df.columns[position])
+        elif dtype == object and parse_datetime_text(df.iloc[:, position]) is not None:
+            found.append(df.columns[position])
+    return found
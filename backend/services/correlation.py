@@ -0,0 +1,393 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Tuple, Optional
+from sqlalchemy.orm import Session
+from models import Dataset
+from services.dataset_handle import open_dataset_handle
+from utils.columnar_store import store_exists
+from utils.file_utils import get_file_info
+from utils.result_cache import result_cache
+
+# Correlation methods accepted by the correlation endpoint
+CORRELATION_METHODS = ("pearson", "spearman")
+
+# Upper bound on columns a single correlation query may cover
+MAX_CORRELATION_COLUMNS = int(os.getenv("MAX_CORRELATION_COLUMNS", "1000"))
+
+# Cells converted to float at once; wide tables are processed in fewer rows per block
+CORRELATION_BLOCK_CELLS = int(os.getenv("CORRELATION_BLOCK_CELLS", str(4 * 1024 * 1024)))
+
+# Most correlated pairs stored with each dataset profile
+PROFILE_CORRELATION_PAIRS = 10
+
+
+def correlation_columns(frame: pd.DataFrame) -> List[Any]:
+    """Numeric columns that take part in correlations; booleans are left out"""
+    return [
+        col for col, dtype in frame.dtypes.items()
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+    ]
+
+
+class CorrelationAccumulator:
+    """
+    Pairwise-complete Pearson correlation built from matrix products
+
+    For every pair of columns, the count, sums, sums of squares and cross
+    products over the rows where both are present are accumulated with
+    one matrix product each, so hundreds of columns cost a few BLAS calls
+    instead of a loop over pairs. The sums only grow, so rows can be fed
+    in chunks. Rows are converted to floats in blocks of at most
+    CORRELATION_BLOCK_CELLS cells, which bounds the working copy however
+    wide the table is. Values are shifted by the first block's means to
+    keep the raw sums well conditioned.
+    """
+
+    def __init__(self, columns: List[Any]):
+        self.columns = list(columns)
+        width = len(self.columns)
+        self.rows = 0
+        self._shift: Optional[np.ndarray] = None
+        self._count = np.zeros((width, width))
+        self._sums = np.zeros((width, width))
+        self._squares = np.zeros((width, width))
+        self._products = np.zeros((width, width))
+
+    def _block_rows(self) -> int:
+        """Rows per block so a block holds at most CORRELATION_BLOCK_CELLS cells"""
+        return max(1, CORRELATION_BLOCK_CELLS // max(len(self.columns), 1))
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """
+        Fold rows into the sums
+
+        Args:
+            frame: DataFrame holding exactly the accumulator's columns, in order
+        """
+        block_rows = self._block_rows()
+        for start in range(0, len(frame), block_rows):
+            block = frame.iloc[start:start + block_rows].to_numpy(dtype=np.float64, na_value=np.nan)
+            self._update_block(block)
+        self.rows += len(frame)
+
+    def update_array(self, values: np.ndarray) -> None:
+        """
+        Fold rows of a float array into the sums, without copying it whole
+
+        Args:
+            values: Float array with one column per accumulator column, in order
+        """
+        block_rows = self._block_rows()
+        for start in range(0, len(values), block_rows):
+            self._update_block(values[start:start + block_rows])
+        self.rows += len(values)
+
+    def _update_block(self, block: np.ndarray) -> None:
+        """Add the sums of one float block to the running totals"""
+        valid = ~np.isnan(block)
+        if self._shift is None:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                shift = np.where(valid, block, 0.0).sum(axis=0) / valid.sum(axis=0)
+            self._shift = np.nan_to_num(shift)
+
+        values = np.where(valid, block - self._shift, 0.0)
+        self._products += values.T @ values
+        if valid.all():
+            # Without missing values every pair shares all rows
+            self._count += len(block)
+            self._sums += values.sum(axis=0)[:, None]
+            self._squares += (values * values).sum(axis=0)[:, None]
+        else:
+            mask = valid.astype(np.float64)
+            self._count += mask.T @ mask
+            self._sums += values.T @ mask
+            self._squares += (values * values).T @ mask
+
+    def matrix(self) -> np.ndarray:
+        """
+        Get the correlation matrix
+
+        Returns:
+            Square array of coefficients; NaN where a pair shares fewer
+            than two rows or either column is constant over them
+        """
+        count = self._count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # _sums[i, j] sums column i over the rows where column j is present
+            covariance = self._products - self._sums * self._sums.T / count
+            variance = self._squares - self._sums ** 2 / count
+            correlation = covariance / np.sqrt(variance * variance.T)
+        correlation[(count < 2) | ~(variance > 0) | ~(variance.T > 0)] = np.nan
+        return np.clip(correlation, -1.0, 1.0)
+
+
+def rank_columns(frame: pd.DataFrame) -> np.ndarray:
+    """
+    Rank every column of a frame into one preallocated float array
+
+    Columns are ranked one at a time with average ranks for ties, so
+    apart from the result only a single column's ranks exist at once.
+    Missing values stay NaN.
+
+    Args:
+        frame: DataFrame of numeric columns
+
+    Returns:
+        Float array of ranks with the frame's shape
+    """
+    ranks = np.empty((len(frame), len(frame.columns)), dtype=np.float64)
+    for position in range(len(frame.columns)):
+        ranks[:, position] = frame.iloc[:, position].rank(method="average").to_numpy(dtype=np.float64, na_value=np.nan)
+    return ranks
+
+
+def correlation_matrix(frame: pd.DataFrame, method: str = "pearson") -> np.ndarray:
+    """
+    Compute a correlation matrix over pairwise-complete rows
+
+    Spearman correlation is Pearson correlation of the ranks. Columns are
+    ranked once over their own non-missing values, so with missing values
+    the result can differ slightly from re-ranking every pair. The ranks
+    are the only full-size copy made; they are fed to the accumulator in
+    the same row blocks as Pearson's values.
+
+    Args:
+        frame: DataFrame of numeric columns
+        method: "pearson" or "spearman"
+
+    Returns:
+        Square array of coefficients in column order
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"method must be one of {', '.join(CORRELATION_METHODS)}")
+    accumulator = CorrelationAccumulator(list(frame.columns))
+    if method == "spearman":
+        accumulator.update_array(rank_columns(frame))
+    else:
+        accumulator.update(frame)
+    return accumulator.matrix()
+
+
+def top_correlated_pairs(matrix: np.ndarray, columns: List[Any], k: int) -> List[Dict[str, Any]]:
+    """
+    Find the k column pairs with the strongest correlation
+
+    Only the k strongest coefficients of the upper triangle are sorted;
+    the rest are set apart with a linear-time partition.
+
+    Args:
+        matrix: Square correlation matrix
+        columns: Column labels in matrix order
+        k: Number of pairs to return
+
+    Returns:
+        Pairs as {"x", "y", "correlation"} dicts, strongest absolute
+        correlation first; pairs without a coefficient are skipped
+    """
+    rows, cols = np.triu_indices(len(columns), k=1)
+    values = matrix[rows, cols]
+    defined = np.flatnonzero(~np.isnan(values))
+    if k <= 0 or len(defined) == 0:
+        return []
+
+    strength = np.abs(values[defined])
+    if k < len(defined):
+        candidates = np.argpartition(-strength, k - 1)[:k]
+    else:
+        candidates = np.arange(len(defined))
+    ranked = defined[candidates[np.argsort(-strength[candidates], kind="stable")]]
+
+    return [
+        {"x": str(columns[rows[i]]), "y": str(columns[cols[i]]), "correlation": float(values[i])}
+        for i in ranked
+    ]
+
+
+def summarize_correlations(
+    accumulator: CorrelationAccumulator,
+    columns: Optional[List[Any]] = None,
+    include_matrix: bool = False
+) -> Dict[str, Any]:
+    """
+    Build the correlation part of a dataset profile
+
+    Args:
+        accumulator: CorrelationAccumulator fed with the whole dataset
+        columns: Subset of the accumulator's columns to report, if not all
+        include_matrix: Also keep the full matrix, for datasets whose
+            columns are too costly to read again; skipped beyond
+            MAX_CORRELATION_COLUMNS columns
+
+    Returns:
+        Dictionary with the method, the columns and their strongest pairs,
+        plus the matrix when requested
+    """
+    matrix = accumulator.matrix()
+    if columns is not None:
+        keep = [accumulator.columns.index(col) for col in columns]
+        matrix = matrix[np.ix_(keep, keep)]
+    else:
+        columns = accumulator.columns
+    summary = {
+        "method": "pearson",
+        "columns": [str(col) for col in columns],
+        "top_pairs": top_correlated_pairs(matrix, columns, PROFILE_CORRELATION_PAIRS),
+    }
+    if include_matrix and len(columns) <= MAX_CORRELATION_COLUMNS:
+        summary["matrix"] = _matrix_to_lists(matrix)
+    return summary
+
+
+def profile_correlations(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Compute the correlation part of a dataset profile from a DataFrame
+
+    Args:
+        df: Pandas DataFrame
+
+    Returns:
+        Dictionary as returned by summarize_correlations
+    """
+    columns = correlation_columns(df)
+    accumulator = CorrelationAccumulator(columns)
+    accumulator.update(df.loc[:, ~df.columns.duplicated(keep="last")][columns])
+    return summarize_correlations(accumulator)
+
+
+def _matrix_to_lists(matrix: np.ndarray) -> List[List[Optional[float]]]:
+    """Convert a matrix to nested lists with None for undefined coefficients"""
+    return [[None if np.isnan(value) else float(value) for value in row] for row in matrix]
+
+
+def _correlation_from_profile(profile: Dict[str, Any], method: str, columns: List[str], top_k: int) -> Dict[str, Any]:
+    """
+    Answer a Pearson query from the matrix kept in a streamed dataset's profile
+
+    Raises:
+        ValueError: If the method is not Pearson, the profile kept no
+            matrix, or a column is not among the profile's numeric columns
+    """
+    correlations = profile["correlations"]
+    if method != "pearson":
+        raise ValueError(f"{method} needs every value of the columns and is not available for large CSV datasets; use pearson")
+    if "matrix" not in correlations:
+        raise ValueError("this dataset's profile has no correlation matrix")
+
+    positions = {name: position for position, name in enumerate(correlations["columns"])}
+    unknown = [name for name in columns if name not in positions]
+    if unknown:
+        raise ValueError(f"column(s) not numeric: {', '.join(unknown)}")
+
+    keep = [positions[name] for name in columns]
+    full = np.array(correlations["matrix"], dtype=np.float64).reshape(len(positions), len(positions))
+    matrix = full[np.ix_(keep, keep)]
+    return {
+        "method": method,
+        "columns": list(columns),
+        "matrix": _matrix_to_lists(matrix),
+        "top_pairs": top_correlated_pairs(matrix, list(columns), top_k),
+        "metadata": {"rows": profile["rows"], "columns": len(columns), "source": "profile"},
+    }
+
+
+def get_correlation_matrix(
+    db: Session,
+    dataset_id: int,
+    method: str = "pearson",
+    columns: Optional[List[str]] = None,
+    top_k: int = 10
+) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Compute the correlation matrix of a dataset's numeric columns, reusing cached results
+
+    Large CSV datasets without a columnar store are answered from the
+    Pearson matrix their profile accumulated at ingest, so the file is
+    not read again; Spearman is refused for them.
+
+    Args:
+        db: Database session
+        dataset_id: ID of the dataset
+        method: "pearson" or "spearman"
+        columns: Numeric columns to correlate (default: every numeric column)
+        top_k: Number of strongest pairs to report
+
+    Returns:
+        Tuple of (success, message, result). Invalid queries return a
+        message starting with "Invalid correlation".
+    """
+    try:
+        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+        if not dataset:
+            return False, "Dataset not found", None
+
+        if method not in CORRELATION_METHODS:
+            return False, f"Invalid correlation: method must be one of {', '.join(CORRELATION_METHODS)}", None
+
+        file_info = get_file_info(str(dataset.file_path))
+        if not file_info["exists"]:
+            return False, "Dataset file not found on disk", None
+
+        version = (file_info["modified"], file_info["size"])
+        key = ("correlation", method, tuple(columns) if columns else None, top_k)
+        cached = result_cache.get(str(dataset.file_path), key, version)
+        if cached is not None:
+            return True, "Correlation matrix loaded from cache", dict(cached, metadata=dict(cached["metadata"], cached=True))
+
+        # Imported here since the profiling modules import this one
+        from services.profiling import get_dataset_profile
+        from services.streaming_profile import should_stream_profile
+
+        profile = None
+        if columns is None:
+            # Numeric columns come from the stored profile, so nothing else is read
+            success, message, profile = get_dataset_profile(db, dataset)
+            if not success or profile is None:
+                return False, message, None
+            columns = profile["correlations"]["columns"]
+
+        if len(columns) > MAX_CORRELATION_COLUMNS:
+            return False, f"Invalid correlation: at most {MAX_CORRELATION_COLUMNS} columns are supported", None
+
+        file_path = str(dataset.file_path)
+        if should_stream_profile(file_path) and not store_exists(file_path):
+            # Reading every numeric column of a large CSV would load most of it; its profile kept the Pearson matrix
+            if profile is None:
+                success, message, profile = get_dataset_profile(db, dataset)
+                if not success or profile is None:
+                    return False, message, None
+            try:
+                result = _correlation_from_profile(profile, method, columns, top_k)
+            except ValueError as e:
+                return False, f"Invalid correlation: {str(e)}", None
+        else:
+            success, message, handle = open_dataset_handle(file_path)
+            if not success or handle is None:
+                return False, f"Error reading dataset: {message}", None
+
+            try:
+                frame = handle.select(columns) if columns else pd.DataFrame()
+                non_numeric = [str(col) for col in frame.columns if col not in correlation_columns(frame)]
+                if non_numeric:
+                    raise ValueError(f"column(s) not numeric: {', '.join(non_numeric)}")
+            except ValueError as e:
+                return False, f"Invalid correlation: {str(e)}", None
+
+            matrix = correlation_matrix(frame, method)
+            names = [str(col) for col in frame.columns]
+            result = {
+                "method": method,
+                "columns": names,
+                "matrix": _matrix_to_lists(matrix),
+                "top_pairs": top_correlated_pairs(matrix, names, top_k),
+                "metadata": {"rows": len(frame), "columns": len(names)},
+            }
+
+        result_cache.put(str(dataset.file_path), key, version, result)
+        return True, "Correlation matrix computed", dict(result, metadata=dict(result["metadata"], cached=False))
+
+    except Exception as e:
+        return False, f"Error computing correlations: {str(e)}", None
@@ -1,32 +1,43 @@
 import json
+import os
+import numpy as np
 import pandas as pd
-from typing import Tuple, Dict, Any, List, Optional
+from datetime import datetime
+from typing import Tuple, Dict, Any, List, Optional, cast
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 from models import Dataset, DataRecord
-from schemas import DatasetCreate, DataRecordCreate, SummaryResponse
-from utils.file_utils import read_file_with_pandas
-from pandas.api.types import is_categorical_dtype  # type: ignore
-from sqlalchemy.orm import Session
-from typing import cast
-from datetime import datetime
+from schemas import SummaryResponse
+from utils.columnar_store import read_datetime_formats
+from utils.dtype_compaction import format_datetime_columns
+from utils.file_utils import read_file_with_pandas, read_file_rows
+from utils.dataframe_cache import get_cached_dataset_frame
+from services.column_stats import compute_column_stats, detect_datetime_columns
+from utils.metrics import span
 
+# Number of rows kept as DataRecord rows per dataset (0 or less keeps every row)
+STORED_RECORDS_LIMIT = int(os.getenv("STORED_RECORDS_LIMIT", "1000"))
+# Rows serialized and inserted per executemany batch
+RECORD_INSERT_BATCH_SIZE = int(os.getenv("RECORD_INSERT_BATCH_SIZE", "10000"))
 
-def process_uploaded_file(file_path: str, filename: str) -> Tuple[bool, str, Dict[str, Any]]:
+def process_uploaded_file(file_path: str, filename: str, df: Optional[pd.DataFrame] = None) -> Tuple[bool, str, Dict[str, Any]]:
     """
     Process uploaded file and extract basic information
     
     Args:
         file_path: Path to the uploaded file
         filename: Original filename
+        df: Already parsed DataFrame; the file is read when omitted
         
     Returns:
         Tuple of (success, message, data_info)
     """
     try:
-        # Read file with pandas
-        success, message, df = read_file_with_pandas(file_path)
-        if not success or df is None:
-            return False, message, {}
+        # Read file with pandas unless the caller already parsed it
+        if df is None:
+            success, message, df = read_file_with_pandas(file_path)
+            if not success or df is None:
+                return False, message, {}
         
         # Extract basic information
         data_info = {
@@ -52,37 +63,50 @@ def get_summary_stats(df: pd.DataFrame) -> Dict[str, Any]:
     Args:
         df: Pandas DataFrame
         
+    Returns:
+        Dictionary containing summary statistics
+    """
+    try:
+        # Compute all per-column statistics in whole-frame reductions
+        column_stats = compute_column_stats(df, top_n=5)
+        return build_summary_stats(column_stats, len(df), len(df.columns))
+    
+    except Exception as e:
+        return {"error": f"Error generating summary: {str(e)}"}
+
+def build_summary_stats(column_stats: Dict[Any, Dict[str, Any]], rows: int, columns: int) -> Dict[str, Any]:
+    """
+    Assemble summary statistics from precomputed per-column statistics
+    
+    Args:
+        column_stats: Per-column statistics as returned by compute_column_stats
+            or the streaming profiler
+        rows: Number of rows in the dataset
+        columns: Number of columns in the dataset
+        
     Returns:
         Dictionary containing summary statistics
     """
     try:
         summary = {
-            "shape": {"rows": len(df), "columns": len(df.columns)},
+            "shape": {"rows": rows, "columns": columns},
             "column_info": {},
-            "missing_data": df.isnull().sum().to_dict(),
-            "data_types": df.dtypes.astype(str).to_dict(),
+            "missing_data": {col: stats["null_count"] for col, stats in column_stats.items()},
+            "data_types": {col: stats["dtype"] for col, stats in column_stats.items()},
         }
         
-        # Analyze each column
-        for col in df.columns:
+        for col, stats in column_stats.items():
             col_info = {
-                "dtype": str(df[col].dtype),
-                "null_count": df[col].isnull().sum(),
-                "unique_count": df[col].nunique(),
+                "dtype": stats["dtype"],
+                "null_count": stats["null_count"],
+                "unique_count": stats["unique_count"],
             }
             
             # Add statistics based on data type
-            if pd.api.types.is_numeric_dtype(df[col]):
-                col_info.update({
-                    "mean": df[col].mean() if not df[col].isnull().all() else None,
-                    "std": df[col].std() if not df[col].isnull().all() else None,
-                    "min": df[col].min() if not df[col].isnull().all() else None,
-                    "max": df[col].max() if not df[col].isnull().all() else None,
-                })
-            elif is_categorical_dtype(df[col]) or df[col].dtype == 'object':
-                # Get top categories
-                top_values = df[col].value_counts().head().to_dict()
-                col_info["top_values"] = top_values
+            if stats["is_numeric"]:
+                col_info.update({name: stats[name] for name in ("mean", "std", "min", "max", "quartiles")})
+            elif "top_values" in stats:
+                col_info["top_values"] = stats["top_values"]
             
             summary["column_info"][col] = col_info
         
@@ -91,54 +115,142 @@ def get_summary_stats(df: pd.DataFrame) -> Dict[str, Any]:
     except Exception as e:
         return {"error": f"Error generating summary: {str(e)}"}
 
-def store_dataset_in_db(db: Session, data_info: Dict[str, Any]) -> Tuple[bool, str, int]:
+def get_stored_records_count(total_rows: int) -> int:
+    """
+    Get how many rows of a dataset are kept as DataRecord rows
+    
+    Args:
+        total_rows: Number of rows in the dataset
+        
+    Returns:
+        Number of leading rows to store
+    """
+    if STORED_RECORDS_LIMIT <= 0:
+        return total_rows
+    return min(STORED_RECORDS_LIMIT, total_rows)
+
+def store_dataset_in_db(
+    db: Session,
+    data_info: Dict[str, Any],
+    df: Optional[pd.DataFrame] = None,
+    json_rows: Optional[List[str]] = None
+) -> Tuple[bool, str, int]:
     """
     Store dataset information in database
     
     Args:
         db: Database session
         data_info: Dictionary containing dataset information
+        df: Already parsed DataFrame; the dataset is loaded when omitted
+        json_rows: Records already serialized by serialize_records; when
+            given, df is not needed
         
     Returns:
         Tuple of (success, message, dataset_id)
     """
     try:
-        # Create dataset record
+        # Create dataset record; flush assigns its id inside the transaction
         dataset = Dataset(
             filename=data_info["filename"],
-            file_path=data_info["file_path"]
+            file_path=data_info["file_path"],
+            content_hash=data_info.get("content_hash")
         )
         db.add(dataset)
-        db.commit()
-        db.refresh(dataset)
-        
-        # Read the actual data file again to store records
-        success, message, df = read_file_with_pandas(data_info["file_path"])
-        if not success or df is None:
-            return False, f"Error reading file for storage: {message}", 0
-        
-        # Store data records (limit to first 1000 rows for performance)
-        records_to_store = min(1000, len(df))
-        for idx, row in df.head(records_to_store).iterrows():
-            record_data = row.to_dict()
-            # Handle NaN values
-            for key, value in record_data.items():
-                if pd.isna(value):
-                    record_data[key] = None
-            
-            data_record = DataRecord(
-                dataset_id=dataset.id,
-                json_data=json.dumps(record_data, default=str)
-            )
-            db.add(data_record)
+        db.flush()
+        dataset_id = cast(int, dataset.id)
         
-        db.commit()
-        return True, f"Dataset stored successfully with {records_to_store} records", cast(int, dataset.id)
+        # Load the dataset again to store records unless it was passed in
+        if json_rows is None and df is None:
+            success, message, df = get_cached_dataset_frame(data_info["file_path"])
+            if not success or df is None:
+                db.rollback()
+                return False, f"Error reading file for storage: {message}", 0
+        
+        records_to_store = len(json_rows) if json_rows is not None else get_stored_records_count(len(df))
+        datetime_formats = read_datetime_formats(data_info["file_path"]) if json_rows is None else {}
+        
+        # Store data records in executemany batches, committed once together with the dataset
+        for start in range(0, records_to_store, RECORD_INSERT_BATCH_SIZE):
+            stop = min(start + RECORD_INSERT_BATCH_SIZE, records_to_store)
+            if json_rows is not None:
+                batch = json_rows[start:stop]
+            else:
+                with span("serialize"):
+                    batch = serialize_records(df.iloc[start:stop], datetime_formats)
+            with span("db_insert"):
+                db.execute(
+                    insert(DataRecord),
+                    [{"dataset_id": dataset_id, "json_data": json_data} for json_data in batch]
+                )
+        
+        with span("db_insert"):
+            db.commit()
+        return True, f"Dataset stored successfully with {records_to_store} records", dataset_id
     
     except Exception as e:
         db.rollback()
         return False, f"Error storing dataset: {str(e)}", 0
 
+def _float_fragments(key: str, values: pd.Series) -> List[str]:
+    """Encode a float column as "key":value fragments with round-trip precision"""
+    arr = values.to_numpy(dtype=getattr(values.dtype, "numpy_dtype", values.dtype), na_value=np.nan)
+    # numpy formats floats with the shortest text that parses back to the same value
+    text = np.where(np.isfinite(arr), arr.astype(str), "null")
+    return [key + value for value in text.tolist()]
+
+def _frame_fragments(df: pd.DataFrame) -> List[str]:
+    """Encode a frame's rows with pandas' JSON writer, without the enclosing braces"""
+    ndjson = df.to_json(orient="records", lines=True, date_format="iso", default_handler=str)
+    return [line[1:-1] for line in ndjson.split("\n") if line]
+
+def serialize_records(df: pd.DataFrame, datetime_formats: Optional[Dict[str, str]] = None) -> List[str]:
+    """
+    Serialize every row of a DataFrame to a JSON object string
+    
+    Serialization runs over the whole frame in pandas' JSON writer, which
+    also turns NaN and NaT into null. Datetime columns are written in the
+    format they were parsed from where it is known, and in ISO format
+    otherwise. The writer rounds floats to 15 significant digits, so
+    float columns are formatted by numpy instead and spliced in, keeping
+    every value exactly as stored.
+    
+    Args:
+        df: Pandas DataFrame
+        datetime_formats: Format per datetime column, from the dataset's
+            compaction report
+        
+    Returns:
+        List with one JSON string per row
+    """
+    if df.empty:
+        return []
+    if datetime_formats:
+        df = format_datetime_columns(df, datetime_formats)
+    
+    # Row dicts keep the last of duplicated column names; the JSON writer refuses them
+    if not df.columns.is_unique:
+        df = df.loc[:, ~df.columns.duplicated(keep="last")]
+    
+    is_float = [pd.api.types.is_float_dtype(dtype) for dtype in df.dtypes]
+    if not any(is_float):
+        ndjson = df.to_json(orient="records", lines=True, date_format="iso", default_handler=str)
+        return [line for line in ndjson.split("\n") if line]
+    
+    # Encode runs of non-float columns in one writer call each, keeping the column order
+    columns: List[List[str]] = []
+    start = 0
+    for position in range(len(df.columns) + 1):
+        if position < len(df.columns) and not is_float[position]:
+            continue
+        if start < position:
+            columns.append(_frame_fragments(df.iloc[:, start:position]))
+        if position < len(df.columns):
+            key = json.dumps(str(df.columns[position])) + ":"
+            columns.append(_float_fragments(key, df.iloc[:, position]))
+        start = position + 1
+    
+    return ["{" + ",".join(parts) + "}" for parts in zip(*columns)]
+
 def get_dataset_summary(db: Session, dataset_id: int) -> Tuple[bool, str, Optional[SummaryResponse]]:
     """
     Get summary information for a dataset
@@ -152,28 +264,28 @@ def get_dataset_summary(db: Session, dataset_id: int) -> Tuple[bool, str, Option
     """
     try:
         # Get dataset
-        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+        with span("db_query"):
+            dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
         if not dataset:
             return False, "Dataset not found", None
         
-        # Read file to get current statistics
-        file_path: str = str(dataset.file_path)
-        success, message, df = read_file_with_pandas(file_path)
-        if not success or df is None:
-            return False, f"Error reading dataset file: {message}", None
-        
-        # Generate insights
-        insights = generate_basic_insights(df)
-        summary = SummaryResponse(
-            dataset_id=int(getattr(dataset, "id", 0)),
-            filename=str(dataset.filename),
-            rows=len(df),
-            columns=len(df.columns),
-            column_names=df.columns.tolist(),
-            chart_count=min(len(df.columns), 5),  # Basic estimation
-            insights=insights,
-            upload_date=getattr(dataset, "upload_date", datetime.now())
-        )
+        # Read the profile computed at ingest instead of re-profiling the file
+        from services.profiling import get_dataset_profile
+        success, message, profile = get_dataset_profile(db, dataset)
+        if not success or profile is None:
+            return False, message, None
+        
+        with span("serialize"):
+            summary = SummaryResponse(
+                dataset_id=int(getattr(dataset, "id", 0)),
+                filename=str(dataset.filename),
+                rows=profile["rows"],
+                columns=profile["columns"],
+                column_names=profile["column_names"],
+                chart_count=min(profile["columns"], 5),  # Basic estimation
+                insights=profile["basic_insights"],
+                upload_date=getattr(dataset, "upload_date", datetime.now())
+            )
         
         
         return True, "Summary generated successfully", summary
@@ -193,32 +305,158 @@ def get_dataset_data(db: Session, dataset_id: int, limit: int = 100) -> Tuple[bo
     Returns:
         Tuple of (success, message, data_list)
     """
+    success, message, page = get_dataset_page(db, dataset_id, limit)
+    return success, message, page["data"] if page else []
+
+# Prefix of cursors that continue past the stored records by row position
+ROW_CURSOR_PREFIX = "row:"
+
+def _parse_page_cursor(cursor: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Split a page cursor into a record id or a row position
+
+    Returns:
+        Tuple of (record_id, row_position); at most one is set
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if cursor is None or cursor == "":
+        return None, None
+    if cursor.startswith(ROW_CURSOR_PREFIX):
+        position = int(cursor[len(ROW_CURSOR_PREFIX):])
+        if position < 0:
+            raise ValueError(cursor)
+        return None, position
+    return int(cursor), None
+
+def _read_row_page(file_path: str, start: int, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+    """Read up to limit rows from a row position, and whether more rows follow"""
+    with span("columnar_read"):
+        rows = read_file_rows(file_path, start, start + limit + 1)
+    with span("serialize"):
+        data = [json.loads(line) for line in serialize_records(rows.head(limit), read_datetime_formats(file_path))]
+    return data, len(rows) > limit
+
+def get_dataset_page(
+    db: Session,
+    dataset_id: int,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Get one page of a dataset's rows using keyset pagination
+    
+    Pages are served from the stored records first, ordered by record id
+    and starting after the cursor, so each page is a range scan of the
+    (dataset_id, id) index and costs the same however deep the client
+    has paged. Rows beyond the stored records are read from the dataset
+    file by row position, with cursors of the form "row:<position>".
+    
+    Args:
+        db: Database session
+        dataset_id: ID of the dataset
+        limit: Maximum number of records to return
+        cursor: next_cursor of the previous page (None for the first page)
+        
+    Returns:
+        Tuple of (success, message, page) where page holds data,
+        next_cursor (None on the last page) and has_more. A malformed
+        cursor returns a message starting with "Invalid cursor".
+    """
     try:
-        # Get dataset
-        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
-        if not dataset:
-            return False, "Dataset not found", []
+        try:
+            record_cursor, row_cursor = _parse_page_cursor(cursor)
+        except ValueError:
+            return False, f"Invalid cursor: {cursor}", None
+        
+        with span("db_query"):
+            # Get dataset
+            dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+            if not dataset:
+                return False, "Dataset not found", None
+            
+            rows = []
+            if row_cursor is None:
+                # Fetch one extra row to learn whether another page follows
+                query = db.query(DataRecord.id, DataRecord.json_data).filter(DataRecord.dataset_id == dataset_id)
+                if record_cursor is not None:
+                    query = query.filter(DataRecord.id > record_cursor)
+                rows = query.order_by(DataRecord.id).limit(limit + 1).all()
         
-        # Get data records from database
-        records = db.query(DataRecord).filter(
-            DataRecord.dataset_id == dataset_id
-        ).limit(limit).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
         
         # Convert to list of dictionaries
         data_list = []
-        for record in records:
-            try:
+        with span("serialize"):
+            for _, json_data in rows:
+                try:
+                    data_list.append(json.loads(json_data))
+                except json.JSONDecodeError:
+                    continue
+        next_cursor: Optional[str] = str(rows[-1][0]) if has_more else None
+        
+        # Stored records are the dataset's leading rows; continue after them from the file
+        if not has_more:
+            if row_cursor is None:
+                with span("db_query"):
+                    row_cursor = db.query(func.count(DataRecord.id)).filter(DataRecord.dataset_id == dataset_id).scalar()
+            # The profile's row count saves reading the file when every row is stored
+            total_rows = dataset.profile.rows if dataset.profile is not None else None
+            if total_rows is None or row_cursor < total_rows:
+                if len(rows) < limit or total_rows is None:
+                    file_rows, has_more = _read_row_page(str(dataset.file_path), row_cursor, limit - len(rows))
+                else:
+                    # The stored records filled the page and the file has rows after them
+                    file_rows, has_more = [], True
+                data_list.extend(file_rows)
+                next_cursor = f"{ROW_CURSOR_PREFIX}{row_cursor + len(file_rows)}" if has_more else None
+        
+        return True, f"Retrieved {len(data_list)} records", {
+            "data": data_list,
+            "next_cursor": next_cursor,
+            "has_more": has_more
+        }
+    
+    except Exception as e:
+        return False, f"Error retrieving data: {str(e)}", None
 
-                json_str = str(record.json_data)
-                data = json.loads(json_str)
-                data_list.append(data)
-            except json.JSONDecodeError:
-                continue
+def delete_dataset_with_files(db: Session, dataset_id: int) -> Tuple[bool, str]:
+    """
+    Delete a dataset and its database rows
+    
+    The file on disk, its columnar store and cached results are removed
+    only when no other dataset shares the file.
+    
+    Args:
+        db: Database session
+        dataset_id: ID of the dataset
         
-        return True, f"Retrieved {len(data_list)} records", data_list
+    Returns:
+        Tuple of (success, message)
+    """
+    try:
+        # Get dataset
+        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+        if not dataset:
+            return False, "Dataset not found"
+        
+        file_path = str(dataset.file_path)
+        
+        # Delete from database (cascade will handle related records)
+        db.delete(dataset)
+        db.commit()
+        
+        # Imported here since dataset_files depends on the profiling module, which imports this one
+        from services.dataset_files import release_dataset_file
+        release_dataset_file(file_path, db)
+        
+        return True, "Dataset deleted successfully"
     
     except Exception as e:
-        return False, f"Error retrieving data: {str(e)}", []
+        db.rollback()
+        return False, f"Error deleting dataset: {str(e)}"
 
 def generate_basic_insights(df: pd.DataFrame) -> List[str]:
     """
@@ -227,6 +465,41 @@ def generate_basic_insights(df: pd.DataFrame) -> List[str]:
     Args:
         df: Pandas DataFrame
         
+    Returns:
+        List of insight strings
+    """
+    try:
+        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
+        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+        date_columns = detect_datetime_columns(df)
+        
+        return build_basic_insights(
+            len(df), len(df.columns), int(df.isnull().sum().sum()),
+            numeric_cols, categorical_cols, date_columns
+        )
+    
+    except Exception:
+        return ["Basic dataset analysis completed"]
+
+def build_basic_insights(
+    rows: int,
+    columns: int,
+    missing_cells: int,
+    numeric_cols: List[Any],
+    categorical_cols: List[Any],
+    date_columns: List[Any]
+) -> List[str]:
+    """
+    Generate basic insights from precomputed dataset facts
+    
+    Args:
+        rows: Number of rows
+        columns: Number of columns
+        missing_cells: Number of missing values across all columns
+        numeric_cols: Numeric columns
+        categorical_cols: Object and categorical columns
+        date_columns: Columns holding dates or date-times
+        
     Returns:
         List of insight strings
     """
@@ -234,10 +507,10 @@ def generate_basic_insights(df: pd.DataFrame) -> List[str]:
     
     try:
         # Basic statistics
-        insights.append(f"Dataset contains {len(df)} rows and {len(df.columns)} columns")
+        insights.append(f"Dataset contains {rows} rows and {columns} columns")
         
         # Check for missing data
-        missing_pct = (df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
+        missing_pct = (missing_cells / (rows * columns)) * 100
         if missing_pct > 10:
             insights.append(f"Dataset has {missing_pct:.1f}% missing values")
         elif missing_pct > 0:
@@ -246,9 +519,6 @@ def generate_basic_insights(df: pd.DataFrame) -> List[str]:
             insights.append("Dataset has no missing values")
         
         # Analyze column types
-        numeric_cols = df.select_dtypes(include=['number']).columns.tolist()
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
-        
         if numeric_cols:
             insights.append(f"Found {len(numeric_cols)} numeric columns: {', '.join(numeric_cols[:3])}{'...' if len(numeric_cols) > 3 else ''}")
         
@@ -256,15 +526,8 @@ def generate_basic_insights(df: pd.DataFrame) -> List[str]:
             insights.append(f"Found {len(categorical_cols)} categorical columns: {', '.join(categorical_cols[:3])}{'...' if len(categorical_cols) > 3 else ''}")
         
         # Check for potential date columns
-        date_columns = []
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                sample_values = df[col].dropna().astype(str).head()
-                if any('/' in str(val) or '-' in str(val) for val in sample_values):
-                    date_columns.append(col)
-        
         if date_columns:
-            insights.append(f"Potential date columns detected: {', '.join(date_columns[:2])}")
+            insights.append(f"Date columns detected: {', '.join(date_columns[:2])}")
         
     except Exception:
         insights.append("Basic dataset analysis completed")
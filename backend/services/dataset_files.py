@@ -0,0 +1,150 @@
+import os
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import Dataset, DatasetProfile
+from services.profiling import PROFILE_VERSION
+from utils.dataframe_cache import dataframe_cache
+from utils.file_utils import cleanup_dataset_files, hash_file, upload_claims
+from utils.http_cache import RESPONSE_FORMAT_VERSION
+from utils.result_cache import result_cache
+
+
+def count_file_references(db: Session, file_path: str) -> int:
+    """
+    Count the datasets backed by a file
+
+    Args:
+        db: Database session
+        file_path: Path to the uploaded file
+
+    Returns:
+        Number of Dataset rows pointing at the file
+    """
+    return db.query(Dataset).filter(Dataset.file_path == file_path).count()
+
+
+def find_profiled_duplicate(db: Session, content_hash: str) -> Optional[Dataset]:
+    """
+    Find a dataset with the given content whose profile is current
+
+    Args:
+        db: Database session
+        content_hash: SHA-256 of the file content
+
+    Returns:
+        The oldest such dataset, or None
+    """
+    return (
+        db.query(Dataset)
+        .join(DatasetProfile, DatasetProfile.dataset_id == Dataset.id)
+        .filter(Dataset.content_hash == content_hash, DatasetProfile.version == PROFILE_VERSION)
+        .order_by(Dataset.id)
+        .first()
+    )
+
+
+def get_dataset_version(db: Session, dataset_id: int) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Get what identifies the current content of a dataset, without loading it
+
+    Datasets never change after upload, so their content hash and upload
+    time, together with PROFILE_VERSION and RESPONSE_FORMAT_VERSION,
+    which change whenever derived data is computed or written
+    differently, determine every summary, page and suggestion built from
+    them. The upload time tells apart a dataset that reuses the id of a
+    deleted one with the same content.
+
+    Args:
+        db: Database session
+        dataset_id: ID of the dataset
+
+    Returns:
+        Tuple of (success, message, version) where version holds
+        content_version and last_modified (the naive UTC upload time)
+    """
+    row = db.query(Dataset.upload_date, Dataset.content_hash).filter(Dataset.id == dataset_id).first()
+    if row is None:
+        return False, "Dataset not found", None
+
+    # Datasets whose file was missing when hashes were backfilled have only their upload time
+    uploaded = row.upload_date.strftime("%Y%m%d%H%M%S%f")
+    content = f"{row.content_hash}-{uploaded}" if row.content_hash else uploaded
+    return True, "Dataset version found", {
+        "content_version": f"{content}-p{PROFILE_VERSION}-r{RESPONSE_FORMAT_VERSION}",
+        "last_modified": row.upload_date,
+    }
+
+
+def release_dataset_file(file_path: str, db: Optional[Session] = None) -> bool:
+    """
+    Remove a dataset file once nothing refers to it any more
+
+    Several datasets can share one file. The file, its columnar store
+    and its cache entries are removed only when no Dataset row points at
+    it, no ingestion job is still working on it and no new upload has
+    claimed it. The check and the removal run under the upload claims'
+    lock, so an upload of the same content waits for the removal and then
+    writes a fresh copy.
+
+    Args:
+        file_path: Path to the uploaded file
+        db: Database session; a short-lived one is opened when omitted
+
+    Returns:
+        True if the file was removed, False if it is still referenced
+    """
+    # Imported here since the jobs module depends on this one
+    from services.jobs import job_registry
+
+    with upload_claims.lock:
+        if upload_claims.is_claimed(file_path) or job_registry.has_active_job(file_path):
+            return False
+
+        session = db if db is not None else SessionLocal()
+        try:
+            if count_file_references(session, file_path) > 0:
+                return False
+        finally:
+            if db is None:
+                session.close()
+
+        dataframe_cache.invalidate(file_path)
+        result_cache.invalidate_dataset(file_path)
+        return cleanup_dataset_files(file_path)
+
+
+def backfill_content_hashes(db: Session) -> int:
+    """
+    Hash the files of datasets stored before uploads were content-addressed
+
+    A dataset whose content matches an already hashed dataset is pointed
+    at that dataset's file, and its own copy is released.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of datasets that were hashed
+    """
+    hashed = 0
+    for dataset in db.query(Dataset).filter(Dataset.content_hash.is_(None)).order_by(Dataset.id).all():
+        file_path = str(dataset.file_path)
+        if not os.path.exists(file_path):
+            continue
+
+        dataset.content_hash = hash_file(file_path)
+        canonical = (
+            db.query(Dataset)
+            .filter(Dataset.content_hash == dataset.content_hash, Dataset.id != dataset.id)
+            .order_by(Dataset.id)
+            .first()
+        )
+        if canonical is not None and canonical.file_path != file_path and os.path.exists(str(canonical.file_path)):
+            dataset.file_path = canonical.file_path
+        db.commit()
+        hashed += 1
+
+        if dataset.file_path != file_path:
+            release_dataset_file(file_path, db)
+    return hashed
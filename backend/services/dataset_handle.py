@@ -0,0 +1,164 @@
+import pandas as pd
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Optional
+from utils.columnar_store import read_store_manifest, read_columnar_store
+from utils.dataframe_cache import dataframe_cache
+from utils.file_utils import load_dataset_frame, get_file_info
+
+
+class DatasetHandle:
+    """
+    Lazy view of a dataset that loads columns only when they are asked for
+
+    The schema is read up front from the columnar store manifest, or from
+    the CSV header when the dataset has no store yet. Columns are read on
+    first access, through memory maps when there is a store, and kept in
+    the handle so later accesses are free. A handle is meant for a single
+    request or task and is not shared between threads.
+    """
+
+    def __init__(self, file_path: str, frame: Optional[pd.DataFrame] = None):
+        """
+        Args:
+            file_path: Path to the original uploaded file
+            frame: Already loaded DataFrame of the whole dataset, if any;
+                columns are then taken from it instead of read from disk
+        """
+        self.file_path = file_path
+        self._frame = frame
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._loaded: Dict[Any, pd.Series] = {}
+
+        if frame is not None:
+            self._labels = list(frame.columns)
+            self._dtypes: Dict[Any, Optional[str]] = {col: str(dtype) for col, dtype in frame.dtypes.items()}
+            self._rows: Optional[int] = len(frame)
+            return
+
+        self._manifest = read_store_manifest(file_path)
+        if self._manifest is None and Path(file_path).suffix.lower() != ".csv":
+            # Without an incremental parser the whole file is read once, which writes its store
+            success, message, _ = load_dataset_frame(file_path)
+            if not success:
+                raise OSError(message)
+            self._manifest = read_store_manifest(file_path)
+
+        if self._manifest is not None:
+            self._labels = [entry["name"] for entry in self._manifest["columns"]]
+            self._dtypes = {entry["name"]: entry["dtype"] for entry in self._manifest["columns"]}
+            self._rows = self._manifest["rows"]
+        else:
+            # A CSV header is enough for the schema; dtypes are known once a column is read
+            self._labels = list(pd.read_csv(file_path, nrows=0).columns)
+            self._dtypes = {col: None for col in self._labels}
+            self._rows = None
+
+    @property
+    def columns(self) -> List[Any]:
+        """Column labels of the dataset, in file order"""
+        return list(self._labels)
+
+    @property
+    def dtypes(self) -> Dict[Any, Optional[str]]:
+        """Column dtypes as strings; None for CSV columns not read yet"""
+        return dict(self._dtypes)
+
+    @property
+    def rows(self) -> Optional[int]:
+        """Number of rows; None for a CSV without a store until a column is read"""
+        return self._rows
+
+    @property
+    def loaded_columns(self) -> List[Any]:
+        """Labels of the columns read so far"""
+        return list(self._loaded)
+
+    def resolve(self, names: List[str]) -> List[Any]:
+        """
+        Map requested column names to column labels
+
+        Labels are matched by their string form, since JSON uploads can
+        produce non-string column labels.
+
+        Raises:
+            ValueError: If a name matches no column
+        """
+        labels = {str(col): col for col in self._labels}
+        unknown = [name for name in names if name not in labels]
+        if unknown:
+            raise ValueError(f"unknown column(s): {', '.join(unknown)}")
+        return [labels[name] for name in names]
+
+    def _read(self, labels: List[Any]) -> pd.DataFrame:
+        """Read columns that are not loaded yet in one pass"""
+        if self._frame is not None:
+            return self._frame.loc[:, ~self._frame.columns.duplicated(keep="last")][labels]
+
+        if self._manifest is not None:
+            success, message, df = read_columnar_store(self.file_path, columns=labels)
+        else:
+            try:
+                success, message, df = True, "", pd.read_csv(self.file_path, usecols=labels)
+            except Exception as e:
+                success, message, df = False, str(e), None
+        if not success or df is None:
+            raise OSError(f"Error reading columns: {message}")
+        return df
+
+    def select(self, names: List[str]) -> pd.DataFrame:
+        """
+        Get a DataFrame holding only the requested columns
+
+        Columns not loaded yet are read together; repeated names are
+        returned once.
+
+        Args:
+            names: Column names, matched by their string form
+
+        Returns:
+            DataFrame with the requested columns in the given order
+
+        Raises:
+            ValueError: If a name matches no column
+            OSError: If the columns cannot be read
+        """
+        labels = list(dict.fromkeys(self.resolve(names)))
+        missing = [label for label in labels if label not in self._loaded]
+        if missing:
+            df = self._read(missing)
+            # With duplicated labels the last column wins, as in resolve
+            for position, label in enumerate(df.columns):
+                self._loaded[label] = df.iloc[:, position]
+                self._dtypes[label] = str(df.dtypes.iloc[position])
+            self._rows = len(df)
+
+        return pd.DataFrame({position: self._loaded[label] for position, label in enumerate(labels)}).set_axis(labels, axis=1)
+
+    def column(self, name: str) -> pd.Series:
+        """Get one column, reading it on first access"""
+        return self.select([name]).iloc[:, 0]
+
+
+def open_dataset_handle(file_path: str) -> Tuple[bool, str, Optional[DatasetHandle]]:
+    """
+    Open a lazy handle on a dataset
+
+    If the whole dataset is already in the DataFrame cache, the handle
+    takes its columns from there instead of reading them again.
+
+    Args:
+        file_path: Path to the original uploaded file
+
+    Returns:
+        Tuple of (success, message, handle)
+    """
+    try:
+        file_info = get_file_info(file_path)
+        if not file_info["exists"]:
+            return False, "Dataset file not found on disk", None
+
+        frame = dataframe_cache.peek(file_path, (file_info["modified"], file_info["size"]))
+        return True, "Dataset handle opened", DatasetHandle(file_path, frame=frame)
+
+    except Exception as e:
+        return False, f"Error opening dataset: {str(e)}", None
@@ -0,0 +1,280 @@
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Tuple, Optional
+from sqlalchemy.orm import Session
+from models import Dataset
+from services.dataset_handle import open_dataset_handle
+from services.aggregation import resolve_columns
+from utils.file_utils import get_file_info
+from utils.result_cache import result_cache
+
+# Downsampling methods accepted by the downsample endpoint
+DOWNSAMPLE_METHODS = ("lttb", "sample")
+
+# Upper bound on points per series a single query may return
+MAX_DOWNSAMPLE_POINTS = 20000
+
+# Fixed seed so repeated sampling queries return the same points
+SAMPLE_SEED = 0
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Select points with Largest-Triangle-Three-Buckets
+
+    The first and last points are kept. The points in between are split
+    into n_out - 2 buckets, and each bucket keeps the point forming the
+    largest triangle with the previously kept point and the mean of the
+    next bucket. Buckets are visited in order since each choice depends
+    on the previous one, but the work inside a bucket is vectorized.
+
+    Args:
+        x: Sorted x values as floats
+        y: y values as floats, without NaN
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted indices of the kept points
+    """
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1])[:max(n_out, 0)]
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    # Mean of every bucket, plus the last point as the final "next bucket"
+    bucket_sizes = np.diff(edges)
+    mean_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / bucket_sizes, x[-1])
+    mean_y = np.append(np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / bucket_sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        cx, cy = mean_x[bucket + 1], mean_y[bucket + 1]
+        areas = np.abs((ax - cx) * (y[start:stop] - ay) - (ax - x[start:stop]) * (cy - ay))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def stratified_sample_indices(n: int, n_out: int, strata: Optional[np.ndarray] = None, seed: int = SAMPLE_SEED) -> np.ndarray:
+    """
+    Draw a uniform random sample of rows, optionally stratified
+
+    With strata, each stratum gets a share of n_out proportional to its
+    size and at least one row, so small groups stay visible. Rows are
+    ranked by random keys within their stratum in one lexsort.
+
+    Args:
+        n: Number of rows
+        n_out: Maximum number of rows to keep
+        strata: Optional array of group labels, one per row
+        seed: Random seed
+
+    Returns:
+        Sorted indices of the sampled rows
+    """
+    if n <= n_out:
+        return np.arange(n)
+
+    rng = np.random.default_rng(seed)
+    if strata is None:
+        return np.sort(rng.choice(n, size=n_out, replace=False))
+
+    codes, _ = pd.factorize(strata, use_na_sentinel=False)
+    counts = np.bincount(codes)
+    # Largest-remainder allocation, so the shares add up to n_out
+    shares = counts * n_out / n
+    quotas = np.floor(shares).astype(np.int64)
+    quotas[np.argsort(quotas - shares)[:n_out - quotas.sum()]] += 1
+    quotas = np.minimum(counts, np.maximum(1, quotas))
+
+    order = np.lexsort((rng.random(n), codes))
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    rank = np.arange(n) - starts
+    sampled = order[rank < np.repeat(quotas, counts)]
+
+    # The one-row minimum can overshoot n_out when there are many tiny strata
+    if len(sampled) > n_out:
+        sampled = rng.choice(sampled, size=n_out, replace=False)
+    return np.sort(sampled)
+
+
+def _axis_values(series: pd.Series, name: str) -> Tuple[np.ndarray, bool]:
+    """
+    Convert an x column to floats for geometry
+
+    Returns:
+        Tuple of (values, is_datetime); datetimes become nanoseconds
+
+    Raises:
+        ValueError: If the column is neither numeric nor datetime-like
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        parsed = series
+    elif pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype=np.float64, na_value=np.nan), False
+    else:
+        parsed = pd.to_datetime(series, errors="coerce", format="mixed")
+        if parsed.notna().sum() == 0:
+            raise ValueError(f"column '{name}' is neither numeric nor datetime-like")
+
+    if getattr(parsed.dt, "tz", None) is not None:
+        parsed = parsed.dt.tz_convert(None)
+    values = parsed.to_numpy(dtype="datetime64[ns]").view(np.int64).astype(np.float64)
+    values[parsed.isna().to_numpy()] = np.nan
+    return values, True
+
+
+def _format_x(values: np.ndarray, is_datetime: bool) -> List[Any]:
+    """Convert selected x values back to JSON-friendly output"""
+    if is_datetime:
+        return np.datetime_as_string(values.astype(np.int64).astype("datetime64[ns]"), unit="s").tolist()
+    return values.tolist()
+
+
+def downsample_dataframe(
+    df: pd.DataFrame,
+    x: str,
+    y: List[str],
+    method: str = "lttb",
+    max_points: int = 2000,
+    stratify: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Reduce x/y series to at most max_points points each
+
+    "lttb" sorts by x and keeps the visually significant points of a line.
+    "sample" draws a random, optionally stratified, sample for scatter
+    plots. Rows with a missing x or y value are dropped per series.
+
+    Args:
+        df: Pandas DataFrame
+        x: Column for the x axis (numeric or datetime-like)
+        y: Numeric columns, one series each
+        method: "lttb" or "sample"
+        max_points: Maximum number of points per series
+        stratify: Optional column to stratify the sample by ("sample" only)
+
+    Returns:
+        Dictionary with one entry per series holding x and y lists,
+        plus metadata
+
+    Raises:
+        ValueError: If the query is invalid for this DataFrame
+    """
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"method must be one of {', '.join(DOWNSAMPLE_METHODS)}")
+    if not y:
+        raise ValueError("at least one y column is required")
+
+    x_col, = resolve_columns(df, [x])
+    y_cols = resolve_columns(df, y)
+    strata_col = resolve_columns(df, [stratify])[0] if stratify else None
+
+    x_values, x_is_datetime = _axis_values(df[x_col], x)
+    strata = df[strata_col].to_numpy() if strata_col is not None else None
+
+    # LTTB needs points in x order; one argsort is shared by every series
+    order = np.argsort(x_values, kind="stable") if method == "lttb" else np.arange(len(df))
+    x_ordered = x_values[order]
+
+    series = []
+    total_points = 0
+    for name, col in zip(y, y_cols):
+        if not pd.api.types.is_numeric_dtype(df[col].dtype):
+            raise ValueError(f"column '{name}' is not numeric")
+
+        y_values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        valid = ~(np.isnan(x_ordered) | np.isnan(y_values))
+        xs, ys = x_ordered[valid], y_values[valid]
+        total_points = max(total_points, len(xs))
+
+        if method == "lttb":
+            keep = lttb_indices(xs, ys, max_points)
+        else:
+            keep = stratified_sample_indices(len(xs), max_points, strata[order][valid] if strata is not None else None)
+
+        series.append({
+            "name": name,
+            "x": _format_x(xs[keep], x_is_datetime),
+            "y": ys[keep].tolist(),
+            "points": len(keep),
+            "source_points": len(xs),
+        })
+
+    return {
+        "x": x,
+        "method": method,
+        "series": series,
+        "metadata": {
+            "rows": len(df),
+            "max_points": max_points,
+            "source_points": total_points,
+            "stratified_by": stratify,
+        }
+    }
+
+
+def get_downsampled_data(
+    db: Session,
+    dataset_id: int,
+    x: str,
+    y: List[str],
+    method: str = "lttb",
+    max_points: int = 2000,
+    stratify: Optional[str] = None
+) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Downsample series of a whole dataset, reusing cached results
+
+    Args:
+        db: Database session
+        dataset_id: ID of the dataset
+        x: Column for the x axis
+        y: Numeric columns, one series each
+        method: "lttb" or "sample"
+        max_points: Maximum number of points per series
+        stratify: Optional column to stratify the sample by
+
+    Returns:
+        Tuple of (success, message, result). Invalid queries return a
+        message starting with "Invalid downsampling".
+    """
+    try:
+        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+        if not dataset:
+            return False, "Dataset not found", None
+
+        file_info = get_file_info(str(dataset.file_path))
+        if not file_info["exists"]:
+            return False, "Dataset file not found on disk", None
+
+        version = (file_info["modified"], file_info["size"])
+        key = ("downsample", x, tuple(y), method, max_points, stratify)
+        cached = result_cache.get(str(dataset.file_path), key, version)
+        if cached is not None:
+            return True, "Downsampled data loaded from cache", dict(cached, metadata=dict(cached["metadata"], cached=True))
+
+        success, message, handle = open_dataset_handle(str(dataset.file_path))
+        if not success or handle is None:
+            return False, f"Error reading dataset: {message}", None
+
+        try:
+            # Only the columns the query touches are read
+            df = handle.select([x] + y + ([stratify] if stratify else []))
+            result = downsample_dataframe(df, x, y, method, max_points, stratify)
+        except ValueError as e:
+            return False, f"Invalid downsampling: {str(e)}", None
+
+        result_cache.put(str(dataset.file_path), key, version, result)
+        return True, "Downsampled data computed", dict(result, metadata=dict(result["metadata"], cached=False))
+
+    except Exception as e:
+        return False, f"Error downsampling data: {str(e)}", None
@@ -0,0 +1,104 @@
+import os
+import pandas as pd
+from pathlib import Path
+from typing import Tuple, Dict, Any, Iterator, Optional
+from sqlalchemy.orm import Session
+from models import Dataset
+from services.data_processing import serialize_records
+from utils.columnar_store import store_exists, iter_columnar_store, read_datetime_formats
+from utils.dtype_compaction import format_datetime_columns
+from utils.file_utils import read_file_in_chunks
+
+# Rows encoded per streamed chunk
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))
+
+# Bytes per block when a CSV upload is passed through unchanged
+EXPORT_COPY_BLOCK_BYTES = 1024 * 1024
+
+# Media type of each export format
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _iter_frame_chunks(file_path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Yield a dataset in row chunks, reading as little as possible at once
+
+    The columnar store is sliced through memory maps. Without a store the
+    original file is read with the chunked reader.
+    """
+    if store_exists(file_path):
+        yield from iter_columnar_store(file_path, chunk_rows)
+        return
+    yield from read_file_in_chunks(file_path, chunk_rows)
+
+
+def _encode_chunk(chunk: pd.DataFrame, export_format: str, first: bool, datetime_formats: Dict[str, str]) -> str:
+    """Encode one chunk as NDJSON lines or CSV rows, with dates in the format they were uploaded in"""
+    if export_format == "csv":
+        return format_datetime_columns(chunk, datetime_formats).to_csv(index=False, header=first)
+
+    # Rows are encoded exactly as stored records are, including float precision
+    return "".join(line + "\n" for line in serialize_records(chunk, datetime_formats))
+
+
+def iter_dataset_export(file_path: str, export_format: str, chunk_rows: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Stream a whole dataset as NDJSON or CSV
+
+    Args:
+        file_path: Path to the original uploaded file
+        export_format: "ndjson" or "csv"
+        chunk_rows: Rows encoded per yielded block (default: EXPORT_CHUNK_ROWS)
+
+    Yields:
+        UTF-8 encoded blocks of the export
+    """
+    # Without a store, a CSV upload already is the CSV export; copy it instead of re-encoding
+    if export_format == "csv" and not store_exists(file_path) and Path(file_path).suffix.lower() == ".csv":
+        with open(file_path, "rb") as f:
+            while block := f.read(EXPORT_COPY_BLOCK_BYTES):
+                yield block
+        return
+
+    datetime_formats = read_datetime_formats(file_path)
+    for position, chunk in enumerate(_iter_frame_chunks(file_path, chunk_rows or EXPORT_CHUNK_ROWS)):
+        if len(chunk):
+            yield _encode_chunk(chunk, export_format, position == 0, datetime_formats).encode("utf-8")
+
+
+def get_dataset_export(db: Session, dataset_id: int, export_format: str) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Look up what is needed to stream a dataset export
+
+    Args:
+        db: Database session
+        dataset_id: ID of the dataset
+        export_format: "ndjson" or "csv"
+
+    Returns:
+        Tuple of (success, message, export_info) where export_info holds
+        file_path, filename and media_type
+    """
+    try:
+        if export_format not in EXPORT_MEDIA_TYPES:
+            return False, f"Unsupported export format: {export_format}", None
+
+        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+        if not dataset:
+            return False, "Dataset not found", None
+
+        file_path = str(dataset.file_path)
+        if not os.path.exists(file_path):
+            return False, "Dataset file not found on disk", None
+
+        return True, "Export ready", {
+            "file_path": file_path,
+            "filename": f"{Path(str(dataset.filename)).stem}.{export_format}",
+            "media_type": EXPORT_MEDIA_TYPES[export_format]
+        }
+
+    except Exception as e:
+        return False, f"Error preparing export: {str(e)}", None
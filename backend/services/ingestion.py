@@ -0,0 +1,301 @@
+from typing import Callable, Tuple, Dict, Any, Optional
+from sqlalchemy import insert, select, literal
+from sqlalchemy.orm import Session
+from models import Dataset, DataRecord, DatasetProfile
+from services.data_processing import (
+    process_uploaded_file, store_dataset_in_db, serialize_records, get_stored_records_count
+)
+from services.profiling import build_dataset_profile, build_streaming_profile, save_dataset_profile
+from services.streaming_profile import StreamingProfiler, should_stream_profile, STREAMING_CHUNK_ROWS
+from utils.file_utils import read_file_with_pandas, read_file_in_chunks
+from utils.columnar_store import write_columnar_store, ColumnarStoreWriter
+from utils.dtype_compaction import compact_dataframe, ChunkedCompaction
+from utils.timing import StageTimer
+
+
+def prepare_uploaded_file(
+    file_path: str,
+    filename: str,
+    content_hash: Optional[str] = None,
+    on_stage: Optional[Callable[[str], None]] = None
+) -> Tuple[bool, str, Dict[str, Any]]:
+    """
+    Run the CPU-bound part of the upload pipeline, parsing the file exactly once
+
+    The parsed DataFrame is compacted to narrow dtypes and handed to every
+    stage: profiling, columnar store conversion and record serialization. Only plain data is returned,
+    so this function can run in a worker process.
+
+    Args:
+        file_path: Path to the saved upload
+        filename: Original filename
+        content_hash: SHA-256 of the upload, recorded on the dataset
+        on_stage: Called with each stage's name as it starts; must be
+            picklable when this runs in a worker process
+
+    Returns:
+        Tuple of (success, message, prepared) where prepared holds
+        data_info, profile, json_rows and per-stage timings in
+        milliseconds. On failure prepared holds failed_stage and the
+        timings so far.
+    """
+    if should_stream_profile(file_path):
+        return prepare_large_csv(file_path, filename, content_hash, on_stage)
+
+    timer = StageTimer(on_stage)
+
+    with timer.stage("parse"):
+        success, message, df = read_file_with_pandas(file_path)
+    if not success or df is None:
+        return False, message, {"failed_stage": "parse", "timings": timer.timings}
+
+    with timer.stage("compact_dtypes"):
+        df, compaction = compact_dataframe(df)
+
+    with timer.stage("profile"):
+        success, message, data_info = process_uploaded_file(file_path, filename, df=df)
+        if success:
+            data_info["content_hash"] = content_hash
+            profile = build_dataset_profile(df, original_bytes=compaction["original_bytes"])
+    if not success:
+        return False, message, {"failed_stage": "profile", "timings": timer.timings}
+
+    # A missing store only costs a re-parse on read, so it is not fatal
+    with timer.stage("columnar_store"):
+        write_columnar_store(df, file_path, metadata={"compaction": compaction})
+
+    with timer.stage("serialize_records"):
+        json_rows = serialize_records(df.head(get_stored_records_count(len(df))), compaction["datetime_formats"])
+
+    return True, "File prepared successfully", {
+        "data_info": data_info,
+        "profile": profile,
+        "json_rows": json_rows,
+        "timings": timer.timings
+    }
+
+
+def prepare_large_csv(
+    file_path: str,
+    filename: str,
+    content_hash: Optional[str] = None,
+    on_stage: Optional[Callable[[str], None]] = None
+) -> Tuple[bool, str, Dict[str, Any]]:
+    """
+    Prepare a large CSV upload in two chunked passes with bounded memory
+    
+    The file is never materialized. The first pass ("parse") gathers what
+    dtype compaction needs to know about every column; the second
+    ("compact_dtypes") converts each chunk accordingly and feeds it to a
+    StreamingProfiler, a chunked columnar store and, until enough rows
+    are stored, record serialization. The dataset is typed as a small
+    upload of the same content would be, so every reader sees the same
+    dates and numbers. "profile" follows while the sketches are finalized.
+    
+    Args:
+        file_path: Path to the saved upload
+        filename: Original filename
+        content_hash: SHA-256 of the upload, recorded on the dataset
+        on_stage: Called with each stage's name as it starts
+        
+    Returns:
+        Tuple of (success, message, prepared) as returned by prepare_uploaded_file
+    """
+    timer = StageTimer()
+    compaction = ChunkedCompaction()
+    json_rows = []
+    
+    if on_stage is not None:
+        on_stage("parse")
+    try:
+        reader = read_file_in_chunks(file_path, STREAMING_CHUNK_ROWS)
+        while True:
+            with timer.stage("parse"):
+                chunk = next(reader, None)
+                if chunk is None:
+                    break
+                compaction.observe(chunk)
+    except Exception as e:
+        return False, f"Error reading file: {str(e)}", {"failed_stage": "parse", "timings": timer.timings}
+    
+    if compaction.rows == 0:
+        return False, "File is empty", {"failed_stage": "parse", "timings": timer.timings}
+    
+    if on_stage is not None:
+        on_stage("compact_dtypes")
+    profiler = StreamingProfiler(datetime_columns=compaction.datetime_columns)
+    # A missing store only costs a re-parse on read, so a failed write is not fatal
+    store = ColumnarStoreWriter(file_path, compaction.rows)
+    try:
+        reader = read_file_in_chunks(file_path, STREAMING_CHUNK_ROWS)
+        while True:
+            with timer.stage("parse"):
+                chunk = next(reader, None)
+            if chunk is None:
+                break
+            
+            with timer.stage("compact_dtypes"):
+                chunk = compaction.apply(chunk)
+            
+            with timer.stage("profile"):
+                profiler.update(chunk)
+            
+            with timer.stage("columnar_store"):
+                store.append(chunk)
+            
+            with timer.stage("serialize_records"):
+                wanted = get_stored_records_count(profiler.rows) - len(json_rows)
+                if wanted > 0:
+                    json_rows.extend(serialize_records(chunk.head(wanted), compaction.datetime_formats))
+    except Exception as e:
+        store.abort()
+        return False, f"Error reading file: {str(e)}", {"failed_stage": "compact_dtypes", "timings": timer.timings}
+    
+    with timer.stage("columnar_store"):
+        categorical = compaction.categorical_columns(store.dictionary_sizes())
+        success, _, _ = store.close(categorical, metadata={"compaction": compaction.report(categorical)})
+        if success:
+            profiler.mark_categorical(categorical)
+    
+    if on_stage is not None:
+        on_stage("profile")
+    with timer.stage("profile"):
+        profile = build_streaming_profile(profiler, original_bytes=compaction.original_bytes)
+        column_stats = profiler.column_stats()
+        data_info = {
+            "filename": filename,
+            "rows": profiler.rows,
+            "columns": len(profiler.columns),
+            "column_names": list(profiler.columns),
+            "dtypes": {col: stats["dtype"] for col, stats in column_stats.items()},
+            "sample_data": profiler.head.to_dict('records'),
+            "null_counts": {col: stats["null_count"] for col, stats in column_stats.items()},
+            "file_path": file_path,
+            "content_hash": content_hash
+        }
+    
+    return True, "File prepared successfully", {
+        "data_info": data_info,
+        "profile": profile,
+        "json_rows": json_rows,
+        "timings": timer.timings
+    }
+
+
+def store_prepared_upload(
+    db: Session,
+    prepared: Dict[str, Any],
+    on_stage: Optional[Callable[[str], None]] = None
+) -> Tuple[bool, str, Dict[str, Any]]:
+    """
+    Run the database part of the upload pipeline on a prepared upload
+
+    Args:
+        db: Database session
+        prepared: Output of prepare_uploaded_file
+        on_stage: Called with each stage's name as it starts
+
+    Returns:
+        Tuple of (success, message, result) where result holds the
+        dataset info, dataset_id and per-stage timings in milliseconds.
+        On failure result holds failed_stage and the timings so far.
+    """
+    timer = StageTimer(on_stage)
+    timer.timings.update(prepared["timings"])
+
+    with timer.stage("store_records"):
+        success, message, dataset_id = store_dataset_in_db(
+            db, prepared["data_info"], json_rows=prepared["json_rows"]
+        )
+    if not success:
+        return False, message, {"failed_stage": "store_records", "timings": timer.timings}
+
+    # Endpoints rebuild a missing profile on first read, so this is not fatal either
+    with timer.stage("store_profile"):
+        save_dataset_profile(db, dataset_id, prepared["profile"])
+
+    timer.timings["total"] = timer.total()
+
+    result = dict(prepared["data_info"])
+    result.update({"dataset_id": dataset_id, "timings": timer.timings})
+    return True, message, result
+
+
+def clone_dataset(db: Session, source: Dataset, filename: str) -> Tuple[bool, str, Dict[str, Any]]:
+    """
+    Register an upload whose content is already ingested as another dataset
+
+    The new dataset shares the source's file, columnar store and cache
+    entries; its stored records and profile are copied inside the
+    database, so nothing is parsed or profiled again.
+
+    Args:
+        db: Database session
+        source: Dataset with the same content hash and a current profile
+        filename: Original filename of the new upload
+
+    Returns:
+        Tuple of (success, message, result) where result holds dataset_id,
+        rows, columns and per-stage timings in milliseconds. On failure
+        result holds failed_stage and the timings so far.
+    """
+    timer = StageTimer()
+    try:
+        with timer.stage("store_records"):
+            dataset = Dataset(filename=filename, file_path=source.file_path, content_hash=source.content_hash)
+            db.add(dataset)
+            db.flush()
+            db.execute(
+                insert(DataRecord).from_select(
+                    ["dataset_id", "json_data"],
+                    select(literal(dataset.id), DataRecord.json_data)
+                    .where(DataRecord.dataset_id == source.id)
+                    .order_by(DataRecord.id)
+                )
+            )
+
+        with timer.stage("store_profile"):
+            profile = source.profile
+            db.add(DatasetProfile(
+                dataset_id=dataset.id,
+                version=profile.version,
+                rows=profile.rows,
+                columns=profile.columns,
+                column_names=profile.column_names,
+                column_analysis=profile.column_analysis,
+                summary_stats=profile.summary_stats,
+                basic_insights=profile.basic_insights,
+                column_insights=profile.column_insights,
+                data_quality=profile.data_quality,
+                correlations=profile.correlations
+            ))
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        return False, f"Error storing dataset: {str(e)}", {"failed_stage": "store_records", "timings": timer.timings}
+
+    timer.timings["total"] = timer.total()
+    return True, "Dataset stored from an identical upload", {
+        "dataset_id": dataset.id,
+        "rows": profile.rows,
+        "columns": profile.columns,
+        "timings": timer.timings
+    }
+
+
+def ingest_uploaded_file(db: Session, file_path: str, filename: str) -> Tuple[bool, str, Dict[str, Any]]:
+    """
+    Run the whole upload pipeline in the calling thread
+
+    Args:
+        db: Database session
+        file_path: Path to the saved upload
+        filename: Original filename
+
+    Returns:
+        Tuple of (success, message, result) as returned by store_prepared_upload
+    """
+    success, message, prepared = prepare_uploaded_file(file_path, filename)
+    if not success:
+        return False, message, prepared
+    return store_prepared_upload(db, prepared)
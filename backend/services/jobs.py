@@ -0,0 +1,369 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Dict, Any, List, MutableMapping, Optional
+from database import SessionLocal
+from services.dataset_files import find_profiled_duplicate, release_dataset_file
+from services.ingestion import prepare_uploaded_file, store_prepared_upload, clone_dataset
+from services.streaming_profile import should_stream_profile
+from utils.file_utils import upload_claims
+from utils.metrics import current_route, record_ingest_job
+from utils.worker_pools import cpu_pool, io_pool
+
+# Seconds a finished job stays queryable before it is pruned
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+# Ingestion stages in execution order, used to derive job progress
+INGESTION_STAGES = ["parse", "compact_dtypes", "profile", "columnar_store", "serialize_records", "store_records", "store_profile"]
+
+# Stages of a large CSV read in two chunked passes; "compact_dtypes" also profiles, stores and serializes each chunk
+STREAMED_INGESTION_STAGES = ["parse", "compact_dtypes", "profile", "store_records", "store_profile"]
+
+
+class StageReporter:
+    """
+    Picklable callback that publishes the stage a worker has started
+
+    The stage is written to a dictionary shared with the worker's pool
+    and picked up by the job registry when the job is read.
+    """
+
+    def __init__(self, shared: MutableMapping[str, str]):
+        self.shared = shared
+
+    def __call__(self, stage: str) -> None:
+        try:
+            self.shared["stage"] = stage
+        except Exception:
+            # Progress is informational; losing the manager must not fail the stage
+            pass
+
+
+class JobRegistry:
+    """
+    Thread-safe in-memory registry of background jobs
+
+    Jobs live in this process only, so with several server processes a
+    status request must reach the process that accepted the upload.
+    """
+
+    def __init__(self, retention_seconds: int):
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._file_paths: Dict[str, str] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._worker_stages: Dict[str, MutableMapping[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, filename: str, file_path: Optional[str] = None, stages: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Register a new queued job
+
+        Args:
+            filename: Original filename of the upload
+            file_path: Path of the saved upload the job works on
+            stages: Stages the job will run, in order
+
+        Returns:
+            Copy of the new job's state
+        """
+        now = datetime.utcnow()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "stage": None,
+            "stages": list(stages or []),
+            "progress": 0.0,
+            "filename": filename,
+            "dataset_id": None,
+            "message": "Waiting for a worker",
+            "timings": {},
+            "created_at": now,
+            "updated_at": now,
+        }
+        with self._lock:
+            self._prune()
+            self._jobs[job["job_id"]] = job
+            if file_path is not None:
+                self._file_paths[job["job_id"]] = file_path
+            return dict(job)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        """
+        Update fields of a job; finished jobs start their retention period
+
+        Args:
+            job_id: ID of the job
+            **fields: Job fields to overwrite
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job["updated_at"] = datetime.utcnow()
+            if job["status"] != "processing":
+                self._worker_stages.pop(job_id, None)
+            if job["status"] in ("completed", "failed"):
+                self._finished_at[job_id] = time.monotonic()
+
+    def enter_stage(self, job_id: str, stage: str, **fields: Any) -> None:
+        """
+        Move a job to a stage, deriving progress from the job's stage list
+
+        Args:
+            job_id: ID of the job
+            stage: Stage the job starts
+            **fields: Other job fields to overwrite
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            stages = job["stages"] if job is not None else []
+        self.update(job_id, stage=stage, progress=_stage_progress(stages, stage), **fields)
+
+    def watch_worker_stages(self, job_id: str, shared: MutableMapping[str, str]) -> StageReporter:
+        """
+        Follow the stages a worker reports while a job is processing
+
+        Args:
+            job_id: ID of the job
+            shared: Dictionary shared with the worker's pool
+
+        Returns:
+            Callback to pass to the worker as its on_stage hook
+        """
+        with self._lock:
+            self._worker_stages[job_id] = shared
+        return StageReporter(shared)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a copy of a job's state
+
+        A processing job first picks up the latest stage its worker
+        reported, with progress counting the stages before it.
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            Job state, or None if unknown or pruned
+        """
+        with self._lock:
+            shared = self._worker_stages.get(job_id)
+        # Reading a process pool's shared dict is a round trip to its manager, so it is done unlocked
+        stage = None
+        if shared is not None:
+            try:
+                stage = shared.get("stage")
+            except Exception:
+                stage = None
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            # The job may have moved on to storage while the worker's dict was read
+            if stage is not None and job["status"] == "processing" and stage in job["stages"]:
+                job["stage"] = stage
+                job["progress"] = _stage_progress(job["stages"], stage)
+            return dict(job, stages=list(job["stages"]), timings=dict(job["timings"]))
+
+    def has_active_job(self, file_path: str) -> bool:
+        """
+        Check whether an unfinished job is working on a file
+
+        Args:
+            file_path: Path of a saved upload
+
+        Returns:
+            True if a queued or running job uses the file
+        """
+        with self._lock:
+            return any(
+                path == file_path and self._jobs[job_id]["status"] not in ("completed", "failed")
+                for job_id, path in self._file_paths.items()
+            )
+
+    def _prune(self) -> None:
+        """Drop finished jobs past retention; the caller must hold the lock"""
+        cutoff = time.monotonic() - self.retention_seconds
+        for job_id in [job_id for job_id, finished in self._finished_at.items() if finished < cutoff]:
+            self._finished_at.pop(job_id, None)
+            self._file_paths.pop(job_id, None)
+            self._jobs.pop(job_id, None)
+
+
+# Shared registry for the application
+job_registry = JobRegistry(JOB_RETENTION_SECONDS)
+
+
+def _stage_progress(stages: List[str], stage: str) -> float:
+    """Fraction of a job's stages that finished before the given one"""
+    if stage not in stages:
+        return 0.0
+    return round(stages.index(stage) / len(stages), 2)
+
+
+def _fail_job(job_id: str, file_path: str, message: str, timings: Optional[Dict[str, float]] = None) -> None:
+    """Mark a job failed and remove its uploaded file unless other datasets share it"""
+    fields: Dict[str, Any] = {"status": "failed", "stage": None, "message": message}
+    if timings is not None:
+        fields["timings"] = timings
+    job_registry.update(job_id, **fields)
+    record_ingest_job("failed", timings or {})
+    release_dataset_file(file_path)
+
+
+def _store_stage(job_id: str, file_path: str, prepared: Dict[str, Any]) -> None:
+    """Write a prepared upload to the database with a job-owned session"""
+    db = SessionLocal()
+    try:
+        success, message, result = store_prepared_upload(
+            db, prepared, on_stage=lambda stage: job_registry.enter_stage(job_id, stage)
+        )
+        if not success:
+            _fail_job(job_id, file_path, message, result.get("timings"))
+            return
+
+        job_registry.update(
+            job_id,
+            status="completed",
+            stage=None,
+            progress=1.0,
+            dataset_id=result["dataset_id"],
+            message=f"File processed successfully. {result['rows']} rows and {result['columns']} columns detected.",
+            timings=result["timings"]
+        )
+        record_ingest_job("completed", result["timings"])
+    except Exception as e:
+        _fail_job(job_id, file_path, f"Unexpected error: {str(e)}")
+    finally:
+        db.close()
+
+
+def _on_prepared(job_id: str, file_path: str, future: Future) -> None:
+    """Hand a finished CPU stage over to the I/O pool for storage"""
+    try:
+        success, message, prepared = future.result()
+        if not success:
+            _fail_job(job_id, file_path, message, prepared.get("timings"))
+            return
+
+        job_registry.enter_stage(
+            job_id,
+            "store_records",
+            status="storing",
+            message="Storing records",
+            timings=prepared["timings"]
+        )
+        # The job was accepted already, so storage must not be turned away by the queue limit
+        io_pool.submit(_store_stage, job_id, file_path, prepared, bypass_limit=True)
+    except Exception as e:
+        _fail_job(job_id, file_path, f"Unexpected error: {str(e)}")
+
+
+def _submit_prepare(
+    job_id: str,
+    file_path: str,
+    filename: str,
+    content_hash: Optional[str],
+    bypass_limit: bool = False
+) -> None:
+    """Queue the CPU stage of a job and chain the storage stage to it"""
+    on_stage = job_registry.watch_worker_stages(job_id, cpu_pool.shared_dict())
+    job_registry.enter_stage(job_id, "parse", status="processing", message="Parsing and profiling")
+    future = cpu_pool.submit(prepare_uploaded_file, file_path, filename, content_hash, on_stage, bypass_limit=bypass_limit)
+    future.add_done_callback(lambda done: _on_prepared(job_id, file_path, done))
+
+
+def _dedup_stage(job_id: str, file_path: str, filename: str, content_hash: str) -> None:
+    """Reuse an already ingested copy of the same content, or fall back to full ingestion"""
+    db = SessionLocal()
+    try:
+        source = find_profiled_duplicate(db, content_hash)
+        if source is None:
+            # The upload was accepted before this stage ran, so the CPU pool's queue limit must not drop it
+            _submit_prepare(job_id, file_path, filename, content_hash, bypass_limit=True)
+            return
+
+        success, message, result = clone_dataset(db, source, filename)
+        if not success:
+            _fail_job(job_id, file_path, message, result.get("timings"))
+            return
+
+        job_registry.update(
+            job_id,
+            status="completed",
+            stage=None,
+            progress=1.0,
+            dataset_id=result["dataset_id"],
+            message=f"File processed successfully. {result['rows']} rows and {result['columns']} columns detected.",
+            timings=result["timings"]
+        )
+        record_ingest_job("completed", result["timings"])
+        # A copy of content first stored under another name is not needed any more
+        if str(source.file_path) != file_path:
+            release_dataset_file(file_path)
+    except Exception as e:
+        _fail_job(job_id, file_path, f"Unexpected error: {str(e)}")
+    finally:
+        db.close()
+
+
+def start_ingestion_job(file_path: str, filename: str, content_hash: Optional[str] = None) -> str:
+    """
+    Start background ingestion of a saved upload
+
+    Parsing and profiling run on the CPU pool, then record and profile
+    storage run on the I/O pool. Stages are chained with future callbacks,
+    so no worker sits idle waiting on another pool, and stages after the
+    first skip the queue limit since the upload was already accepted.
+    The CPU worker reports each stage it starts through a dictionary
+    shared with its pool, so job progress follows it. When content_hash
+    matches an already ingested dataset, its records and profile are
+    copied on the I/O pool instead and the file is not parsed at all.
+    The caller's upload claim on file_path is handed over to the job:
+    it is released once the job is registered, before any stage runs, so
+    a stage that fails early can still remove the file.
+
+    Args:
+        file_path: Path to the saved upload, claimed in upload_claims
+        filename: Original filename
+        content_hash: SHA-256 of the upload, if known
+
+    Returns:
+        ID of the new job
+
+    Raises:
+        PoolSaturatedError: If the worker pool cannot accept more work
+    """
+    try:
+        stages = STREAMED_INGESTION_STAGES if should_stream_profile(file_path) else INGESTION_STAGES
+        if content_hash is not None:
+            stages = ["deduplicate"] + stages
+        job = job_registry.create(filename, file_path, stages)
+    finally:
+        # From here on the job's registration keeps the file from being removed
+        upload_claims.release(file_path)
+    job_id = job["job_id"]
+
+    # Pool threads run in a copy of the submitter's context; the job outlives the upload request
+    route_token = current_route.set("background")
+    try:
+        if content_hash is not None:
+            # Updated before submitting, so a fast worker's final state is not overwritten
+            job_registry.enter_stage(job_id, "deduplicate", status="processing", message="Looking for an identical dataset")
+            io_pool.submit(_dedup_stage, job_id, file_path, filename, content_hash)
+        else:
+            _submit_prepare(job_id, file_path, filename, None)
+    except Exception as e:
+        job_registry.update(job_id, status="failed", message=str(e))
+        raise
+    finally:
+        current_route.reset(route_token)
+
+    return job_id
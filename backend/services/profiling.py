@@ -0,0 +1,299 @@
+import json
+import math
+import numpy as np
+import pandas as pd
+from typing import Tuple, Dict, Any, Optional
+from sqlalchemy.orm import Session
+from models import Dataset, DatasetProfile
+from services.data_processing import get_summary_stats, generate_basic_insights, build_summary_stats, build_basic_insights
+from services.suggestion_engine import analyze_column_types, build_column_analysis, get_column_insights
+from services.correlation import profile_correlations
+from services.streaming_profile import StreamingProfiler, should_stream_profile, STREAMING_CHUNK_ROWS
+from utils.columnar_store import read_store_manifest, iter_columnar_store
+from utils.dataframe_cache import get_cached_dataset_frame
+from utils.file_utils import read_file_in_chunks
+from utils.metrics import span
+
+# Bump whenever the profile contents change so stored profiles are recomputed
+PROFILE_VERSION = 7
+
+# Profile fields persisted as JSON text columns
+_JSON_FIELDS = ["column_names", "column_analysis", "summary_stats", "basic_insights", "column_insights", "data_quality", "correlations"]
+
+
+def _to_builtin(value: Any) -> Any:
+    """
+    Recursively convert profiling output into JSON-safe builtin types
+
+    NumPy scalars become Python numbers, NaN and infinities become None
+    and timestamps become ISO strings.
+    """
+    if isinstance(value, dict):
+        return {str(key): _to_builtin(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, (pd.Timestamp, pd.Timedelta)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _memory_usage_mb(before_bytes: Optional[int], after_bytes: Optional[int]) -> Dict[str, Optional[float]]:
+    """Report memory use before and after dtype compaction, in megabytes"""
+    return {
+        "before": round(before_bytes / 1024**2, 2) if before_bytes is not None else None,
+        "after": round(after_bytes / 1024**2, 2) if after_bytes is not None else None,
+    }
+
+
+def get_data_quality(df: pd.DataFrame, original_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compute data quality indicators for a DataFrame
+
+    Args:
+        df: Pandas DataFrame, as compacted at ingest
+        original_bytes: Memory use of the frame as parsed, before dtype
+            compaction (None if unknown)
+
+    Returns:
+        Dictionary with missing data, duplicate and memory figures, and
+        whether any of them is an estimate. memory_usage_mb holds the
+        memory use before and after compaction.
+    """
+    null_counts = df.isnull().sum()
+    total_cells = len(df) * len(df.columns)
+    return {
+        "missing_data_percentage": round((null_counts.sum() / total_cells) * 100, 2) if total_cells else 0.0,
+        "duplicate_rows": int(df.duplicated().sum()),
+        "columns_with_missing_data": null_counts[null_counts > 0].index.tolist(),
+        "memory_usage_mb": _memory_usage_mb(original_bytes, int(df.memory_usage(deep=True).sum())),
+        "approximate": False
+    }
+
+
+def build_dataset_profile(df: pd.DataFrame, original_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run every profiling step over a DataFrame
+
+    Args:
+        df: Pandas DataFrame
+        original_bytes: Memory use of the frame before dtype compaction
+
+    Returns:
+        JSON-safe dictionary with shape, column analysis, summary
+        statistics, insights, data quality and the most correlated
+        column pairs
+    """
+    column_analysis = analyze_column_types(df)
+    profile = {
+        "rows": len(df),
+        "columns": len(df.columns),
+        "column_names": [str(col) for col in df.columns],
+        "column_analysis": column_analysis,
+        "summary_stats": get_summary_stats(df),
+        "basic_insights": generate_basic_insights(df),
+        "column_insights": get_column_insights(df, column_analysis),
+        "data_quality": get_data_quality(df, original_bytes),
+        "correlations": profile_correlations(df),
+    }
+    return _to_builtin(profile)
+
+
+def build_streaming_profile(profiler: StreamingProfiler, original_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Assemble a profile from a streaming profiler that has seen every chunk
+
+    The result has the same fields as build_dataset_profile, so stored
+    profiles and suggestions do not depend on how the file was profiled.
+
+    Args:
+        profiler: StreamingProfiler fed with the whole dataset
+        original_bytes: Memory use of the chunks as parsed, when the
+            profiler was fed them after dtype compaction (None if it saw
+            them as parsed)
+
+    Returns:
+        JSON-safe profile dictionary
+    """
+    column_stats = profiler.column_stats()
+    column_analysis = build_column_analysis(column_stats, profiler.datetime_columns, profiler.rows)
+    columns = list(profiler.columns)
+    dtypes = {col: sketch.dtype for col, sketch in profiler.columns.items()}
+
+    missing_cells = sum(stats["null_count"] for stats in column_stats.values())
+    total_cells = profiler.rows * len(columns)
+    numeric_cols = [
+        col for col, dtype in dtypes.items()
+        if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+    ]
+    datetime_cols = set(profiler.datetime_columns)
+    categorical_cols = [
+        col for col, dtype in dtypes.items()
+        if (dtype == object or isinstance(dtype, pd.CategoricalDtype)) and col not in datetime_cols
+    ]
+
+    profile = {
+        "rows": profiler.rows,
+        "columns": len(columns),
+        "column_names": [str(col) for col in columns],
+        "column_analysis": column_analysis,
+        "summary_stats": build_summary_stats(column_stats, profiler.rows, len(columns)),
+        "basic_insights": build_basic_insights(
+            profiler.rows, len(columns), missing_cells, numeric_cols, categorical_cols, profiler.datetime_columns
+        ),
+        "column_insights": get_column_insights(profiler.head, column_analysis),
+        "data_quality": {
+            "missing_data_percentage": round((missing_cells / total_cells) * 100, 2) if total_cells else 0.0,
+            "duplicate_rows": profiler.duplicate_rows(),
+            "columns_with_missing_data": [col for col, stats in column_stats.items() if stats["null_count"] > 0],
+            "memory_usage_mb": (
+                _memory_usage_mb(original_bytes, profiler.memory_bytes) if original_bytes is not None
+                else _memory_usage_mb(profiler.memory_bytes, None)
+            ),
+            "approximate": not profiler.is_exact()
+        },
+        "correlations": profiler.correlation_summary(),
+    }
+    return _to_builtin(profile)
+
+
+def profile_file_in_chunks(file_path: str, chunk_rows: Optional[int] = None) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Profile a file chunk by chunk without loading it whole
+
+    The columnar store is read when there is one, so columns keep the
+    dtypes they were compacted to at ingest.
+
+    Args:
+        file_path: Path to the dataset file
+        chunk_rows: Rows per chunk (default: STREAMING_CHUNK_ROWS)
+
+    Returns:
+        Tuple of (success, message, profile)
+    """
+    try:
+        profiler = StreamingProfiler()
+        chunk_rows = chunk_rows or STREAMING_CHUNK_ROWS
+        manifest = read_store_manifest(file_path)
+        if manifest is not None:
+            chunks = iter_columnar_store(file_path, chunk_rows)
+            original_bytes = manifest.get("metadata", {}).get("compaction", {}).get("original_bytes")
+        else:
+            chunks = read_file_in_chunks(file_path, chunk_rows)
+            original_bytes = None
+        for chunk in chunks:
+            profiler.update(chunk)
+        if profiler.rows == 0:
+            return False, "File is empty", None
+        return True, "Profile computed in chunks", build_streaming_profile(profiler, original_bytes)
+
+    except Exception as e:
+        return False, f"Error reading file: {str(e)}", None
+
+
+def _profile_from_row(row: DatasetProfile) -> Dict[str, Any]:
+    """Turn a stored profile row back into a profile dictionary"""
+    profile: Dict[str, Any] = {"rows": row.rows, "columns": row.columns}
+    with span("serialize"):
+        for field in _JSON_FIELDS:
+            profile[field] = json.loads(getattr(row, field))
+    return profile
+
+
+def save_dataset_profile(db: Session, dataset_id: int, profile: Dict[str, Any]) -> Tuple[bool, str, Optional[DatasetProfile]]:
+    """
+    Store or replace the profile row of a dataset
+
+    Args:
+        db: Database session
+        dataset_id: ID of the dataset
+        profile: Output of build_dataset_profile
+
+    Returns:
+        Tuple of (success, message, profile_row)
+    """
+    try:
+        row = db.query(DatasetProfile).filter(DatasetProfile.dataset_id == dataset_id).first()
+        if row is None:
+            row = DatasetProfile(dataset_id=dataset_id)
+            db.add(row)
+
+        row.version = PROFILE_VERSION
+        row.rows = profile["rows"]
+        row.columns = profile["columns"]
+        with span("serialize"):
+            for field in _JSON_FIELDS:
+                setattr(row, field, json.dumps(profile[field]))
+
+        with span("db_insert"):
+            db.commit()
+        return True, "Profile stored successfully", row
+
+    except Exception as e:
+        db.rollback()
+        return False, f"Error storing profile: {str(e)}", None
+
+
+def get_dataset_profile(db: Session, dataset: Dataset) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Get the stored profile of a dataset, computing it if missing or stale
+
+    Datasets uploaded before profiles existed, or profiled by an older
+    PROFILE_VERSION, are profiled once here and the result is persisted.
+    A current profile of a dataset with the same content is copied
+    instead of recomputed. Large CSV files are profiled in chunks.
+
+    Args:
+        db: Database session
+        dataset: Dataset model instance
+
+    Returns:
+        Tuple of (success, message, profile)
+    """
+    try:
+        with span("db_query"):
+            row = db.query(DatasetProfile).filter(DatasetProfile.dataset_id == dataset.id).first()
+        if row is not None and row.version == PROFILE_VERSION:
+            return True, "Profile loaded", _profile_from_row(row)
+
+        # A dataset with identical content may already have a current profile
+        if dataset.content_hash is not None:
+            sibling = (
+                db.query(DatasetProfile)
+                .join(Dataset, Dataset.id == DatasetProfile.dataset_id)
+                .filter(
+                    Dataset.content_hash == dataset.content_hash,
+                    Dataset.id != dataset.id,
+                    DatasetProfile.version == PROFILE_VERSION
+                )
+                .first()
+            )
+            if sibling is not None:
+                profile = _profile_from_row(sibling)
+                save_dataset_profile(db, dataset.id, profile)
+                return True, "Profile copied from an identical dataset", profile
+
+        if should_stream_profile(str(dataset.file_path)):
+            with span("profile"):
+                success, message, profile = profile_file_in_chunks(str(dataset.file_path))
+            if not success or profile is None:
+                return False, f"Error reading dataset: {message}", None
+        else:
+            success, message, df = get_cached_dataset_frame(str(dataset.file_path))
+            if not success or df is None:
+                return False, f"Error reading dataset: {message}", None
+            manifest = read_store_manifest(str(dataset.file_path)) or {}
+            compaction = manifest.get("metadata", {}).get("compaction", {})
+            with span("profile"):
+                profile = build_dataset_profile(df, original_bytes=compaction.get("original_bytes"))
+
+        save_dataset_profile(db, dataset.id, profile)
+        return True, "Profile computed", profile
+
+    except Exception as e:
+        return False, f"Error loading profile: {str(e)}", None
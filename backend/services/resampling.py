@@ -0,0 +1,271 @@
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Tuple, Optional
+from sqlalchemy.orm import Session
+from models import Dataset
+from services.aggregation import AGGREGATION_FUNCTIONS, resolve_columns
+from services.dataset_handle import open_dataset_handle
+from utils.dtype_compaction import parse_datetime_text
+from utils.file_utils import get_file_info
+from utils.result_cache import result_cache
+
+# Bucket sizes accepted by the resample endpoint, finest first; "auto" picks one
+RESAMPLE_FREQUENCIES = ("hour", "day", "week", "month", "year")
+
+# Upper bound on buckets per series a single query may return
+MAX_RESAMPLE_BUCKETS = 20000
+
+_NS_PER_HOUR = 3600 * 10**9
+_NS_PER_DAY = 24 * _NS_PER_HOUR
+
+# 1970-01-01 was a Thursday; shifting by three days makes weeks start on Monday
+_WEEK_SHIFT_DAYS = 3
+
+
+def bucket_keys(ns: np.ndarray, frequency: str) -> np.ndarray:
+    """
+    Number the bucket each timestamp falls into
+
+    Keys are consecutive integers, so the buckets between two keys can be
+    counted by subtraction and summed with np.bincount.
+
+    Args:
+        ns: Timestamps as int64 nanoseconds since the epoch
+        frequency: One of RESAMPLE_FREQUENCIES
+
+    Returns:
+        int64 array of bucket keys
+    """
+    if frequency == "hour":
+        return ns // _NS_PER_HOUR
+    if frequency == "day":
+        return ns // _NS_PER_DAY
+    if frequency == "week":
+        return (ns // _NS_PER_DAY + _WEEK_SHIFT_DAYS) // 7
+    unit = "M" if frequency == "month" else "Y"
+    return ns.view("datetime64[ns]").astype(f"datetime64[{unit}]").view(np.int64)
+
+
+def bucket_starts(keys: np.ndarray, frequency: str) -> np.ndarray:
+    """Get the first instant of each bucket as datetime64"""
+    if frequency == "hour":
+        return (keys * _NS_PER_HOUR).view("datetime64[ns]")
+    if frequency == "day":
+        return (keys * _NS_PER_DAY).view("datetime64[ns]")
+    if frequency == "week":
+        return ((keys * 7 - _WEEK_SHIFT_DAYS) * _NS_PER_DAY).view("datetime64[ns]")
+    return keys.view("datetime64[M]" if frequency == "month" else "datetime64[Y]")
+
+
+def choose_frequency(ns: np.ndarray, max_points: int) -> str:
+    """
+    Pick the finest frequency whose buckets over the data's span fit in max_points
+
+    Args:
+        ns: Non-missing timestamps as int64 nanoseconds
+        max_points: Target number of buckets
+
+    Returns:
+        One of RESAMPLE_FREQUENCIES; the coarsest if none fits
+    """
+    if len(ns) == 0:
+        return RESAMPLE_FREQUENCIES[0]
+    span = np.array([ns.min(), ns.max()])
+    for frequency in RESAMPLE_FREQUENCIES:
+        first, last = bucket_keys(span, frequency)
+        if last - first + 1 <= max_points:
+            return frequency
+    return RESAMPLE_FREQUENCIES[-1]
+
+
+def _datetime_nanoseconds(series: pd.Series, name: str) -> np.ndarray:
+    """
+    Convert a datetime or date text column to int64 nanoseconds
+
+    Returns:
+        int64 array where missing values hold NaT's integer value
+
+    Raises:
+        ValueError: If the column does not hold dates
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+    if not pd.api.types.is_datetime64_any_dtype(series.dtype):
+        parsed = parse_datetime_text(series) if series.dtype == object else None
+        if parsed is None:
+            raise ValueError(f"column '{name}' does not hold dates")
+        series = parsed
+    if getattr(series.dt, "tz", None) is not None:
+        series = series.dt.tz_convert(None)
+    return series.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _aggregate_buckets(codes: np.ndarray, values: np.ndarray, n_buckets: int, agg: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate values per bucket code in whole-array operations
+
+    Returns:
+        Tuple of (codes of non-empty buckets, their aggregated values)
+    """
+    counts = np.bincount(codes, minlength=n_buckets)
+    present = np.flatnonzero(counts)
+    if agg == "count":
+        return present, counts[present].astype(np.float64)
+    if agg in ("sum", "mean"):
+        sums = np.bincount(codes, weights=values, minlength=n_buckets)[present]
+        return present, sums if agg == "sum" else sums / counts[present]
+
+    # Unbuffered ufunc.at folds each value into its bucket without sorting
+    if agg == "min":
+        extremes = np.full(n_buckets, np.inf)
+        np.fmin.at(extremes, codes, values)
+    else:
+        extremes = np.full(n_buckets, -np.inf)
+        np.fmax.at(extremes, codes, values)
+    return present, extremes[present]
+
+
+def resample_dataframe(
+    df: pd.DataFrame,
+    x: str,
+    y: List[str],
+    frequency: str = "auto",
+    agg: str = "mean",
+    max_points: int = 500
+) -> Dict[str, Any]:
+    """
+    Bucket numeric series by calendar period of a datetime column
+
+    Every row is assigned an integer bucket key in one vectorized pass,
+    and bucket aggregates come from np.bincount or ufunc.at, so the cost
+    is linear in the rows and nothing is sorted. Only non-empty buckets
+    are returned. Rows with a missing x or y value are dropped per series.
+
+    Args:
+        df: Pandas DataFrame
+        x: Datetime column, typed or date text
+        y: Numeric columns, one series each
+        frequency: One of RESAMPLE_FREQUENCIES, or "auto" for the finest
+            one giving at most max_points buckets
+        agg: Aggregation function from AGGREGATION_FUNCTIONS
+        max_points: Target number of buckets for "auto"
+
+    Returns:
+        Dictionary with one entry per series holding bucket starts and
+        aggregated values, plus metadata
+
+    Raises:
+        ValueError: If the query is invalid for this DataFrame
+    """
+    if frequency != "auto" and frequency not in RESAMPLE_FREQUENCIES:
+        raise ValueError(f"frequency must be auto or one of {', '.join(RESAMPLE_FREQUENCIES)}")
+    if agg not in AGGREGATION_FUNCTIONS:
+        raise ValueError(f"aggregation must be one of {', '.join(AGGREGATION_FUNCTIONS)}")
+    if not y:
+        raise ValueError("at least one y column is required")
+
+    x_col, = resolve_columns(df, [x])
+    y_cols = resolve_columns(df, y)
+    for name, col in zip(y, y_cols):
+        if not pd.api.types.is_numeric_dtype(df[col].dtype):
+            raise ValueError(f"column '{name}' is not numeric")
+
+    ns = _datetime_nanoseconds(df[x_col], x)
+    has_x = ns != np.iinfo(np.int64).min
+    chosen = choose_frequency(ns[has_x], max_points) if frequency == "auto" else frequency
+
+    keys = bucket_keys(ns[has_x], chosen)
+    first_key = int(keys.min()) if len(keys) else 0
+    n_buckets = int(keys.max()) - first_key + 1 if len(keys) else 0
+    if n_buckets > MAX_RESAMPLE_BUCKETS:
+        raise ValueError(f"{chosen} buckets would span {n_buckets} periods, more than {MAX_RESAMPLE_BUCKETS}; use a coarser frequency")
+    codes = keys - first_key
+
+    series = []
+    total_points = 0
+    for name, col in zip(y, y_cols):
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)[has_x]
+        valid = ~np.isnan(values)
+        total_points = max(total_points, int(valid.sum()))
+
+        present, aggregated = _aggregate_buckets(codes[valid], values[valid], n_buckets, agg)
+        starts = bucket_starts(present + first_key, chosen)
+        series.append({
+            "name": name,
+            "x": np.datetime_as_string(starts.astype("datetime64[s]"), unit="s").tolist(),
+            "y": aggregated.tolist(),
+            "points": len(present),
+            "source_points": int(valid.sum()),
+        })
+
+    return {
+        "x": x,
+        "frequency": chosen,
+        "agg": agg,
+        "series": series,
+        "metadata": {
+            "rows": len(df),
+            "requested_frequency": frequency,
+            "max_points": max_points,
+            "buckets_spanned": n_buckets,
+            "source_points": total_points,
+        }
+    }
+
+
+def get_resampled_data(
+    db: Session,
+    dataset_id: int,
+    x: str,
+    y: List[str],
+    frequency: str = "auto",
+    agg: str = "mean",
+    max_points: int = 500
+) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Resample series of a whole dataset by time period, reusing cached results
+
+    Args:
+        db: Database session
+        dataset_id: ID of the dataset
+        x: Datetime column
+        y: Numeric columns, one series each
+        frequency: One of RESAMPLE_FREQUENCIES, or "auto"
+        agg: Aggregation function from AGGREGATION_FUNCTIONS
+        max_points: Target number of buckets for "auto"
+
+    Returns:
+        Tuple of (success, message, result). Invalid queries return a
+        message starting with "Invalid resampling".
+    """
+    try:
+        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+        if not dataset:
+            return False, "Dataset not found", None
+
+        file_info = get_file_info(str(dataset.file_path))
+        if not file_info["exists"]:
+            return False, "Dataset file not found on disk", None
+
+        version = (file_info["modified"], file_info["size"])
+        key = ("resample", x, tuple(y), frequency, agg, max_points)
+        cached = result_cache.get(str(dataset.file_path), key, version)
+        if cached is not None:
+            return True, "Resampled data loaded from cache", dict(cached, metadata=dict(cached["metadata"], cached=True))
+
+        success, message, handle = open_dataset_handle(str(dataset.file_path))
+        if not success or handle is None:
+            return False, f"Error reading dataset: {message}", None
+
+        try:
+            # Only the columns the query touches are read
+            df = handle.select([x] + y)
+            result = resample_dataframe(df, x, y, frequency, agg, max_points)
+        except ValueError as e:
+            return False, f"Invalid resampling: {str(e)}", None
+
+        result_cache.put(str(dataset.file_path), key, version, result)
+        return True, "Resampled data computed", dict(result, metadata=dict(result["metadata"], cached=False))
+
+    except Exception as e:
+        return False, f"Error resampling data: {str(e)}", None
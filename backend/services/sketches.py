@@ -0,0 +1,291 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any, Optional
+
+
+def hash_values(values: Any) -> np.ndarray:
+    """
+    Hash values to uint64 for distinct counting
+
+    Numeric values are hashed as float64, so 1 and 1.0 count as the same
+    value across chunks whose inferred dtype differs.
+
+    Args:
+        values: Array-like of non-null values
+
+    Returns:
+        Array of 64-bit hashes
+    """
+    array = np.asarray(values)
+    if array.dtype.kind in "biuf":
+        array = array.astype(np.float64, copy=False)
+    return pd.util.hash_array(array, categorize=False)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct-value estimator with 2**precision registers
+
+    Memory is fixed at 2**precision bytes; the standard error is about
+    1.04 / sqrt(2**precision). Sketches with equal precision merge by
+    taking the register-wise maximum.
+    """
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        """Add 64-bit hashes to the sketch"""
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        remaining_bits = 64 - self.precision
+        index = (hashes >> np.uint64(remaining_bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << remaining_bits) - 1)
+
+        # Position of the leading one bit within the remaining bits
+        _, exponent = np.frexp(rest.astype(np.float64))
+        rank = np.where(rest == 0, remaining_bits + 1, remaining_bits - exponent + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Fold another sketch of the same precision into this one"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        """Estimate the number of distinct values added"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+class DistinctCounter:
+    """
+    Distinct-value counter that is exact up to a limit, then approximate
+
+    Distinct hashes are kept exactly until there are more than exact_limit
+    of them; from then on only the HyperLogLog estimate is used, so memory
+    stays bounded. Batches are deduplicated on their own and merged lazily,
+    so the exact set is not re-sorted on every batch.
+    """
+
+    def __init__(self, exact_limit: int = 8192, precision: int = 14):
+        self.exact_limit = exact_limit
+        self.hll = HyperLogLog(precision)
+        self._pending: Optional[List[np.ndarray]] = []
+        self._pending_size = 0
+
+    def _compact(self) -> None:
+        """Merge pending batches, dropping the exact set once it is too large"""
+        if self._pending is None:
+            return
+        merged = np.unique(np.concatenate(self._pending)) if self._pending else np.empty(0, dtype=np.uint64)
+        if len(merged) > self.exact_limit:
+            self._pending, self._pending_size = None, 0
+        else:
+            self._pending, self._pending_size = [merged], len(merged)
+
+    def _add_exact(self, hashes: np.ndarray) -> None:
+        """Queue distinct hashes for the exact set"""
+        if self._pending is None:
+            return
+        self._pending.append(hashes)
+        self._pending_size += len(hashes)
+        if self._pending_size > 2 * self.exact_limit:
+            self._compact()
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        """Add 64-bit hashes to the counter"""
+        self.hll.update_hashes(hashes)
+        self._add_exact(np.unique(hashes))
+
+    def merge(self, other: "DistinctCounter") -> None:
+        """Fold another counter into this one"""
+        self.hll.merge(other.hll)
+        other._compact()
+        if other._pending is None:
+            self._pending, self._pending_size = None, 0
+        else:
+            for hashes in other._pending:
+                self._add_exact(hashes)
+
+    @property
+    def is_exact(self) -> bool:
+        """Whether count() is exact"""
+        self._compact()
+        return self._pending is not None
+
+    def count(self) -> int:
+        """Get the number of distinct values added"""
+        self._compact()
+        return self._pending_size if self._pending is not None else self.hll.estimate()
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch over floats
+
+    Items live in levels of compactors; an item at level h stands for
+    2**h inputs. A full level is sorted and every other item, from a
+    random offset, is promoted to the next level. Memory is O(k) for the
+    top levels plus a logarithmic number of small ones, independent of
+    the number of inputs.
+    """
+
+    def __init__(self, k: int = 400, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        """Capacity of a level; lower levels shrink geometrically"""
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        """Compact levels until every level fits its capacity"""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+
+                # An odd item out stays behind at this level
+                leftover = items[:len(items) % 2]
+                paired = items[len(items) % 2:]
+                promoted = paired[int(self._rng.integers(2))::2]
+
+                self.levels[level] = leftover
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                # Adding a level shrinks lower capacities, so start over
+                level = 0
+                continue
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        """Add finite float values to the sketch"""
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values.astype(np.float64, copy=False)])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        """
+        Estimate quantiles of the values added
+
+        Args:
+            qs: Quantile ranks between 0 and 1
+
+        Returns:
+            Estimated values, or None for each rank when the sketch is empty
+        """
+        if self.count == 0:
+            return [None for _ in qs]
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_at), 2.0 ** level) for level, items_at in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        targets = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, targets, side="left"), len(items) - 1)
+        return items[positions].tolist()
+
+
+class RunningMoments:
+    """
+    Count, mean and variance accumulated batch by batch
+
+    Batches are folded in with the parallel form of Welford's update
+    (Chan et al.), which stays numerically stable for long streams.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def _fold(self, count: int, mean: float, m2: float) -> None:
+        """Combine the moments of another batch"""
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    def update(self, values: np.ndarray) -> None:
+        """Add finite float values"""
+        if len(values) == 0:
+            return
+        mean = float(values.mean())
+        self._fold(len(values), mean, float(((values - mean) ** 2).sum()))
+
+    def merge(self, other: "RunningMoments") -> None:
+        """Fold another accumulator into this one"""
+        self._fold(other.count, other.mean, other.m2)
+
+    def std(self) -> Optional[float]:
+        """Sample standard deviation (ddof=1), or None with fewer than two values"""
+        if self.count < 2:
+            return None
+        return math.sqrt(self.m2 / (self.count - 1))
+
+
+class HeavyHitters:
+    """
+    Bounded frequent-value counter applied batch by batch
+
+    At most capacity counters are kept. Counts are exact while a column
+    has at most capacity distinct values. Past that, only the capacity
+    largest counts survive each batch, so a value's count restarts if it
+    drops out; counts are then lower bounds, and values that are frequent
+    throughout the stream stay tracked.
+    """
+
+    def __init__(self, capacity: int = 8192):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+
+    def _prune(self, counts: pd.Series) -> pd.Series:
+        """Keep the capacity largest counts"""
+        if len(counts) <= self.capacity:
+            return counts
+        return counts.nlargest(self.capacity)
+
+    def update(self, series: pd.Series) -> None:
+        """Count the non-null values of a batch"""
+        batch = series.value_counts(dropna=True, sort=False)
+        batch = batch[batch > 0]
+        if len(self.counts):
+            batch = pd.concat([self.counts, batch]).groupby(level=0, sort=False).sum()
+        self.counts = self._prune(batch)
+
+    def merge(self, other: "HeavyHitters") -> None:
+        """Fold another counter into this one"""
+        combined = pd.concat([self.counts, other.counts]).groupby(level=0, sort=False).sum()
+        self.counts = self._prune(combined)
+
+    def top(self, n: int) -> Dict[Any, int]:
+        """Get the n most frequent values and their counts"""
+        return {value: int(count) for value, count in self.counts.nlargest(n).items()}
@@ -0,0 +1,210 @@
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from services.column_stats import detect_datetime_columns
+from services.correlation import CorrelationAccumulator, correlation_columns, summarize_correlations
+from services.sketches import hash_values, DistinctCounter, KLLSketch, RunningMoments, HeavyHitters
+from utils.dtype_compaction import widen_dtype
+
+# CSV files larger than this are profiled in chunks instead of loaded whole (default: 256 MB)
+STREAMING_PROFILE_THRESHOLD_BYTES = int(os.getenv("STREAMING_PROFILE_THRESHOLD_BYTES", str(256 * 1024 * 1024)))
+
+# Rows read per chunk in streaming mode
+STREAMING_CHUNK_ROWS = int(os.getenv("STREAMING_CHUNK_ROWS", "100000"))
+
+# Distinct values counted exactly per column before switching to HyperLogLog
+EXACT_DISTINCT_LIMIT = 8192
+
+# Distinct rows counted exactly; beyond this duplicate rows are not reported
+EXACT_DISTINCT_ROWS_LIMIT = 2_000_000
+
+# Quantile ranks reported for numeric columns
+QUARTILES = [0.25, 0.5, 0.75]
+
+
+def should_stream_profile(file_path: str) -> bool:
+    """
+    Decide whether a file is profiled in chunks
+
+    Only CSV files can be read incrementally, so other formats are always
+    loaded whole.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        True if the file is a CSV above STREAMING_PROFILE_THRESHOLD_BYTES
+    """
+    if Path(file_path).suffix.lower() != ".csv":
+        return False
+    try:
+        return os.path.getsize(file_path) > STREAMING_PROFILE_THRESHOLD_BYTES
+    except OSError:
+        return False
+
+
+class ColumnSketch:
+    """Mergeable per-column summary with memory independent of row count"""
+
+    def __init__(self, dtype: Any, top_capacity: int):
+        self.dtype = dtype
+        self.null_count = 0
+        self.distinct = DistinctCounter(EXACT_DISTINCT_LIMIT)
+        self.moments = RunningMoments()
+        self.quantiles = KLLSketch()
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.top = HeavyHitters(top_capacity) if self._is_text(dtype) else None
+        self.top_capacity = top_capacity
+
+    @staticmethod
+    def _is_text(dtype: Any) -> bool:
+        return dtype == object or isinstance(dtype, pd.CategoricalDtype)
+
+    @property
+    def is_numeric(self) -> bool:
+        return pd.api.types.is_numeric_dtype(self.dtype)
+
+    def _reconcile_dtype(self, dtype: Any) -> None:
+        """
+        Widen the tracked dtype when a chunk was inferred differently
+
+        The dtype is widened by widen_dtype, as in the chunked reader. Values
+        seen before the column became text are not in its top-value counts
+        and were hashed as numbers, so its distinct count can run slightly high.
+        """
+        self.dtype = widen_dtype(self.dtype, dtype)
+        if self.dtype == object and self.top is None:
+            self.top = HeavyHitters(self.top_capacity)
+
+    def update(self, series: pd.Series) -> None:
+        """Fold one chunk of the column into the sketch"""
+        self._reconcile_dtype(series.dtype)
+        present = series.notna()
+        self.null_count += int(len(series) - present.sum())
+        values = series[present]
+        if len(values) == 0:
+            return
+        if self.dtype == object and values.dtype != object:
+            # Match the text form of chunks in which the column was parsed as text
+            values = values.astype(str).astype(object)
+
+        self.distinct.update_hashes(hash_values(values.to_numpy()))
+        if self.top is not None:
+            self.top.update(values)
+
+        if self.is_numeric and pd.api.types.is_numeric_dtype(values.dtype):
+            floats = values.to_numpy(dtype=np.float64)
+            self.moments.update(floats)
+            self.quantiles.update(floats)
+            chunk_min, chunk_max = values.min(), values.max()
+            self.minimum = chunk_min if self.minimum is None else min(self.minimum, chunk_min)
+            self.maximum = chunk_max if self.maximum is None else max(self.maximum, chunk_max)
+
+    def stats(self, top_n: int) -> Dict[str, Any]:
+        """Describe the column in the format of compute_column_stats"""
+        stats: Dict[str, Any] = {
+            "dtype": str(self.dtype),
+            "null_count": self.null_count,
+            "is_numeric": self.is_numeric,
+            "unique_count": self.distinct.count(),
+            "approximate": not self.distinct.is_exact,
+        }
+        if self.is_numeric:
+            has_values = self.moments.count > 0
+            stats.update({
+                "mean": self.moments.mean if has_values else None,
+                "std": self.moments.std(),
+                "min": self.minimum.item() if isinstance(self.minimum, np.generic) else self.minimum,
+                "max": self.maximum.item() if isinstance(self.maximum, np.generic) else self.maximum,
+                "quartiles": self.quantiles.quantiles(QUARTILES) if has_values else None,
+            })
+        if top_n > 0 and self.top is not None:
+            stats["top_values"] = self.top.top(top_n)
+        return stats
+
+
+class StreamingProfiler:
+    """
+    Profile a dataset chunk by chunk in bounded memory
+
+    Null counts, means, standard deviations, minima and maxima are exact.
+    Distinct counts are exact up to EXACT_DISTINCT_LIMIT values and
+    HyperLogLog estimates beyond; quartiles come from a KLL sketch and top
+    values from bounded counters. Unless the caller already knows them,
+    datetime columns are detected from the first chunk, whose date text
+    must parse in full. Correlations of the numeric columns are exact,
+    since their sums add up across chunks.
+    """
+
+    def __init__(
+        self,
+        top_n: int = 5,
+        top_capacity: int = EXACT_DISTINCT_LIMIT,
+        datetime_columns: Optional[List[Any]] = None
+    ):
+        self.top_n = top_n
+        self.top_capacity = top_capacity
+        self.rows = 0
+        self.memory_bytes = 0
+        self.columns: Dict[Any, ColumnSketch] = {}
+        self.distinct_rows = DistinctCounter(EXACT_DISTINCT_ROWS_LIMIT)
+        self.detect_datetimes = datetime_columns is None
+        self.datetime_columns: List[Any] = list(datetime_columns or [])
+        self.head: Optional[pd.DataFrame] = None
+        self.correlations: Optional[CorrelationAccumulator] = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Fold one chunk of rows into the profile"""
+        if self.head is None:
+            self.head = chunk.head()
+            self.columns = {col: ColumnSketch(chunk[col].dtype, self.top_capacity) for col in chunk.columns}
+            if self.detect_datetimes:
+                self.datetime_columns = detect_datetime_columns(chunk)
+            self.correlations = CorrelationAccumulator(correlation_columns(chunk))
+
+        self.rows += len(chunk)
+        self.memory_bytes += int(chunk.memory_usage(deep=True).sum())
+        self.distinct_rows.update_hashes(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+        for col, sketch in self.columns.items():
+            sketch.update(chunk[col])
+
+        # A column that turns out to hold text is dropped from the summary, so its values only need to parse
+        numeric = chunk[self.correlations.columns]
+        if len(correlation_columns(numeric)) < len(numeric.columns):
+            numeric = numeric.apply(pd.to_numeric, errors="coerce")
+        self.correlations.update(numeric)
+
+    def mark_categorical(self, columns: List[Any]) -> None:
+        """Report text columns as categorical, once they are known to be stored that way"""
+        for col in columns:
+            self.columns[col].dtype = pd.CategoricalDtype()
+
+    def column_stats(self) -> Dict[Any, Dict[str, Any]]:
+        """Get per-column statistics in the format of compute_column_stats"""
+        return {col: sketch.stats(self.top_n) for col, sketch in self.columns.items()}
+
+    def correlation_summary(self) -> Dict[str, Any]:
+        """Get the correlations among the columns still numeric after every chunk, with the full matrix"""
+        columns = [
+            col for col in self.correlations.columns
+            if self.columns[col].is_numeric and not pd.api.types.is_bool_dtype(self.columns[col].dtype)
+        ]
+        return summarize_correlations(self.correlations, columns, include_matrix=True)
+
+    def duplicate_rows(self) -> Optional[int]:
+        """
+        Number of duplicated rows, or None past EXACT_DISTINCT_ROWS_LIMIT distinct rows
+
+        A sketch estimate of distinct rows is too coarse to count a handful
+        of duplicates among millions, so none is reported instead.
+        """
+        if not self.distinct_rows.is_exact:
+            return None
+        return self.rows - self.distinct_rows.count()
+
+    def is_exact(self) -> bool:
+        """Whether every distinct count is exact; quartiles are always estimates"""
+        return all(sketch.distinct.is_exact for sketch in self.columns.values())
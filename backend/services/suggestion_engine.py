@@ -3,8 +3,8 @@ from typing import List, Dict, Any, Tuple, Optional
 from sqlalchemy.orm import Session
 from schemas import ChartSuggestion, SuggestionsResponse
 from models import Dataset
-from utils.file_utils import read_file_with_pandas
-from pandas.api.types import is_categorical_dtype  # type: ignore
+from services.column_stats import compute_column_stats, detect_datetime_columns
+from services.chart_ranking import rank_chart_candidates, SUGGESTION_TOP_K
 
 
 
@@ -15,155 +15,201 @@ def analyze_column_types(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
     Args:
         df: Pandas DataFrame
         
+    Returns:
+        Dictionary with column analysis
+    """
+    # Compute all per-column statistics in whole-frame reductions
+    column_stats = compute_column_stats(df)
+    datetime_cols = detect_datetime_columns(df)
+    
+    return build_column_analysis(column_stats, datetime_cols, len(df))
+
+def build_column_analysis(column_stats: Dict[Any, Dict[str, Any]], datetime_cols: List[Any], total_rows: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Classify columns for chart suggestions from precomputed statistics
+    
+    Args:
+        column_stats: Per-column statistics as returned by compute_column_stats
+            or the streaming profiler
+        datetime_cols: Columns holding dates or date-times
+        total_rows: Number of rows in the dataset
+        
     Returns:
         Dictionary with column analysis
     """
     column_analysis = {}
+    datetime_cols = set(datetime_cols)
     
-    for col in df.columns:
+    for col, stats in column_stats.items():
+        is_category_dtype = stats["dtype"] == "category"
         analysis = {
             "name": col,
-            "dtype": str(df[col].dtype),
-            "unique_count": df[col].nunique(),
-            "null_count": df[col].isnull().sum(),
-            "total_count": len(df),
-            "is_numeric": pd.api.types.is_numeric_dtype(df[col]),
-            "is_categorical": is_categorical_dtype(df[col]),
-            "is_datetime": False,
+            "dtype": stats["dtype"],
+            "unique_count": stats["unique_count"],
+            "null_count": stats["null_count"],
+            "total_count": total_rows,
+            "is_numeric": stats["is_numeric"],
+            "is_categorical": is_category_dtype,
+            "is_datetime": col in datetime_cols,
             "is_continuous": False
         }
         
         # Determine if categorical
-        if df[col].dtype == 'object' or is_categorical_dtype(df[col]):
+        if stats["dtype"] == "object" or is_category_dtype:
             analysis["is_categorical"] = True
         elif analysis["is_numeric"] and analysis["unique_count"] < 20:
             analysis["is_categorical"] = True
         
-        # Check for datetime patterns
-        if df[col].dtype == 'object':
-            sample_vals = df[col].dropna().astype(str).head(10)
-            datetime_indicators = 0
-            for val in sample_vals:
-                if any(char in val for char in ['/', '-', ':']):
-                    datetime_indicators += 1
-            if datetime_indicators >= 5:  # Heuristic
-                analysis["is_datetime"] = True
+        # Date text from streamed files is still object dtype, but it is temporal
+        if analysis["is_datetime"]:
+            analysis["is_categorical"] = False
         
         # Determine if continuous numeric
         if analysis["is_numeric"] and not analysis["is_categorical"]:
             analysis["is_continuous"] = True
         
-        # Calculate statistics if numeric
+        # Include statistics if numeric
         if analysis["is_numeric"]:
             analysis.update({
-                "mean": df[col].mean() if not df[col].isnull().all() else None,
-                "std": df[col].std() if not df[col].isnull().all() else None,
-                "min": df[col].min() if not df[col].isnull().all() else None,
-                "max": df[col].max() if not df[col].isnull().all() else None
+                "mean": stats["mean"],
+                "std": stats["std"],
+                "min": stats["min"],
+                "max": stats["max"]
             })
         
         column_analysis[col] = analysis
     
     return column_analysis
 
-def generate_chart_suggestions(column_analysis: Dict[str, Dict[str, Any]]) -> List[ChartSuggestion]:
+def _correlated_columns(correlations: Optional[Dict[str, Any]], limit: int) -> List[str]:
+    """Columns of the most correlated pairs, strongest first, without repeats"""
+    columns: Dict[str, None] = {}
+    for pair in (correlations or {}).get("top_pairs", []):
+        columns.setdefault(pair["x"])
+        columns.setdefault(pair["y"])
+    return list(columns)[:limit]
+
+def _build_suggestion(candidate: Dict[str, Any], column_analysis: Dict[str, Dict[str, Any]]) -> ChartSuggestion:
     """
-    Generate chart suggestions based on column analysis
+    Turn a ranked chart candidate into a suggestion with its text and data query
     
     Args:
+        candidate: Candidate as returned by rank_chart_candidates
         column_analysis: Dictionary with column analysis results
         
     Returns:
-        List of ChartSuggestion objects
+        ChartSuggestion for the candidate
     """
-    suggestions = []
-    
-    # Get lists of different column types
-    numeric_cols = [col for col, info in column_analysis.items() if info["is_numeric"]]
-    categorical_cols = [col for col, info in column_analysis.items() if info["is_categorical"]]
-    continuous_cols = [col for col, info in column_analysis.items() if info["is_continuous"]]
-    datetime_cols = [col for col, info in column_analysis.items() if info["is_datetime"]]
-    
-    # Bar charts for categorical data
-    for col in categorical_cols[:3]:  # Limit suggestions
-        if column_analysis[col]["unique_count"] <= 15:  # Reasonable for bar chart
-            suggestions.append(ChartSuggestion(
-                chart_type="bar",
-                title=f"Distribution of {col}",
-                description=f"Bar chart showing the frequency of different values in {col}",
-                columns=[col],
-                reasoning=f"Column '{col}' is categorical with {column_analysis[col]['unique_count']} unique values, suitable for bar chart visualization"
-            ))
-    
-    # Histograms for continuous numeric data
-    for col in continuous_cols[:2]:  # Limit suggestions
-        suggestions.append(ChartSuggestion(
+    chart_type, columns, score = candidate["chart_type"], candidate["columns"], candidate["score"]
+    
+    if chart_type == "bar":
+        col = columns[0]
+        return ChartSuggestion(
+            chart_type="bar",
+            title=f"Distribution of {col}",
+            description=f"Bar chart showing the frequency of different values in {col}",
+            columns=columns,
+            reasoning=f"Column '{col}' is categorical with {column_analysis[col]['unique_count']} unique values, suitable for bar chart visualization",
+            aggregate={"group_by": [col], "aggs": ["count"]},
+            score=score
+        )
+    
+    if chart_type == "histogram":
+        col = columns[0]
+        return ChartSuggestion(
             chart_type="histogram",
             title=f"Distribution of {col}",
             description=f"Histogram showing the distribution of values in {col}",
-            columns=[col],
-            reasoning=f"Column '{col}' is numeric and continuous, perfect for histogram to show data distribution"
-        ))
-    
-    # Scatter plots for pairs of numeric columns
-    if len(numeric_cols) >= 2:
-        col1, col2 = numeric_cols[0], numeric_cols[1]
-        suggestions.append(ChartSuggestion(
+            columns=columns,
+            reasoning=f"Column '{col}' is numeric and continuous, perfect for histogram to show data distribution",
+            score=score
+        )
+    
+    if chart_type == "scatter":
+        col1, col2 = columns
+        correlation = candidate.get("correlation")
+        if correlation is not None:
+            reasoning = f"'{col1}' and '{col2}' are correlated numeric columns (r = {correlation:.2f}), a scatter plot shows the shape of that relationship"
+        else:
+            reasoning = f"'{col1}' and '{col2}' are both numeric, a scatter plot shows whether and how they are related"
+        return ChartSuggestion(
             chart_type="scatter",
             title=f"{col1} vs {col2}",
             description=f"Scatter plot showing the relationship between {col1} and {col2}",
-            columns=[col1, col2],
-            reasoning=f"Both '{col1}' and '{col2}' are numeric columns, ideal for exploring correlation with scatter plot"
-        ))
-    
-    # Line charts for time series data
-    if datetime_cols and numeric_cols:
-        datetime_col = datetime_cols[0]
-        numeric_col = numeric_cols[0]
-        suggestions.append(ChartSuggestion(
+            columns=columns,
+            reasoning=reasoning,
+            downsample={"x": col1, "y": [col2], "method": "sample"},
+            score=score
+        )
+    
+    if chart_type == "line":
+        datetime_col, numeric_col = columns
+        return ChartSuggestion(
             chart_type="line",
             title=f"{numeric_col} over {datetime_col}",
             description=f"Line chart showing how {numeric_col} changes over {datetime_col}",
-            columns=[datetime_col, numeric_col],
-            reasoning=f"Column '{datetime_col}' appears to be temporal and '{numeric_col}' is numeric, perfect for time series visualization"
-        ))
-    
-    # Box plots for numeric data grouped by categorical
-    if categorical_cols and numeric_cols:
-        cat_col = categorical_cols[0]
-        num_col = numeric_cols[0]
-        if column_analysis[cat_col]["unique_count"] <= 10:  # Reasonable for box plot
-            suggestions.append(ChartSuggestion(
-                chart_type="box",
-                title=f"{num_col} by {cat_col}",
-                description=f"Box plot showing the distribution of {num_col} across different {cat_col} categories",
-                columns=[cat_col, num_col],
-                reasoning=f"Column '{cat_col}' is categorical with few unique values, and '{num_col}' is numeric - ideal for comparing distributions"
-            ))
-    
-    # Pie chart for categorical data with few categories
-    for col in categorical_cols:
-        if 2 <= column_analysis[col]["unique_count"] <= 8:  # Good range for pie chart
-            suggestions.append(ChartSuggestion(
-                chart_type="pie",
-                title=f"Composition of {col}",
-                description=f"Pie chart showing the proportional breakdown of {col}",
-                columns=[col],
-                reasoning=f"Column '{col}' has {column_analysis[col]['unique_count']} categories, suitable for showing proportions in a pie chart"
-            ))
-            break  # Only suggest one pie chart
-    
-    # Correlation heatmap if multiple numeric columns
-    if len(numeric_cols) >= 3:
-        suggestions.append(ChartSuggestion(
-            chart_type="heatmap",
-            title="Correlation Matrix",
-            description="Heatmap showing correlations between numeric variables",
-            columns=numeric_cols[:5],  # Limit to first 5 numeric columns
-            reasoning="Multiple numeric columns detected - correlation heatmap will reveal relationships between variables"
-        ))
-    
-    return suggestions
+            columns=columns,
+            reasoning=f"Column '{datetime_col}' holds dates and '{numeric_col}' is numeric, perfect for time series visualization",
+            resample={"x": datetime_col, "y": [numeric_col], "frequency": "auto", "agg": "mean"},
+            score=score
+        )
+    
+    if chart_type == "box":
+        cat_col, num_col = columns
+        return ChartSuggestion(
+            chart_type="box",
+            title=f"{num_col} by {cat_col}",
+            description=f"Box plot showing the distribution of {num_col} across different {cat_col} categories",
+            columns=columns,
+            reasoning=f"Column '{cat_col}' is categorical with few unique values, and '{num_col}' is numeric - ideal for comparing distributions",
+            score=score
+        )
+    
+    if chart_type == "pie":
+        col = columns[0]
+        return ChartSuggestion(
+            chart_type="pie",
+            title=f"Composition of {col}",
+            description=f"Pie chart showing the proportional breakdown of {col}",
+            columns=columns,
+            reasoning=f"Column '{col}' has {column_analysis[col]['unique_count']} categories, suitable for showing proportions in a pie chart",
+            aggregate={"group_by": [col], "aggs": ["count"]},
+            score=score
+        )
+    
+    return ChartSuggestion(
+        chart_type="heatmap",
+        title="Correlation Matrix",
+        description="Heatmap showing correlations between numeric variables",
+        columns=columns,
+        reasoning="Multiple numeric columns detected - correlation heatmap will reveal relationships between variables",
+        correlation={"columns": columns, "method": "pearson"},
+        score=score
+    )
+
+def generate_chart_suggestions(
+    column_analysis: Dict[str, Dict[str, Any]],
+    correlations: Optional[Dict[str, Any]] = None,
+    summary_stats: Optional[Dict[str, Any]] = None,
+    top_k: int = SUGGESTION_TOP_K
+) -> List[ChartSuggestion]:
+    """
+    Generate the highest scoring chart suggestions for a dataset
+    
+    Every column and column pair is scored for each chart type from the
+    profile's statistics; see rank_chart_candidates.
+    
+    Args:
+        column_analysis: Dictionary with column analysis results
+        correlations: Correlation summary of the dataset profile
+        summary_stats: Summary statistics of the dataset profile
+        top_k: Maximum number of suggestions
+        
+    Returns:
+        List of ChartSuggestion objects, best first
+    """
+    candidates, _ = rank_chart_candidates(column_analysis, correlations, summary_stats, top_k)
+    return [_build_suggestion(candidate, column_analysis) for candidate in candidates]
 
 def get_suggestions_for_dataset(db: Session, dataset_id: int) -> Tuple[bool, str, Optional[SuggestionsResponse]]:
     """
@@ -182,17 +228,15 @@ def get_suggestions_for_dataset(db: Session, dataset_id: int) -> Tuple[bool, str
         if not dataset:
             return False, "Dataset not found", None
         
-        # Read the dataset file
-        file_path: str = str(dataset.file_path)
-        success, message, df = read_file_with_pandas(file_path)
-        if not success or df is None:
-            return False, f"Error reading dataset: {message}", None
-        
-        # Analyze columns
-        column_analysis = analyze_column_types(df)
+        # Use the column analysis stored with the dataset profile
+        from services.profiling import get_dataset_profile
+        success, message, profile = get_dataset_profile(db, dataset)
+        if not success or profile is None:
+            return False, message, None
+        column_analysis = profile["column_analysis"]
         
         # Generate suggestions
-        suggestions = generate_chart_suggestions(column_analysis)
+        suggestions = generate_chart_suggestions(column_analysis, profile["correlations"], profile["summary_stats"])
 
         # Create response
         response = SuggestionsResponse(
@@ -205,12 +249,59 @@ def get_suggestions_for_dataset(db: Session, dataset_id: int) -> Tuple[bool, str
     except Exception as e:
         return False, f"Error generating suggestions: {str(e)}", None
 
-def get_column_insights(df: pd.DataFrame) -> List[str]:
+def get_insights_for_dataset(db: Session, dataset_id: int) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Get detailed insights about a dataset's structure from its stored profile
+    
+    Args:
+        db: Database session
+        dataset_id: ID of the dataset
+        
+    Returns:
+        Tuple of (success, message, detailed_insights)
+    """
+    try:
+        # Get dataset
+        dataset = db.query(Dataset).filter(Dataset.id == dataset_id).first()
+        if not dataset:
+            return False, "Dataset not found", None
+        
+        # Read the profile computed at ingest
+        from services.profiling import get_dataset_profile
+        success, message, profile = get_dataset_profile(db, dataset)
+        if not success or profile is None:
+            return False, message, None
+        column_analysis = profile["column_analysis"]
+        
+        # Compile detailed insights
+        detailed_insights = {
+            "dataset_id": dataset_id,
+            "filename": dataset.filename,
+            "upload_date": dataset.upload_date.isoformat(),
+            "shape": {"rows": profile["rows"], "columns": profile["columns"]},
+            "column_analysis": column_analysis,
+            "strategic_insights": profile["column_insights"],
+            "data_quality": profile["data_quality"],
+            "recommendations": {
+                "best_for_trends": [col for col, info in column_analysis.items() if info.get("is_datetime")],
+                "best_for_categories": [col for col, info in column_analysis.items() if info.get("is_categorical") and info["unique_count"] <= 10],
+                "best_for_distributions": [col for col, info in column_analysis.items() if info.get("is_continuous")],
+                "best_for_correlations": _correlated_columns(profile["correlations"], 5)
+            }
+        }
+        
+        return True, "Insights generated successfully", detailed_insights
+    
+    except Exception as e:
+        return False, f"Error analyzing dataset: {str(e)}", None
+
+def get_column_insights(df: pd.DataFrame, column_analysis: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
     """
     Generate insights about columns for suggestion context
     
     Args:
         df: Pandas DataFrame
+        column_analysis: Precomputed result of analyze_column_types, if available
         
     Returns:
         List of insight strings
@@ -218,7 +309,8 @@ def get_column_insights(df: pd.DataFrame) -> List[str]:
     insights = []
     
     try:
-        column_analysis = analyze_column_types(df)
+        if column_analysis is None:
+            column_analysis = analyze_column_types(df)
         
         # Count different types
         numeric_count = sum(1 for info in column_analysis.values() if info["is_numeric"])
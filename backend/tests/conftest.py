@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+# Tests import the backend's top-level packages (services, utils) the way the app does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The database and worker pools are configured when first imported, so API tests get a
+# throwaway database and run CPU-bound work on threads instead of spawned processes
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='dataviz-tests-'), 'test.db')}")
+os.environ.setdefault("CPU_WORKERS", "0")
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """Store uploads of the test in its own directory"""
+    import utils.file_utils as file_utils
+    directory = tmp_path / "uploads"
+    directory.mkdir()
+    monkeypatch.setattr(file_utils, "UPLOAD_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture
+def client(upload_dir):
+    """Test client of the app, with every table emptied afterwards"""
+    from fastapi.testclient import TestClient
+    from app import app
+    from database import engine
+    from models import Base
+
+    with TestClient(app) as test_client:
+        yield test_client
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+@pytest.fixture
+def wait_for_job(client):
+    """Poll a job until it completes or fails and return its final status"""
+    def wait(job_id, timeout=30.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            status = client.get(f"/api/data/jobs/{job_id}").json()
+            if status["status"] in ("completed", "failed") or time.monotonic() > deadline:
+                return status
+            time.sleep(0.02)
+    return wait
+
+
+@pytest.fixture
+def upload(client, wait_for_job):
+    """Upload file content, wait for its ingestion job and return the final job status"""
+    def upload_content(content, filename="data.csv"):
+        data = content.encode() if isinstance(content, str) else content
+        response = client.post("/api/data/upload", files={"file": (filename, data, "text/csv")})
+        assert response.status_code == 202, response.text
+        return wait_for_job(response.json()["job_id"])
+    return upload_content
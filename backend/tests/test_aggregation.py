@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from services.aggregation import aggregate_dataframe
+from services.column_stats import compute_column_stats
+from utils.dtype_compaction import compact_dataframe
+
+
+def test_aggregates_of_compacted_frame_match_original():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "group": rng.integers(0, 3, 200_000),
+        "value": rng.integers(0, 1000, 200_000) + 0.5,
+    })
+    compacted, _ = compact_dataframe(df)
+    assert compacted["value"].dtype == np.float32
+
+    aggs = ["count", "sum", "mean", "min", "max"]
+    expected = aggregate_dataframe(df, ["group"], ["value"], aggs)
+    actual = aggregate_dataframe(compacted, ["group"], ["value"], aggs)
+
+    assert actual["data"] == expected["data"]
+
+
+def test_column_stats_of_compacted_frame_match_original():
+    df = pd.DataFrame({"value": np.random.default_rng(1).integers(0, 4_000, 10_000) / 4 + 0.5})
+    compacted, _ = compact_dataframe(df)
+    assert compacted["value"].dtype == np.float32
+
+    expected = compute_column_stats(df)["value"]
+    actual = compute_column_stats(compacted)["value"]
+
+    assert {**actual, "dtype": "float64"} == expected
+
+
+def test_group_cap_truncates_and_reports_it(monkeypatch):
+    import services.aggregation as aggregation
+    monkeypatch.setattr(aggregation, "MAX_AGGREGATE_GROUPS", 5)
+    df = pd.DataFrame({"key": np.arange(20) % 8, "value": np.arange(20)})
+
+    result = aggregate_dataframe(df, ["key"], ["value"], ["sum"], limit=1000)
+
+    assert [record["key"] for record in result["data"]] == [0, 1, 2, 3, 4]
+    assert result["metadata"]["total_groups"] == 8
+    assert result["metadata"]["limit_applied"] == 5
+    assert result["metadata"]["truncated"] is True
+
+
+def test_float_aggregates_keep_full_precision():
+    df = pd.DataFrame({"key": ["a", "a"], "value": [0.1234567890123456, 1e-17]})
+
+    result = aggregate_dataframe(df, ["key"], ["value"], ["sum", "max"])
+
+    assert result["data"] == [{"key": "a", "value_sum": 0.1234567890123456 + 1e-17, "value_max": 0.1234567890123456}]
+
+
+def test_datetime_columns_reject_arithmetic():
+    df = pd.DataFrame({"key": ["a", "b"], "when": pd.to_datetime(["2024-01-05", "2024-01-06"])})
+
+    result = aggregate_dataframe(df, ["key"], ["when"], ["count", "min"])
+    assert result["data"][0] == {"key": "a", "when_count": 1, "when_min": "2024-01-05T00:00:00.000"}
+
+    for agg in ("sum", "mean"):
+        try:
+            aggregate_dataframe(df, ["key"], ["when"], [agg])
+        except ValueError as e:
+            assert "holds dates" in str(e)
+        else:
+            raise AssertionError(f"{agg} of a datetime column was accepted")
+
+
+def test_aggregate_endpoint(upload, client):
+    dataset_id = upload("city,amount\nOslo,1.5\nRome,2\nOslo,3\n")["dataset_id"]
+
+    response = client.post("/api/data/aggregate", json={
+        "dataset_id": dataset_id, "group_by": ["city"], "values": ["amount"], "aggs": ["sum", "count"],
+    })
+    assert response.status_code == 200
+    assert response.json()["data"] == [
+        {"city": "Oslo", "amount_sum": 4.5, "amount_count": 2},
+        {"city": "Rome", "amount_sum": 2.0, "amount_count": 1},
+    ]
+
+    response = client.post("/api/data/aggregate", json={
+        "dataset_id": dataset_id, "group_by": ["city"], "values": ["missing"], "aggs": ["sum"],
+    })
+    assert response.status_code == 400
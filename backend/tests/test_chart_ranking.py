@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from services.chart_ranking import rank_chart_candidates
+from services.correlation import profile_correlations
+from services.suggestion_engine import analyze_column_types
+
+
+def scatter_candidates(df, correlations):
+    candidates, _ = rank_chart_candidates(analyze_column_types(df), correlations, top_k=50)
+    return [candidate for candidate in candidates if candidate["chart_type"] == "scatter"]
+
+
+def test_scatter_suggested_without_correlated_pairs():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"a": rng.normal(size=500), "b": rng.normal(size=500)})
+
+    scatters = scatter_candidates(df, {})
+
+    assert [candidate["columns"] for candidate in scatters] == [["a", "b"]]
+    assert scatters[0]["correlation"] is None
+
+
+def test_correlation_boosts_scatter_pair():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"a": rng.normal(size=500), "b": rng.normal(size=500), "c": rng.normal(size=500)})
+    df["d"] = df["c"] * 2 + rng.normal(scale=0.1, size=500)
+
+    scatters = scatter_candidates(df, profile_correlations(df))
+
+    assert scatters[0]["columns"] == ["c", "d"]
+    assert scatters[0]["correlation"] > 0.9
+    assert scatters[0]["score"] > scatters[1]["score"]
+
+
+def test_column_budget_skips_later_chart_types():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({"a": rng.normal(size=500), "b": rng.normal(size=500), "c": rng.choice(["x", "y"], 500)})
+    column_analysis = analyze_column_types(df)
+
+    candidates, stats = rank_chart_candidates(column_analysis, top_k=50, column_budget=2 * len(df.columns))
+
+    assert list(stats["scored"]) == ["bar", "histogram"]
+    assert stats["budget_exhausted"]
+    assert {candidate["chart_type"] for candidate in candidates} == {"bar", "histogram"}
+    assert rank_chart_candidates(column_analysis, top_k=50, column_budget=2 * len(df.columns))[0] == candidates
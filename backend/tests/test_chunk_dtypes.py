@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from services.streaming_profile import ColumnSketch
+from utils.dtype_compaction import widen_dtype
+from utils.file_utils import read_file_in_chunks
+
+
+def test_widen_dtype_promotes_numbers_and_falls_back_to_text():
+    assert widen_dtype(np.dtype("int64"), np.dtype("int64")) == np.dtype("int64")
+    assert widen_dtype(np.dtype("int64"), np.dtype("float64")) == np.dtype("float64")
+    assert widen_dtype(np.dtype("int8"), np.dtype("uint16")) == np.dtype("int32")
+    assert widen_dtype(np.dtype("float64"), np.dtype(object)) == np.dtype(object)
+    assert widen_dtype(np.dtype("bool"), np.dtype("int64")) == np.dtype(object)
+    assert widen_dtype(pd.CategoricalDtype(["a"]), pd.CategoricalDtype(["b"])) == np.dtype(object)
+
+
+def test_chunked_reader_and_column_sketch_agree(tmp_path):
+    path = tmp_path / "drift.csv"
+    pd.DataFrame({
+        "ints_then_gaps": [1, 2, 3, 4, None, 6],
+        "ints_then_text": [1, 2, 3, 4, "x", "y"],
+        "stable": [1.5, 2.5, 3.5, 4.5, 5.5, 6.5],
+    }).to_csv(path, index=False)
+
+    chunks = list(read_file_in_chunks(str(path), chunksize=2))
+    sketches = {col: ColumnSketch(chunks[0][col].dtype, top_capacity=8) for col in chunks[0].columns}
+    for chunk in chunks:
+        for col, sketch in sketches.items():
+            sketch.update(chunk[col])
+
+    assert {col: sketch.dtype for col, sketch in sketches.items()} == chunks[-1].dtypes.to_dict()
+    assert chunks[-1].dtypes.to_dict() == {
+        "ints_then_gaps": np.dtype("float64"),
+        "ints_then_text": np.dtype(object),
+        "stable": np.dtype("float64"),
+    }
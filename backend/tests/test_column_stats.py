@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import services.column_stats as column_stats
+from services.column_stats import QUARTILE_RANKS, compute_column_stats, detect_datetime_columns
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    # Several numeric blocks per dtype, so the block boundaries are exercised
+    monkeypatch.setattr(column_stats, "COLUMN_BLOCK_SIZE", 2)
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({f"f{i}": rng.normal(size=300) for i in range(5)})
+    df.loc[rng.random(300) < 0.1, "f1"] = np.nan
+    df["empty"] = np.nan
+    df["ints"] = rng.integers(-50, 50, 300)
+    df["small"] = rng.integers(0, 5, 300).astype(np.int8)
+    df["nullable"] = pd.array(rng.integers(0, 9, 300), dtype="Int64")
+    df.loc[::7, "nullable"] = pd.NA
+    df["text"] = rng.choice(["a", "b", "c", None], 300)
+    df["size"] = pd.Categorical(rng.choice(["S", "M", "L"], 300))
+    return df
+
+
+def reference_stats(series):
+    """Per-column statistics the way the profiler computed them before vectorizing"""
+    stats = {"dtype": str(series.dtype), "null_count": int(series.isna().sum()), "unique_count": int(series.nunique())}
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        has_values = series.notna().any()
+        for name in ("mean", "std", "min", "max"):
+            stats[name] = float(getattr(series, name)()) if has_values else None
+        stats["quartiles"] = series.quantile(QUARTILE_RANKS).astype(float).tolist() if has_values else None
+    return stats
+
+
+def test_stats_match_per_column_reductions(frame):
+    stats = compute_column_stats(frame)
+
+    for col in frame.columns:
+        expected = reference_stats(frame[col])
+        actual = {name: stats[col][name] for name in expected}
+        for name in ("mean", "std", "min", "max"):
+            if expected.get(name) is not None:
+                assert actual[name] == pytest.approx(expected[name], rel=1e-12), (col, name)
+                actual[name] = expected[name]
+        if expected.get("quartiles") is not None:
+            assert actual["quartiles"] == pytest.approx(expected["quartiles"], rel=1e-12), col
+            actual["quartiles"] = expected["quartiles"]
+        assert actual == expected, col
+
+
+def test_top_values_of_text_columns(frame):
+    stats = compute_column_stats(frame, top_n=2)
+
+    assert stats["text"]["top_values"] == frame["text"].value_counts().head(2).to_dict()
+    assert "top_values" not in stats["f0"]
+
+
+def test_date_text_is_detected_like_typed_dates():
+    df = pd.DataFrame({
+        "typed": pd.to_datetime(["2024-01-01", "2024-01-02"]),
+        "text": ["2024-01-01", "2024-01-02"],
+        "mixed": ["2024-01-01", "soon"],
+        "number": [1, 2],
+    })
+    assert detect_datetime_columns(df) == ["typed", "text"]
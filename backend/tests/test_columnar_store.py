@@ -0,0 +1,93 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.columnar_store import (
+    MANIFEST_NAME, ColumnarStoreWriter, get_store_path, iter_columnar_store, read_columnar_rows,
+    read_columnar_store, read_store_manifest, remove_columnar_store, write_columnar_store,
+)
+
+
+def make_frame():
+    return pd.DataFrame({
+        "amount": np.array([1.5, 2.0, np.nan, 4.25]),
+        "city": ["Oslo", np.nan, "Rome", "Oslo"],
+        "size": pd.Categorical(["S", "L", "S", "M"], categories=["S", "M", "L"], ordered=True),
+        "when": pd.to_datetime(["2024-01-01", "2024-01-02", None, "2024-01-04"]),
+    })
+
+
+def test_round_trip_keeps_values_and_dtypes(tmp_path):
+    file_path = str(tmp_path / "data.csv")
+    df = make_frame()
+    assert write_columnar_store(df, file_path)[0]
+
+    success, _, loaded = read_columnar_store(file_path)
+    assert success
+    pd.testing.assert_frame_equal(loaded, df)
+    pd.testing.assert_frame_equal(read_columnar_rows(file_path, 1, 3), df.iloc[1:3])
+    pd.testing.assert_frame_equal(pd.concat(iter_columnar_store(file_path, 3, ["city"])), df[["city"]])
+
+
+def test_manifest_holds_schema_and_dictionaries_sit_beside_the_codes(tmp_path):
+    file_path = str(tmp_path / "data.csv")
+    write_columnar_store(make_frame(), file_path)
+    store_path = get_store_path(file_path)
+
+    with open(os.path.join(store_path, MANIFEST_NAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert "Oslo" not in json.dumps(manifest)
+
+    entries = {entry["name"]: entry for entry in manifest["columns"]}
+    with open(os.path.join(store_path, entries["city"]["dictionary"]), encoding="utf-8") as f:
+        assert json.load(f) == ["Oslo", "Rome"]
+    with open(os.path.join(store_path, entries["size"]["dictionary"]), encoding="utf-8") as f:
+        assert json.load(f) == ["S", "M", "L"]
+    assert "dictionary" not in entries["amount"]
+
+
+def test_cached_manifest_follows_rewrites_and_removal(tmp_path):
+    file_path = str(tmp_path / "data.csv")
+    write_columnar_store(make_frame(), file_path)
+    manifest = read_store_manifest(file_path)
+    assert read_store_manifest(file_path) is manifest
+
+    write_columnar_store(pd.DataFrame({"other": [1, 2]}), file_path)
+    assert [entry["name"] for entry in read_store_manifest(file_path)["columns"]] == ["other"]
+
+    assert remove_columnar_store(file_path)
+    assert read_store_manifest(file_path) is None
+
+
+def test_chunked_writer_matches_a_whole_frame_write(tmp_path):
+    df = pd.DataFrame({
+        "amount": np.array([1.5, 2.0, np.nan, 4.25, 5.0]),
+        "city": ["Rome", np.nan, "Oslo", "Rome", "Bern"],
+        "code": ["b", "a", "c", "a", "d"],
+        "when": pd.to_datetime(["2024-01-01", "2024-01-02", None, "2024-01-04", "2024-01-05"]),
+    })
+    expected = df.assign(code=df["code"].astype("category"))
+    whole_path, chunked_path = str(tmp_path / "whole.csv"), str(tmp_path / "chunked.csv")
+    write_columnar_store(expected, whole_path)
+
+    writer = ColumnarStoreWriter(chunked_path, len(df))
+    for start in range(0, len(df), 2):
+        writer.append(df.iloc[start:start + 2])
+    assert writer.dictionary_sizes() == {"city": (3, 4), "code": (4, 5)}
+    assert writer.close(["code"], metadata={"source": "chunks"})[0]
+
+    pd.testing.assert_frame_equal(read_columnar_store(chunked_path)[2], read_columnar_store(whole_path)[2])
+    assert read_store_manifest(chunked_path)["metadata"] == {"source": "chunks"}
+
+
+def test_chunked_writer_reports_missing_rows_and_leaves_no_store(tmp_path):
+    file_path = str(tmp_path / "data.csv")
+    writer = ColumnarStoreWriter(file_path, 5)
+    writer.append(make_frame())
+
+    success, message, _ = writer.close()
+
+    assert not success and "Expected 5 rows, got 4" in message
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import services.correlation as correlation
+from services.correlation import CorrelationAccumulator, correlation_matrix, rank_columns
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(7)
+    base = rng.normal(size=5_000)
+    return pd.DataFrame({
+        "a": base,
+        "b": base * 2 + rng.normal(scale=0.5, size=5_000),
+        "c": rng.integers(0, 20, 5_000).astype(np.float64),
+        "d": -base + rng.normal(size=5_000),
+    })
+
+
+@pytest.fixture(autouse=True)
+def small_blocks(monkeypatch):
+    # Several row blocks per call, so the block boundaries are exercised
+    monkeypatch.setattr(correlation, "CORRELATION_BLOCK_CELLS", 1_000)
+
+
+def test_pearson_matches_pandas(frame):
+    assert np.allclose(correlation_matrix(frame, "pearson"), frame.corr("pearson").to_numpy(), atol=1e-9)
+
+
+def test_pearson_with_missing_values_matches_pandas(frame):
+    holes = frame.mask(np.random.default_rng(1).random(frame.shape) < 0.1)
+    assert np.allclose(correlation_matrix(holes, "pearson"), holes.corr("pearson").to_numpy(), atol=1e-9)
+
+
+def test_spearman_matches_pandas(frame):
+    assert np.allclose(correlation_matrix(frame, "spearman"), frame.corr("spearman").to_numpy(), atol=1e-9)
+
+
+def test_rank_columns_matches_frame_rank(frame):
+    holes = frame.mask(np.random.default_rng(2).random(frame.shape) < 0.1)
+    assert np.array_equal(rank_columns(holes), holes.rank(method="average").to_numpy(), equal_nan=True)
+
+
+def test_chunked_updates_match_single_pass(frame):
+    whole = CorrelationAccumulator(list(frame.columns))
+    whole.update(frame)
+    chunked = CorrelationAccumulator(list(frame.columns))
+    for start in range(0, len(frame), 1_300):
+        chunked.update(frame.iloc[start:start + 1_300])
+
+    assert chunked.rows == whole.rows
+    assert np.allclose(chunked.matrix(), whole.matrix(), atol=1e-9)
+
+
+def test_constant_column_is_undefined():
+    frame = pd.DataFrame({"a": [1.0, 2.0, 3.0, 4.0], "b": [5.0] * 4})
+    matrix = correlation_matrix(frame)
+    assert np.isnan(matrix[0, 1]) and np.isnan(matrix[1, 0])
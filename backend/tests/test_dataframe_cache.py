@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from utils.dataframe_cache import DataFrameCache
+
+
+def frame(rows):
+    return pd.DataFrame({"value": np.zeros(rows)})
+
+
+def test_least_recently_used_frames_are_evicted_to_fit_the_budget():
+    size = int(frame(100).memory_usage(deep=True).sum())
+    cache = DataFrameCache(max_bytes=2 * size)
+    cache.put("a.csv", (1.0, 10), frame(100))
+    cache.put("b.csv", (1.0, 10), frame(100))
+    assert cache.get("a.csv", (1.0, 10)) is not None
+
+    cache.put("c.csv", (1.0, 10), frame(100))
+
+    assert cache.get("b.csv", (1.0, 10)) is None
+    assert cache.get("a.csv", (1.0, 10)) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["current_bytes"] == 2 * size
+
+
+def test_oversized_frame_is_not_cached():
+    cache = DataFrameCache(max_bytes=100)
+    assert not cache.put("big.csv", (1.0, 10), frame(1_000))
+    assert cache.stats()["entries"] == 0
+
+
+def test_changed_file_version_is_a_miss_and_drops_the_entry():
+    cache = DataFrameCache(max_bytes=10**6)
+    cache.put("a.csv", (1.0, 10), frame(10))
+
+    assert cache.peek("a.csv", (2.0, 10)) is None
+    assert cache.get("a.csv", (2.0, 10)) is None
+    assert cache.stats()["entries"] == 0 and cache.stats()["current_bytes"] == 0
+
+
+def test_invalidate_releases_the_frame_bytes():
+    cache = DataFrameCache(max_bytes=10**6)
+    cache.put("a.csv", (1.0, 10), frame(10))
+
+    assert cache.invalidate("a.csv")
+    assert not cache.invalidate("a.csv")
+    assert cache.stats()["current_bytes"] == 0
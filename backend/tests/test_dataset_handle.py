@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from services.dataset_handle import DatasetHandle
+from utils.columnar_store import write_columnar_store
+
+FRAME = pd.DataFrame({"city": ["Oslo", "Rome", "Oslo"], "amount": [1.5, 2.0, 3.0], "count": [1, 2, 3]})
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "data.csv"
+    FRAME.to_csv(path, index=False)
+    return str(path)
+
+
+def test_csv_handle_reads_only_the_selected_columns(csv_path):
+    handle = DatasetHandle(csv_path)
+    assert handle.columns == ["city", "amount", "count"]
+    assert handle.rows is None and handle.dtypes["amount"] is None
+
+    selected = handle.select(["amount", "city", "amount"])
+
+    pd.testing.assert_frame_equal(selected, FRAME[["amount", "city"]])
+    assert sorted(handle.loaded_columns) == ["amount", "city"]
+    assert handle.rows == 3 and handle.dtypes["amount"] == "float64"
+
+
+def test_store_handle_takes_the_schema_from_the_manifest(csv_path):
+    write_columnar_store(FRAME, csv_path)
+    handle = DatasetHandle(csv_path)
+
+    assert handle.rows == 3
+    assert handle.dtypes == {"city": "object", "amount": "float64", "count": "int64"}
+    assert handle.loaded_columns == []
+    pd.testing.assert_series_equal(handle.column("count"), FRAME["count"])
+    assert handle.loaded_columns == ["count"]
+
+
+def test_handle_on_a_loaded_frame_does_not_touch_the_file(tmp_path):
+    handle = DatasetHandle(str(tmp_path / "missing.csv"), frame=FRAME)
+
+    pd.testing.assert_frame_equal(handle.select(["count", "city"]), FRAME[["count", "city"]])
+
+
+def test_unknown_column_is_rejected(csv_path):
+    with pytest.raises(ValueError, match="unknown column"):
+        DatasetHandle(csv_path).select(["city", "nope"])
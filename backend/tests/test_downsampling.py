@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from services.downsampling import lttb_indices
+
+
+def reference_lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> list:
+    """Textbook per-point LTTB over the same bucket edges"""
+    n = len(x)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = [0]
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < n_out - 2:
+            next_start, next_stop = edges[bucket + 1], edges[bucket + 2]
+            cx, cy = x[next_start:next_stop].mean(), y[next_start:next_stop].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        ax, ay = x[selected[-1]], y[selected[-1]]
+        best, best_area = start, -1.0
+        for i in range(start, stop):
+            area = abs((ax - cx) * (y[i] - ay) - (ax - x[i]) * (cy - ay))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+    selected.append(n - 1)
+    return selected
+
+
+@pytest.mark.parametrize("n, n_out", [(10, 3), (1000, 100), (1001, 250), (5000, 4999)])
+def test_lttb_keeps_endpoints_and_exact_count(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.random(n) * 100)
+    y = rng.normal(size=n)
+
+    indices = lttb_indices(x, y, n_out)
+
+    assert len(indices) == n_out
+    assert indices[0] == 0
+    assert indices[-1] == n - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(7)
+    x = np.arange(2000, dtype=float)
+    y = np.cumsum(rng.normal(size=2000))
+
+    assert lttb_indices(x, y, 150).tolist() == reference_lttb(x, y, 150)
+
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[537] = 50.0
+
+    assert 537 in lttb_indices(x, y, 20)
+
+
+@pytest.mark.parametrize("n, n_out", [(5, 10), (5, 5)])
+def test_lttb_returns_everything_when_nothing_to_drop(n, n_out):
+    x = np.arange(n, dtype=float)
+
+    assert lttb_indices(x, x, n_out).tolist() == list(range(n))
@@ -0,0 +1,65 @@
+import io
+import json
+
+import pandas as pd
+
+from services.data_processing import serialize_records
+from utils.dtype_compaction import ChunkedCompaction, compact_dataframe, format_datetime_columns
+
+
+def test_dates_serialize_in_their_uploaded_format():
+    df = pd.DataFrame({
+        "day": ["2024-01-05", None, "2024-01-07"],
+        "stamp": ["2024-01-05 10:30:00", "2024-01-06 00:00:01", None],
+        "european": ["05/01/2024", "13/01/2024", "14/01/2024"],
+    })
+
+    compacted, report = compact_dataframe(df)
+    records = [json.loads(line) for line in serialize_records(compacted, report["datetime_formats"])]
+
+    assert all(pd.api.types.is_datetime64_dtype(dtype) for dtype in compacted.dtypes)
+    assert records == [
+        {"day": "2024-01-05", "stamp": "2024-01-05 10:30:00", "european": "05/01/2024"},
+        {"day": None, "stamp": "2024-01-06 00:00:01", "european": "13/01/2024"},
+        {"day": "2024-01-07", "stamp": None, "european": "14/01/2024"},
+    ]
+
+
+def test_dates_with_offsets_stay_text():
+    df = pd.DataFrame({"at": ["2024-01-05T10:00:00+02:00", "2024-01-06T10:00:00-05:00"]})
+
+    compacted, report = compact_dataframe(df)
+
+    assert compacted["at"].dtype == object
+    assert report["datetime_formats"] == {}
+    assert compacted["at"].tolist() == df["at"].tolist()
+
+
+def test_format_datetime_columns_leaves_input_alone():
+    df = pd.DataFrame({"day": pd.to_datetime(["2024-01-05", "2024-01-06"]), "value": [1, 2]})
+
+    formatted = format_datetime_columns(df, {"day": "%d.%m.%Y"})
+
+    assert formatted["day"].tolist() == ["05.01.2024", "06.01.2024"]
+    assert pd.api.types.is_datetime64_dtype(df["day"].dtype)
+    assert format_datetime_columns(df, {}) is df
+
+
+def test_chunked_compaction_types_columns_as_a_whole_file_read():
+    text = "day,eu,amount,city,at,n\n" + "".join(
+        f"2024-01-{day:02d},{day:02d}/01/2024,{' ' if day == 15 else f' {day}.5'},{'Oslo' if day % 2 else 'Rome'},"
+        f"2024-01-{day:02d}T10:00:00+02:00,{day}\n"
+        for day in range(1, 29)
+    )
+    whole, report = compact_dataframe(pd.read_csv(io.StringIO(text)))
+
+    compaction = ChunkedCompaction()
+    for chunk in pd.read_csv(io.StringIO(text), chunksize=5):
+        compaction.observe(chunk)
+    chunked = pd.concat([compaction.apply(chunk) for chunk in pd.read_csv(io.StringIO(text), chunksize=5)])
+
+    assert compaction.categorical_columns({"city": (2, 28), "at": (28, 28)}) == ["city"]
+    pd.testing.assert_frame_equal(chunked, whole.assign(city=whole["city"].astype(object)))
+    assert compaction.datetime_formats == report["datetime_formats"] == {"day": "%Y-%m-%d", "eu": "%d/%m/%Y"}
+    assert compaction.datetime_columns == ["day", "eu", "at"]
+    assert compaction.report(["city"])["converted"] == report["converted"]
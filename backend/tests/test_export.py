@@ -0,0 +1,58 @@
+import pytest
+
+from services.export import iter_dataset_export
+from utils.columnar_store import remove_columnar_store
+
+CONTENT = "day,city,amount,code\n2024-01-05,Oslo,1.5,7\n2024-01-06,,0.1,12\n,Rome,2,\n"
+
+EXPECTED = {
+    "csv": b"day,city,amount,code\n2024-01-05,Oslo,1.5,7.0\n2024-01-06,,0.1,12.0\n,Rome,2.0,\n",
+    "ndjson": (
+        b'{"day":"2024-01-05","city":"Oslo","amount":1.5,"code":7.0}\n'
+        b'{"day":"2024-01-06","city":null,"amount":0.1,"code":12.0}\n'
+        b'{"day":null,"city":"Rome","amount":2.0,"code":null}\n'
+    ),
+}
+
+
+@pytest.fixture
+def dataset_id(upload):
+    return upload(CONTENT)["dataset_id"]
+
+
+def dataset_file(dataset_id):
+    from database import SessionLocal
+    from models import Dataset
+    db = SessionLocal()
+    try:
+        return str(db.query(Dataset).filter(Dataset.id == dataset_id).one().file_path)
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("export_format", ["csv", "ndjson"])
+def test_export_bytes(client, dataset_id, export_format):
+    response = client.get("/api/data/export", params={"dataset_id": dataset_id, "format": export_format})
+
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == f'attachment; filename="data.{export_format}"'
+    assert response.content == EXPECTED[export_format]
+
+
+@pytest.mark.parametrize("export_format", ["csv", "ndjson"])
+def test_chunk_size_does_not_change_the_bytes(client, dataset_id, export_format):
+    file_path = dataset_file(dataset_id)
+    for chunk_rows in (1, 2, 1000):
+        assert b"".join(iter_dataset_export(file_path, export_format, chunk_rows)) == EXPECTED[export_format]
+
+
+def test_csv_without_a_store_is_copied_unchanged(client, dataset_id):
+    file_path = dataset_file(dataset_id)
+    remove_columnar_store(file_path)
+
+    assert b"".join(iter_dataset_export(file_path, "csv")) == CONTENT.encode()
+
+
+def test_unsupported_format_is_rejected(client, dataset_id):
+    response = client.get("/api/data/export", params={"dataset_id": dataset_id, "format": "xml"})
+    assert response.status_code == 400
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from utils.http_cache import http_date, is_not_modified
+
+ETAG = '"7-abc-p7-r1"'
+LAST_MODIFIED = datetime(2024, 1, 5, 10, 30, 15, 123456)
+
+
+def test_matching_etag_is_not_modified():
+    assert is_not_modified({"if-none-match": ETAG}, ETAG, LAST_MODIFIED)
+    assert is_not_modified({"if-none-match": f'"other", W/{ETAG}'}, ETAG, LAST_MODIFIED)
+    assert is_not_modified({"if-none-match": "*"}, ETAG, LAST_MODIFIED)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    current_date = http_date(LAST_MODIFIED)
+    assert not is_not_modified({"if-none-match": '"stale"', "if-modified-since": current_date}, ETAG, LAST_MODIFIED)
+    assert is_not_modified({"if-none-match": ETAG, "if-modified-since": "Mon, 01 Jan 2001 00:00:00 GMT"}, ETAG, LAST_MODIFIED)
+
+
+def test_if_modified_since_compares_whole_seconds():
+    assert is_not_modified({"if-modified-since": http_date(LAST_MODIFIED)}, ETAG, LAST_MODIFIED)
+    assert not is_not_modified({"if-modified-since": "Fri, 05 Jan 2024 10:30:14 GMT"}, ETAG, LAST_MODIFIED)
+
+
+def test_unusable_validators_are_modified():
+    assert not is_not_modified({}, ETAG, LAST_MODIFIED)
+    assert not is_not_modified({"if-modified-since": "yesterday"}, ETAG, LAST_MODIFIED)
@@ -0,0 +1,72 @@
+import json
+
+import pandas as pd
+
+import services.data_processing as data_processing
+import services.ingestion as ingestion
+import services.streaming_profile as streaming_profile
+from services.ingestion import prepare_uploaded_file
+from services.jobs import INGESTION_STAGES, STREAMED_INGESTION_STAGES
+from utils.columnar_store import read_columnar_store, read_datetime_formats, store_exists
+
+
+def test_upload_is_parsed_once_for_every_stage(tmp_path, monkeypatch):
+    path = tmp_path / "data.csv"
+    path.write_text("day,city,amount\n" + "".join(f"2024-01-{day:02d},Oslo,{day}.5\n" for day in range(1, 21)))
+    monkeypatch.setattr(data_processing, "STORED_RECORDS_LIMIT", 5)
+
+    reads = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(pd, "read_csv", lambda *args, **kwargs: reads.append(args) or read_csv(*args, **kwargs))
+    stages = []
+
+    success, _, prepared = prepare_uploaded_file(str(path), "data.csv", "abc", on_stage=stages.append)
+
+    assert success
+    assert len(reads) == 1
+    assert stages == INGESTION_STAGES[:5]
+    assert list(prepared["timings"]) == stages
+    assert prepared["data_info"]["content_hash"] == "abc"
+    assert prepared["profile"]["rows"] == 20
+    assert store_exists(str(path))
+    assert [json.loads(row) for row in prepared["json_rows"]][0] == {"day": "2024-01-01", "city": "Oslo", "amount": 1.5}
+    assert len(prepared["json_rows"]) == 5
+
+
+def test_unreadable_upload_reports_the_failed_stage(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("{not json")
+
+    success, _, prepared = prepare_uploaded_file(str(path), "data.json")
+
+    assert not success
+    assert prepared["failed_stage"] == "parse"
+    assert list(prepared["timings"]) == ["parse"]
+
+
+def test_streamed_upload_is_typed_like_a_whole_one(tmp_path, monkeypatch):
+    text = "day,city,amount,n\n" + "".join(
+        f"2024-01-{day:02d},{'Oslo' if day % 2 else 'Rome'},{' ' if day == 15 else f' {day}.5'},{day}\n"
+        for day in range(1, 29)
+    )
+    monkeypatch.setattr(ingestion, "STREAMING_CHUNK_ROWS", 5)
+    prepared = {}
+    for mode, threshold in (("whole", 10 ** 9), ("streamed", 0)):
+        path = tmp_path / mode / "data.csv"
+        path.parent.mkdir()
+        path.write_text(text)
+        monkeypatch.setattr(streaming_profile, "STREAMING_PROFILE_THRESHOLD_BYTES", threshold)
+        stages = []
+        success, _, prepared[mode] = prepare_uploaded_file(str(path), "data.csv", on_stage=stages.append)
+        assert success
+        prepared[mode]["store"] = read_columnar_store(str(path))[2]
+
+    whole, streamed = prepared["whole"], prepared["streamed"]
+    assert stages == STREAMED_INGESTION_STAGES[:3]
+    assert streamed["data_info"]["dtypes"] == whole["data_info"]["dtypes"] == {
+        "day": "datetime64[ns]", "city": "category", "amount": "float32", "n": "int8"
+    }
+    assert streamed["json_rows"] == whole["json_rows"]
+    pd.testing.assert_frame_equal(streamed["store"], whole["store"])
+    assert read_datetime_formats(str(tmp_path / "streamed" / "data.csv")) == {"day": "%Y-%m-%d"}
+    assert streamed["profile"]["column_analysis"]["day"]["is_datetime"]
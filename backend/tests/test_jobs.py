@@ -0,0 +1,50 @@
+from services.jobs import INGESTION_STAGES, JobRegistry
+
+
+def test_stages_drive_progress_and_finished_jobs_are_pruned():
+    registry = JobRegistry(retention_seconds=0)
+    job = registry.create("data.csv", "uploads/data.csv", ["parse", "profile", "store_records", "store_profile"])
+    assert job["status"] == "queued" and job["progress"] == 0.0
+
+    shared = {}
+    on_stage = registry.watch_worker_stages(job["job_id"], shared)
+    registry.enter_stage(job["job_id"], "parse", status="processing")
+    on_stage("profile")
+    assert registry.get(job["job_id"])["stage"] == "profile"
+    assert registry.get(job["job_id"])["progress"] == 0.25
+    assert registry.has_active_job("uploads/data.csv")
+
+    registry.enter_stage(job["job_id"], "store_records", status="storing")
+    on_stage("serialize_records")
+    assert registry.get(job["job_id"])["stage"] == "store_records"
+    assert registry.get(job["job_id"])["progress"] == 0.5
+
+    registry.update(job["job_id"], status="completed", stage=None, progress=1.0)
+    assert not registry.has_active_job("uploads/data.csv")
+    assert registry.get(job["job_id"])["status"] == "completed"
+
+    registry.create("other.csv")
+    assert registry.get(job["job_id"]) is None
+
+
+def test_completed_upload_reports_every_stage(upload):
+    job = upload("city,amount\nOslo,1.5\nRome,2\n")
+
+    assert job["status"] == "completed"
+    assert job["stage"] is None and job["progress"] == 1.0
+    assert job["stages"] == ["deduplicate"] + INGESTION_STAGES
+    assert set(INGESTION_STAGES) <= set(job["timings"])
+    assert job["dataset_id"] is not None
+
+
+def test_failed_upload_keeps_its_message(upload):
+    job = upload("a,b\n", "header_only.csv")
+
+    assert job["status"] == "failed"
+    assert job["message"] == "File is empty"
+    assert job["dataset_id"] is None
+    assert list(job["timings"]) == ["parse"]
+
+
+def test_unknown_job_is_not_found(client):
+    assert client.get("/api/data/jobs/missing").status_code == 404
@@ -0,0 +1,48 @@
+import re
+
+from utils.metrics import Counter, Histogram
+
+# One sample line of the Prometheus text format: name, optional labels, value
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? [0-9.e+-]+$')
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(seconds, route="/a")
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 4.050000',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("requests_total", "Requests", ("route",))
+    counter.inc(route='say "hi"\\\n')
+    counter.inc(2, route="/b")
+
+    assert counter.render()[2:] == ['requests_total{route="/b"} 2', 'requests_total{route="say \\"hi\\"\\\\\\n"} 1']
+
+
+def test_metrics_endpoint_reports_requests_by_route_template(upload, client):
+    dataset_id = upload("city,amount\nOslo,1.5\n")["dataset_id"]
+    client.get("/api/data/summary", params={"dataset_id": dataset_id})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert all(line.startswith("# ") or SAMPLE.match(line) for line in lines)
+    assert any(line.startswith('dataviz_http_requests_total{method="GET",route="/api/data/summary",status="200"}') for line in lines)
+    assert any(line.startswith('dataviz_ingest_jobs_total{status="completed"}') for line in lines)
+    assert any(line.startswith('dataviz_ingest_stage_duration_seconds_count{stage="parse"}') for line in lines)
+    # Ingestion jobs outlive the upload request, so their spans are not labeled with its route
+    assert not any(line.startswith('dataviz_stage_duration_seconds_count{stage="parse",route="/api/data/upload"}') for line in lines)
+    assert any(line.startswith('dataviz_stage_duration_seconds_count{stage="parse",route="background"}') for line in lines)
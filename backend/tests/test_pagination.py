@@ -0,0 +1,55 @@
+import pytest
+
+import services.data_processing as data_processing
+
+
+@pytest.fixture
+def dataset_id(upload, monkeypatch):
+    # Only the first five rows become DataRecord rows; the rest are read from the file
+    monkeypatch.setattr(data_processing, "STORED_RECORDS_LIMIT", 5)
+    content = "n,label\n" + "".join(f"{n},row {n}\n" for n in range(12))
+    return upload(content)["dataset_id"]
+
+
+def read_all_pages(client, dataset_id, limit):
+    rows, cursors, cursor = [], [], None
+    while True:
+        params = {"dataset_id": dataset_id, "limit": limit}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = client.get("/api/data/data", params=params)
+        assert response.status_code == 200, response.text
+        metadata = response.json()["metadata"]
+        rows.extend(row["n"] for row in response.json()["data"])
+        assert metadata["has_more"] == (metadata["next_cursor"] is not None)
+        cursor = metadata["next_cursor"]
+        if cursor is None:
+            return rows, cursors
+        cursors.append(cursor)
+
+
+@pytest.mark.parametrize("limit", [1, 4, 5, 7, 12, 100])
+def test_pages_cover_every_row_once_across_the_stored_records(client, dataset_id, limit):
+    rows, _ = read_all_pages(client, dataset_id, limit)
+    assert rows == list(range(12))
+
+
+def test_page_filled_by_stored_records_continues_into_the_file(client, dataset_id):
+    _, cursors = read_all_pages(client, dataset_id, 5)
+    assert cursors == ["row:5", "row:10"]
+
+    _, cursors = read_all_pages(client, dataset_id, 4)
+    assert cursors[0].isdigit()
+    assert cursors[1:] == ["row:8"]
+
+
+def test_row_cursor_past_the_end_returns_an_empty_last_page(client, dataset_id):
+    response = client.get("/api/data/data", params={"dataset_id": dataset_id, "cursor": "row:12"})
+    assert response.json()["data"] == []
+    assert response.json()["metadata"]["has_more"] is False
+
+
+@pytest.mark.parametrize("cursor", ["row:-1", "row:x", "abc"])
+def test_malformed_cursor_is_rejected(client, dataset_id, cursor):
+    response = client.get("/api/data/data", params={"dataset_id": dataset_id, "cursor": cursor})
+    assert response.status_code == 400
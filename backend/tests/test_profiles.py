@@ -0,0 +1,53 @@
+import os
+
+from services.profiling import PROFILE_VERSION, get_dataset_profile
+from utils.columnar_store import remove_columnar_store
+from utils.dataframe_cache import dataframe_cache
+
+
+def load_dataset(db, dataset_id):
+    from models import Dataset
+    return db.query(Dataset).filter(Dataset.id == dataset_id).one()
+
+
+def test_summary_is_served_from_the_stored_profile(upload, client):
+    from database import SessionLocal
+
+    dataset_id = upload("city,amount\nOslo,1.5\nRome,2\nOslo,3\n")["dataset_id"]
+    db = SessionLocal()
+    try:
+        file_path = str(load_dataset(db, dataset_id).file_path)
+    finally:
+        db.close()
+
+    # Without the file, only the profile computed at ingest can answer
+    remove_columnar_store(file_path)
+    os.remove(file_path)
+    dataframe_cache.invalidate(file_path)
+    response = client.get("/api/data/summary", params={"dataset_id": dataset_id})
+
+    assert response.status_code == 200
+    assert response.json()["rows"] == 3
+    assert response.json()["column_names"] == ["city", "amount"]
+
+
+def test_stale_profile_is_recomputed_and_stored(upload, client):
+    from database import SessionLocal
+    from models import DatasetProfile
+
+    dataset_id = upload("city,amount\nOslo,1.5\nRome,2\n")["dataset_id"]
+    db = SessionLocal()
+    try:
+        row = db.query(DatasetProfile).filter(DatasetProfile.dataset_id == dataset_id).one()
+        row.version = PROFILE_VERSION - 1
+        row.rows = 0
+        db.commit()
+
+        success, message, profile = get_dataset_profile(db, load_dataset(db, dataset_id))
+
+        assert success and message == "Profile computed"
+        assert profile["rows"] == 2
+        db.refresh(row)
+        assert row.version == PROFILE_VERSION and row.rows == 2
+    finally:
+        db.close()
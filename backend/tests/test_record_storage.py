@@ -0,0 +1,53 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+import services.data_processing as data_processing
+from services.data_processing import serialize_records, store_dataset_in_db
+
+
+def test_records_keep_column_order_and_float_precision():
+    rng = np.random.default_rng(9)
+    floats = rng.normal(size=50) * 10.0 ** rng.integers(-20, 20, 50)
+    df = pd.DataFrame({
+        "a": floats,
+        "name": [f"row {i}" for i in range(50)],
+        "n": np.arange(50),
+        "b": np.where(np.arange(50) % 5 == 0, np.nan, floats[::-1]),
+        "flag": np.arange(50) % 2 == 0,
+    })
+
+    records = [json.loads(line) for line in serialize_records(df)]
+
+    assert all(list(record) == list(df.columns) for record in records)
+    assert [record["a"] for record in records] == floats.tolist()
+    assert [record["b"] for record in records] == [None if np.isnan(b) else b for b in df["b"]]
+    assert [record["n"] for record in records] == list(range(50))
+    assert records[1]["name"] == "row 1" and records[1]["flag"] is False
+
+
+def test_infinite_values_and_duplicated_columns():
+    df = pd.DataFrame([[1.0, np.inf, "x"], [2.0, -np.inf, "y"]], columns=["v", "w", "v"])
+
+    assert serialize_records(df) == ['{"w":null,"v":"x"}', '{"w":null,"v":"y"}']
+
+
+def test_records_are_inserted_in_batches_in_row_order(client, monkeypatch):
+    from database import SessionLocal
+    from models import DataRecord
+
+    monkeypatch.setattr(data_processing, "RECORD_INSERT_BATCH_SIZE", 3)
+    monkeypatch.setattr(data_processing, "STORED_RECORDS_LIMIT", 8)
+    df = pd.DataFrame({"n": np.arange(10), "x": np.arange(10) / 3})
+    data_info = {"filename": "data.csv", "file_path": "data.csv"}
+
+    db = SessionLocal()
+    try:
+        success, message, dataset_id = store_dataset_in_db(db, data_info, df=df)
+        assert success, message
+        stored = db.query(DataRecord.json_data).filter(DataRecord.dataset_id == dataset_id).order_by(DataRecord.id).all()
+    finally:
+        db.close()
+
+    assert [row.json_data for row in stored] == serialize_records(df.head(8))
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import services.resampling as resampling
+from services.resampling import resample_dataframe
+
+# pandas resample rules matching each frequency's calendar buckets
+PANDAS_RULES = {"hour": "h", "day": "D", "week": "W-MON", "month": "MS", "year": "YS"}
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    when = pd.Timestamp("2023-11-20") + pd.to_timedelta(rng.integers(0, 400 * 24 * 3600, 5_000), unit="s")
+    value = rng.normal(size=5_000)
+    value[rng.random(5_000) < 0.05] = np.nan
+    return pd.DataFrame({"when": when, "value": value})
+
+
+@pytest.mark.parametrize("frequency", ["hour", "day", "week", "month", "year"])
+@pytest.mark.parametrize("agg", ["count", "sum", "mean", "min", "max"])
+def test_buckets_match_pandas_resample(frame, frequency, agg):
+    result = resample_dataframe(frame, "when", ["value"], frequency, agg)
+
+    series = frame.set_index("when")["value"].dropna()
+    expected = series.resample(PANDAS_RULES[frequency], label="left", closed="left").agg(agg)
+    expected = expected[series.resample(PANDAS_RULES[frequency], label="left", closed="left").count() > 0]
+
+    points = result["series"][0]
+    assert pd.to_datetime(points["x"]).tolist() == expected.index.tolist()
+    assert np.allclose(points["y"], expected.to_numpy(dtype=np.float64))
+
+
+def test_weeks_start_on_monday():
+    frame = pd.DataFrame({"when": pd.to_datetime(["2024-01-07", "2024-01-08", "2024-01-14"]), "value": [1.0, 2.0, 3.0]})
+
+    result = resample_dataframe(frame, "when", ["value"], "week", "sum")
+
+    assert result["series"][0]["x"] == ["2024-01-01T00:00:00", "2024-01-08T00:00:00"]
+    assert result["series"][0]["y"] == [1.0, 5.0]
+
+
+def test_auto_picks_the_finest_frequency_within_max_points(frame):
+    assert resample_dataframe(frame, "when", ["value"], max_points=500)["frequency"] == "day"
+    assert resample_dataframe(frame, "when", ["value"], max_points=20)["frequency"] == "month"
+    assert resample_dataframe(frame, "when", ["value"], max_points=1)["frequency"] == "year"
+
+
+def test_date_text_is_parsed():
+    frame = pd.DataFrame({"when": ["2024-01-01", "2024-01-01", "2024-01-02", None], "value": [1.0, 3.0, 5.0, 7.0]})
+
+    result = resample_dataframe(frame, "when", ["value"], "day", "mean")
+
+    assert result["series"][0]["y"] == [2.0, 5.0]
+    assert result["series"][0]["source_points"] == 3
+
+
+def test_invalid_queries_are_rejected(frame, monkeypatch):
+    with pytest.raises(ValueError, match="does not hold dates"):
+        resample_dataframe(frame, "value", ["value"], "day")
+    with pytest.raises(ValueError, match="not numeric"):
+        resample_dataframe(frame, "when", ["when"], "day")
+
+    monkeypatch.setattr(resampling, "MAX_RESAMPLE_BUCKETS", 100)
+    with pytest.raises(ValueError, match="coarser frequency"):
+        resample_dataframe(frame, "when", ["value"], "day")
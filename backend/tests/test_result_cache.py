@@ -0,0 +1,37 @@
+from utils.result_cache import ResultCache, estimate_result_bytes
+
+RESULT = {"data": [{"city": "Oslo", "amount_sum": 4.5}], "metadata": {"rows": 3}}
+SIZE = estimate_result_bytes(RESULT)
+
+
+def test_least_recently_used_results_are_evicted_to_fit_the_budget():
+    cache = ResultCache(max_bytes=2 * SIZE)
+    cache.put("a.csv", ("aggregate", 1), (1.0, 10), RESULT)
+    cache.put("a.csv", ("aggregate", 2), (1.0, 10), RESULT)
+    assert cache.get("a.csv", ("aggregate", 1), (1.0, 10)) is RESULT
+
+    cache.put("b.csv", ("aggregate", 1), (1.0, 10), RESULT)
+
+    assert cache.get("a.csv", ("aggregate", 2), (1.0, 10)) is None
+    assert cache.get("a.csv", ("aggregate", 1), (1.0, 10)) is RESULT
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["current_bytes"] == 2 * SIZE
+
+
+def test_oversized_result_is_not_cached():
+    cache = ResultCache(max_bytes=SIZE - 1)
+    assert not cache.put("a.csv", "key", (1.0, 10), RESULT)
+    assert cache.stats()["entries"] == 0
+
+
+def test_replacing_and_invalidating_keep_the_byte_count():
+    cache = ResultCache(max_bytes=10 * SIZE)
+    cache.put("a.csv", "key", (1.0, 10), RESULT)
+    cache.put("a.csv", "key", (2.0, 10), RESULT)
+    cache.put("a.csv", "other", (2.0, 10), RESULT)
+    assert cache.stats()["current_bytes"] == 2 * SIZE
+
+    assert cache.get("a.csv", "key", (1.0, 10)) is None
+    assert cache.stats()["current_bytes"] == SIZE
+    assert cache.invalidate_dataset("a.csv") == 1
+    assert cache.stats()["current_bytes"] == 0
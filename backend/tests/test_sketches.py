@@ -0,0 +1,141 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.sketches import DistinctCounter, HeavyHitters, HyperLogLog, KLLSketch, RunningMoments, hash_values
+
+
+def chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+@pytest.mark.parametrize("distinct", [1_000, 50_000, 300_000])
+def test_hyperloglog_within_standard_error(distinct):
+    values = np.random.default_rng(distinct).permutation(distinct).astype(np.int64)
+    sketch = HyperLogLog(precision=12)
+    for chunk in chunks(np.concatenate([values, values[: distinct // 2]]), 10_000):
+        sketch.update_hashes(hash_values(chunk))
+
+    # Four standard errors, so the check is not flaky
+    bound = 4 * 1.04 / math.sqrt(2 ** 12)
+    assert abs(sketch.estimate() - distinct) / distinct < bound
+
+
+def test_hyperloglog_merge_equals_single_pass():
+    values = np.arange(100_000)
+    whole, left, right = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    whole.update_hashes(hash_values(values))
+    left.update_hashes(hash_values(values[:60_000]))
+    right.update_hashes(hash_values(values[40_000:]))
+
+    left.merge(right)
+
+    assert np.array_equal(left.registers, whole.registers)
+
+
+def test_distinct_counter_exact_below_limit():
+    series = pd.Series(np.random.default_rng(0).integers(0, 5_000, 100_000))
+    left, right = DistinctCounter(exact_limit=8192), DistinctCounter(exact_limit=8192)
+    for chunk in chunks(series.to_numpy()[:50_000], 7_000):
+        left.update_hashes(hash_values(chunk))
+    for chunk in chunks(series.to_numpy()[50_000:], 7_000):
+        right.update_hashes(hash_values(chunk))
+
+    left.merge(right)
+
+    assert left.is_exact
+    assert left.count() == series.nunique()
+
+
+def test_distinct_counter_switches_to_estimate_above_limit():
+    counter = DistinctCounter(exact_limit=1_000, precision=14)
+    for chunk in chunks(np.arange(200_000), 25_000):
+        counter.update_hashes(hash_values(chunk))
+
+    assert not counter.is_exact
+    assert abs(counter.count() - 200_000) / 200_000 < 4 * 1.04 / math.sqrt(2 ** 14)
+
+
+def test_numeric_hashes_ignore_integer_or_float_dtype():
+    assert np.array_equal(hash_values(np.array([1, 2, 3])), hash_values(np.array([1.0, 2.0, 3.0])))
+
+
+def test_kll_quantiles_within_rank_error():
+    values = np.random.default_rng(1).lognormal(size=500_000)
+    sketch = KLLSketch(k=400)
+    for chunk in chunks(values, 20_000):
+        sketch.update(chunk)
+
+    qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+    ordered = np.sort(values)
+    for q, estimate in zip(qs, sketch.quantiles(qs)):
+        rank = np.searchsorted(ordered, estimate, side="right") / len(values)
+        assert abs(rank - q) < 0.01
+
+
+def test_kll_merge_keeps_count_and_accuracy():
+    values = np.random.default_rng(2).normal(size=200_000)
+    left, right = KLLSketch(seed=1), KLLSketch(seed=2)
+    left.update(values[:120_000])
+    right.update(values[120_000:])
+
+    left.merge(right)
+
+    assert left.count == len(values)
+    median = left.quantiles([0.5])[0]
+    assert abs(np.mean(values <= median) - 0.5) < 0.01
+
+
+def test_kll_empty_sketch_returns_none():
+    assert KLLSketch().quantiles([0.5, 0.9]) == [None, None]
+
+
+def test_running_moments_match_pandas():
+    series = pd.Series(np.random.default_rng(3).normal(1e6, 3.0, 250_000))
+    left, right = RunningMoments(), RunningMoments()
+    for chunk in chunks(series.to_numpy()[:100_000], 9_999):
+        left.update(chunk)
+    for chunk in chunks(series.to_numpy()[100_000:], 33_333):
+        right.update(chunk)
+
+    left.merge(right)
+
+    assert left.count == len(series)
+    assert left.mean == pytest.approx(series.mean(), rel=1e-12)
+    assert left.std() == pytest.approx(series.std(), rel=1e-9)
+
+
+def test_running_moments_std_needs_two_values():
+    moments = RunningMoments()
+    moments.update(np.array([4.0]))
+
+    assert moments.std() is None
+
+
+def test_heavy_hitters_exact_within_capacity():
+    series = pd.Series(np.random.default_rng(4).choice(list("abcdefgh"), 50_000))
+    left, right = HeavyHitters(capacity=16), HeavyHitters(capacity=16)
+    for chunk in chunks(series.iloc[:30_000], 4_000):
+        left.update(chunk)
+    right.update(series.iloc[30_000:])
+
+    left.merge(right)
+
+    assert left.top(8) == series.value_counts().to_dict()
+
+
+def test_heavy_hitters_keep_frequent_values_past_capacity():
+    rng = np.random.default_rng(5)
+    series = pd.Series(rng.zipf(1.5, 200_000) % 50_000)
+    hitters = HeavyHitters(capacity=500)
+    for chunk in chunks(series, 10_000):
+        hitters.update(chunk)
+
+    exact = series.value_counts()
+    top = hitters.top(5)
+    assert list(top) == exact.head(5).index.tolist()
+    # Past capacity counts are lower bounds
+    assert all(count <= exact[value] for value, count in top.items())
@@ -0,0 +1,98 @@
+import os
+import time
+
+from services.dataset_files import release_dataset_file
+from services.jobs import job_registry, start_ingestion_job
+from utils.columnar_store import get_store_path
+from utils.file_utils import upload_claims
+
+CONTENT = "city,amount\nOslo,1.5\nRome,2\nOslo,3\n"
+
+
+def dataset_file(dataset_id):
+    from database import SessionLocal
+    from models import Dataset
+    db = SessionLocal()
+    try:
+        return str(db.query(Dataset).filter(Dataset.id == dataset_id).one().file_path)
+    finally:
+        db.close()
+
+
+def test_identical_upload_reuses_file_and_profile(upload, client, upload_dir):
+    first = upload(CONTENT, "first.csv")
+    second = upload(CONTENT, "second.csv")
+
+    assert first["status"] == second["status"] == "completed"
+    assert first["dataset_id"] != second["dataset_id"]
+    assert "parse" in first["timings"]
+    assert "parse" not in second["timings"]
+    assert dataset_file(first["dataset_id"]) == dataset_file(second["dataset_id"])
+    assert [name for name in os.listdir(upload_dir) if not name.endswith(".columns")] == [
+        os.path.basename(dataset_file(first["dataset_id"]))
+    ]
+
+    pages = [client.get("/api/data/data", params={"dataset_id": job["dataset_id"]}).json()["data"] for job in (first, second)]
+    assert pages[0] == pages[1]
+
+
+def test_shared_file_is_removed_with_its_last_dataset(upload, client):
+    first = upload(CONTENT, "first.csv")
+    second = upload(CONTENT, "second.csv")
+    file_path = dataset_file(first["dataset_id"])
+
+    assert client.delete(f"/api/data/datasets/{first['dataset_id']}").status_code == 200
+    assert os.path.exists(file_path)
+    assert client.get("/api/data/data", params={"dataset_id": second["dataset_id"]}).status_code == 200
+
+    assert client.delete(f"/api/data/datasets/{second['dataset_id']}").status_code == 200
+    assert not os.path.exists(file_path)
+    assert not os.path.exists(get_store_path(file_path))
+
+
+def test_claimed_file_survives_release_until_the_claim_is_dropped(upload_dir):
+    file_path = str(upload_dir / "claimed.csv")
+    with open(file_path, "w") as f:
+        f.write(CONTENT)
+
+    upload_claims.claim(file_path)
+    upload_claims.claim(file_path)
+    try:
+        assert not release_dataset_file(file_path)
+        upload_claims.release(file_path)
+        assert not release_dataset_file(file_path)
+    finally:
+        upload_claims.release(file_path)
+    assert os.path.exists(file_path)
+
+    assert release_dataset_file(file_path)
+    assert not os.path.exists(file_path)
+
+
+def test_file_of_a_running_job_is_not_released(upload_dir):
+    file_path = str(upload_dir / "pending.csv")
+    with open(file_path, "w") as f:
+        f.write(CONTENT)
+
+    job = job_registry.create("pending.csv", file_path, ["parse"])
+    assert not release_dataset_file(file_path)
+
+    job_registry.update(job["job_id"], status="failed")
+    assert release_dataset_file(file_path)
+
+
+def test_job_takes_over_the_upload_claim(client, upload_dir, wait_for_job):
+    file_path = str(upload_dir / "header_only.csv")
+    with open(file_path, "w") as f:
+        f.write("a,b\n")
+
+    upload_claims.claim(file_path)
+    job = wait_for_job(start_ingestion_job(file_path, "header_only.csv"))
+
+    assert job["status"] == "failed"
+    assert not upload_claims.is_claimed(file_path)
+    # The file is removed right after the job is marked failed
+    deadline = time.monotonic() + 5
+    while os.path.exists(file_path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not os.path.exists(file_path)
@@ -0,0 +1,68 @@
+import hashlib
+import io
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import utils.file_utils as file_utils
+from utils.file_utils import save_uploaded_file, upload_claims
+
+CONTENT = b"city,amount\nOslo,1.5\nRome,2\n"
+
+
+def upload_file(content, filename="data.csv"):
+    # size is unknown up front, as for chunked request bodies
+    return SimpleNamespace(filename=filename, size=None, file=io.BytesIO(content))
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(file_utils, "UPLOAD_CHUNK_SIZE", 4)
+
+
+def test_upload_is_stored_under_its_content_hash(upload_dir):
+    success, _, saved = save_uploaded_file(upload_file(CONTENT, "Data.CSV"))
+    try:
+        assert success
+        assert saved["sha256"] == hashlib.sha256(CONTENT).hexdigest()
+        assert saved["file_path"] == str(upload_dir / f"{saved['sha256']}.csv")
+        assert saved["size"] == len(CONTENT) and not saved["deduplicated"]
+        assert upload_claims.is_claimed(saved["file_path"])
+        with open(saved["file_path"], "rb") as f:
+            assert f.read() == CONTENT
+        assert os.listdir(upload_dir) == [os.path.basename(saved["file_path"])]
+    finally:
+        upload_claims.release(saved["file_path"])
+
+
+def test_identical_content_keeps_the_stored_copy(upload_dir):
+    _, _, first = save_uploaded_file(upload_file(CONTENT))
+    upload_claims.release(first["file_path"])
+    os.utime(first["file_path"], (1_000_000, 1_000_000))
+
+    _, _, second = save_uploaded_file(upload_file(CONTENT))
+    upload_claims.release(second["file_path"])
+
+    assert second["deduplicated"] and second["file_path"] == first["file_path"]
+    assert os.path.getmtime(first["file_path"]) == 1_000_000
+    assert len(os.listdir(upload_dir)) == 1
+
+
+def test_oversized_upload_is_aborted_without_leaving_files(upload_dir, monkeypatch):
+    monkeypatch.setattr(file_utils, "MAX_UPLOAD_BYTES", len(CONTENT) - 1)
+
+    success, message, saved = save_uploaded_file(upload_file(CONTENT))
+
+    assert not success and saved is None
+    assert "exceeds" in message
+    assert os.listdir(upload_dir) == []
+
+
+def test_oversized_upload_is_answered_with_413(client, upload_dir, monkeypatch):
+    monkeypatch.setattr(file_utils, "MAX_UPLOAD_BYTES", 8)
+
+    response = client.post("/api/data/upload", files={"file": ("data.csv", CONTENT, "text/csv")})
+
+    assert response.status_code == 413
+    assert os.listdir(upload_dir) == []
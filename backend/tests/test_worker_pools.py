@@ -0,0 +1,67 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from utils.worker_pools import PoolSaturatedError, WorkerPool
+
+request_name: contextvars.ContextVar[str] = contextvars.ContextVar("request_name", default="none")
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool("test", "thread", max_workers=1, queue_limit=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_submissions_past_the_queue_limit_are_rejected_unless_bypassed(pool):
+    release = threading.Event()
+    running = pool.submit(release.wait)
+    queued = pool.submit(release.wait)
+
+    with pytest.raises(PoolSaturatedError):
+        pool.submit(release.wait)
+    follow_on = pool.submit(release.wait, bypass_limit=True)
+    assert pool.stats()["active"] == 1 and pool.stats()["queued"] == 2
+
+    release.set()
+    for future in (running, queued, follow_on):
+        future.result(timeout=5)
+    # Counters are updated by done callbacks, which have run once the workers exit
+    pool.shutdown()
+    stats = pool.stats()
+    assert (stats["submitted"], stats["completed"], stats["rejected"]) == (3, 3, 1)
+
+
+def test_thread_tasks_run_in_the_submitters_context(pool):
+    token = request_name.set("upload")
+    try:
+        future = pool.submit(request_name.get)
+    finally:
+        request_name.reset(token)
+
+    assert future.result(timeout=5) == "upload"
+
+
+def test_run_awaits_the_result_and_counts_failures(pool):
+    assert asyncio.run(pool.run(sum, [1, 2, 3])) == 6
+
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(pool.run(lambda: 1 / 0))
+    pool.shutdown()
+    assert pool.stats()["failed"] == 1
+
+
+def test_saturated_pool_answers_503(client, monkeypatch):
+    import routes.data_routes as data_routes
+
+    def saturated(*args, **kwargs):
+        raise PoolSaturatedError("The io worker pool is at capacity, please retry shortly")
+    monkeypatch.setattr(data_routes, "run_io", saturated)
+
+    response = client.get("/api/data/datasets")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
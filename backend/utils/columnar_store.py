@@ -0,0 +1,562 @@
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from typing import Tuple, Optional, List, Dict, Any, Callable, Iterator
+from utils.metrics import span
+
+# Bump when the on-disk layout or column typing changes so stale stores are rebuilt
+STORE_FORMAT_VERSION = 4
+MANIFEST_NAME = "manifest.json"
+STORE_SUFFIX = ".columns"
+
+# Maximum number of parsed manifests kept in memory (default: 256)
+MANIFEST_CACHE_MAX_ENTRIES = int(os.getenv("MANIFEST_CACHE_MAX_ENTRIES", "256"))
+
+# Rows of dictionary codes rewritten at a time when a chunked store is finished
+CODE_REWRITE_ROWS = 1_000_000
+
+# Scalar types that survive a JSON round trip unchanged
+_JSON_SCALARS = (str, int, float, bool)
+
+# Parsed manifests by store path, tagged with the manifest file's stat signature
+_manifest_cache: "OrderedDict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]]" = OrderedDict()
+_manifest_lock = threading.Lock()
+
+
+def get_store_path(file_path: str) -> str:
+    """
+    Get the directory holding the columnar store for a dataset file
+
+    Args:
+        file_path: Path to the original uploaded file
+
+    Returns:
+        Path of the store directory next to the file
+    """
+    return os.path.splitext(file_path)[0] + STORE_SUFFIX
+
+
+def _forget_manifest(store_path: str) -> None:
+    """Drop the cached manifest of a store"""
+    with _manifest_lock:
+        _manifest_cache.pop(store_path, None)
+
+
+def read_store_manifest(file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the schema manifest of a columnar store
+
+    Parsed manifests are cached per store and reused while the manifest
+    file's mtime, size and inode are unchanged; a rewritten store is a
+    new directory, so it is always parsed again. The returned manifest is
+    shared between callers and must not be modified.
+
+    Args:
+        file_path: Path to the original uploaded file
+
+    Returns:
+        Manifest dictionary, or None if there is no usable store
+    """
+    store_path = get_store_path(file_path)
+    manifest_path = os.path.join(store_path, MANIFEST_NAME)
+    try:
+        stat = os.stat(manifest_path)
+    except OSError:
+        _forget_manifest(store_path)
+        return None
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    with _manifest_lock:
+        cached = _manifest_cache.get(store_path)
+        if cached is not None and cached[0] == signature:
+            _manifest_cache.move_to_end(store_path)
+            return cached[1]
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("version") != STORE_FORMAT_VERSION:
+        return None
+
+    with _manifest_lock:
+        _manifest_cache[store_path] = (signature, manifest)
+        _manifest_cache.move_to_end(store_path)
+        while len(_manifest_cache) > MANIFEST_CACHE_MAX_ENTRIES:
+            _manifest_cache.popitem(last=False)
+    return manifest
+
+
+def read_datetime_formats(file_path: str) -> Dict[str, str]:
+    """
+    Get the formats a dataset's datetime columns were parsed from
+
+    Args:
+        file_path: Path to the original uploaded file
+
+    Returns:
+        strftime format per column name, empty without a store
+    """
+    manifest = read_store_manifest(file_path) or {}
+    return manifest.get("metadata", {}).get("compaction", {}).get("datetime_formats", {})
+
+
+def store_exists(file_path: str) -> bool:
+    """Check whether a current-version columnar store exists for a file"""
+    return read_store_manifest(file_path) is not None
+
+
+def _smallest_code_dtype(n_categories: int) -> np.dtype:
+    """Pick the narrowest signed integer type able to hold category codes"""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _check_json_scalars(values: List[Any], what: str) -> None:
+    """Reject values that would not come back unchanged from JSON"""
+    for value in values:
+        if not isinstance(value, _JSON_SCALARS):
+            raise ValueError(f"{what} of type {type(value).__name__} cannot be stored")
+
+
+def _encode_column(name: Any, series: pd.Series, file_stem: str, store_dir: str) -> Dict[str, Any]:
+    """
+    Write one column to disk and describe it for the manifest
+
+    Numeric, boolean and datetime columns are stored as raw NumPy arrays.
+    Object and categorical columns are dictionary-encoded: integer codes
+    go to the array file and the distinct values to a JSON dictionary
+    file beside it, so the manifest stays small whatever the cardinality.
+    """
+    entry: Dict[str, Any] = {"name": name, "dtype": str(series.dtype), "file": f"{file_stem}.npy"}
+
+    categories: Optional[List[Any]] = None
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.tolist()
+        _check_json_scalars(categories, "Category")
+        values = series.cat.codes.to_numpy().astype(_smallest_code_dtype(len(categories)))
+        entry.update({"kind": "category", "ordered": bool(series.cat.ordered)})
+    elif isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM":
+        values = series.to_numpy()
+        entry["kind"] = "values"
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        categories = list(uniques)
+        _check_json_scalars(categories, "Value")
+        values = codes.astype(_smallest_code_dtype(len(categories)))
+        entry["kind"] = "object"
+
+    if categories is not None:
+        entry["dictionary"] = f"{file_stem}.dict.json"
+        with open(os.path.join(store_dir, entry["dictionary"]), "w", encoding="utf-8") as f:
+            json.dump(categories, f)
+
+    np.save(os.path.join(store_dir, entry["file"]), values, allow_pickle=False)
+    return entry
+
+
+def _column_decoder(entry: Dict[str, Any], store_dir: str) -> Callable[[np.ndarray], Any]:
+    """Build a function turning stored array values of a column back into column data"""
+    if entry["kind"] == "values":
+        return lambda values: values
+
+    with open(os.path.join(store_dir, entry["dictionary"]), "r", encoding="utf-8") as f:
+        categories = json.load(f)
+
+    if entry["kind"] == "category":
+        dtype = pd.CategoricalDtype(categories, ordered=entry.get("ordered", False))
+        return lambda values: pd.Categorical.from_codes(np.asarray(values), dtype=dtype)
+
+    # Object columns: the extra trailing slot maps the -1 sentinel to NaN
+    lookup = np.empty(len(categories) + 1, dtype=object)
+    lookup[:-1] = categories
+    lookup[-1] = np.nan
+    return lambda values: lookup[values]
+
+
+def _load_column_array(entry: Dict[str, Any], store_dir: str) -> np.ndarray:
+    """Memory-map the array file of one column"""
+    return np.load(os.path.join(store_dir, entry["file"]), mmap_mode="r", allow_pickle=False)
+
+
+def _decode_column(entry: Dict[str, Any], store_dir: str) -> Any:
+    """Load one column from disk, memory-mapping the array file"""
+    return _column_decoder(entry, store_dir)(_load_column_array(entry, store_dir))
+
+
+def _select_entries(manifest: Dict[str, Any], columns: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Pick the manifest entries of the requested columns, in stored order"""
+    entries = manifest["columns"]
+    if columns is None:
+        return entries
+    wanted = set(columns)
+    return [entry for entry in entries if entry["name"] in wanted]
+
+
+def _publish_store(
+    tmp_path: str,
+    store_path: str,
+    rows: int,
+    columns: List[Dict[str, Any]],
+    metadata: Optional[Dict[str, Any]]
+) -> None:
+    """Write the manifest of a finished temporary store and rename it into place"""
+    manifest = {
+        "version": STORE_FORMAT_VERSION,
+        "rows": rows,
+        "columns": columns,
+        "metadata": metadata or {},
+    }
+    with open(os.path.join(tmp_path, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    # Replace any stale store from an older format version
+    if os.path.isdir(store_path):
+        shutil.rmtree(store_path, ignore_errors=True)
+    os.rename(tmp_path, store_path)
+    _forget_manifest(store_path)
+
+
+def write_columnar_store(
+    df: pd.DataFrame,
+    file_path: str,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Tuple[bool, str, Optional[str]]:
+    """
+    Convert a DataFrame into a typed columnar store next to its source file
+
+    The store is written to a temporary directory first and renamed into
+    place, so readers never see a partially written store.
+
+    Args:
+        df: Parsed dataset
+        file_path: Path to the original uploaded file
+        metadata: Optional JSON-serializable facts about the dataset,
+            kept in the manifest under "metadata"
+
+    Returns:
+        Tuple of (success, message, store_path)
+    """
+    store_path = get_store_path(file_path)
+    tmp_path = f"{store_path}.tmp-{uuid.uuid4().hex}"
+
+    try:
+        names = df.columns.tolist()
+        _check_json_scalars(names, "Column name")
+        os.makedirs(tmp_path)
+
+        columns = [
+            _encode_column(name, df.iloc[:, position], f"col_{position:05d}", tmp_path)
+            for position, name in enumerate(names)
+        ]
+        _publish_store(tmp_path, store_path, len(df), columns, metadata)
+
+        return True, "Columnar store written successfully", store_path
+
+    except Exception as e:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return False, f"Error writing columnar store: {str(e)}", None
+
+
+class ColumnarStoreWriter:
+    """
+    Write a columnar store chunk by chunk, for datasets too large to convert whole
+
+    The row count must be known up front and every chunk must have the
+    dtypes of the first. Each column's array file is allocated for all
+    rows and filled slice by slice through a memory map. Object columns
+    are dictionary-encoded as chunks arrive, numbering values in order of
+    first appearance as pd.factorize does, and close() can store any of
+    them as categoricals instead. The result is laid out exactly as by
+    write_columnar_store. A failure is kept rather than raised: later
+    chunks are skipped and close() reports it.
+    """
+
+    def __init__(self, file_path: str, rows: int):
+        self.rows = rows
+        self.store_path = get_store_path(file_path)
+        self.tmp_path = f"{self.store_path}.tmp-{uuid.uuid4().hex}"
+        self.position = 0
+        self.error: Optional[str] = None
+        self._names: Optional[List[Any]] = None
+        self._dtypes: List[Any] = []
+        self._arrays: List[Any] = []
+        self._dictionaries: List[Optional[Dict[Any, int]]] = []
+        self._present: List[int] = []
+
+    def _start(self, chunk: pd.DataFrame) -> None:
+        """Allocate the array file of every column from the first chunk"""
+        names = chunk.columns.tolist()
+        _check_json_scalars(names, "Column name")
+        os.makedirs(self.tmp_path)
+        for position, dtype in enumerate(chunk.dtypes):
+            path = os.path.join(self.tmp_path, f"col_{position:05d}.npy")
+            if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+                dictionary = None
+            else:
+                dictionary = {}
+                dtype = _smallest_code_dtype(self.rows)
+            self._arrays.append(np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(self.rows,)))
+            self._dtypes.append(chunk.dtypes.iloc[position])
+            self._dictionaries.append(dictionary)
+            self._present.append(0)
+        self._names = names
+
+    def _encode(self, position: int, series: pd.Series) -> np.ndarray:
+        """Turn a chunk of a dictionary-encoded column into codes, growing its dictionary"""
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        uniques = list(uniques)
+        _check_json_scalars(uniques, "Value")
+        dictionary = self._dictionaries[position]
+        # The extra trailing slot keeps the -1 sentinel of missing values
+        lookup = np.array([dictionary.setdefault(value, len(dictionary)) for value in uniques] + [-1], dtype=np.int64)
+        self._present[position] += int((codes >= 0).sum())
+        return lookup[codes]
+
+    def append(self, chunk: pd.DataFrame) -> None:
+        """
+        Write the next rows of the dataset
+
+        Args:
+            chunk: Rows following those already written
+        """
+        if self.error is not None:
+            return
+        try:
+            if self._names is None:
+                self._start(chunk)
+            stop = self.position + len(chunk)
+            if stop > self.rows:
+                raise ValueError(f"More than the expected {self.rows} rows")
+            for position, array in enumerate(self._arrays):
+                series = chunk.iloc[:, position]
+                if self._dictionaries[position] is None:
+                    array[self.position:stop] = series.to_numpy()
+                else:
+                    array[self.position:stop] = self._encode(position, series)
+            self.position = stop
+        except Exception as e:
+            self.error = str(e)
+
+    def dictionary_sizes(self) -> Dict[Any, Tuple[int, int]]:
+        """Get (distinct values, non-missing values) of every dictionary-encoded column"""
+        return {
+            name: (len(dictionary), present)
+            for name, dictionary, present in zip(self._names or [], self._dictionaries, self._present)
+            if dictionary is not None
+        }
+
+    def _finish_codes(self, position: int, remap: Optional[np.ndarray], code_dtype: np.dtype) -> None:
+        """Rewrite a column's codes, renumbered by remap, in the narrowest code type"""
+        source = self._arrays[position]
+        if remap is None and source.dtype == code_dtype:
+            source.flush()
+            return
+
+        path = os.path.join(self.tmp_path, f"col_{position:05d}.npy")
+        narrow_path = f"{path}.narrow"
+        target = np.lib.format.open_memmap(narrow_path, mode="w+", dtype=code_dtype, shape=(self.rows,))
+        lookup = None if remap is None else np.append(remap, -1)
+        for start in range(0, self.rows, CODE_REWRITE_ROWS):
+            codes = np.asarray(source[start:start + CODE_REWRITE_ROWS])
+            target[start:start + CODE_REWRITE_ROWS] = codes if lookup is None else lookup[codes]
+        target.flush()
+        del target
+        self._arrays[position] = None
+        del source
+        os.replace(narrow_path, path)
+
+    def close(
+        self,
+        categorical: Optional[List[Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[bool, str, Optional[str]]:
+        """
+        Finish the store and move it into place
+
+        Args:
+            categorical: Object columns to store as categoricals, with
+                their values sorted as pandas sorts categories
+            metadata: Optional JSON-serializable facts about the dataset,
+                kept in the manifest under "metadata"
+
+        Returns:
+            Tuple of (success, message, store_path)
+        """
+        if self.error is None and self.position != self.rows:
+            self.error = f"Expected {self.rows} rows, got {self.position}"
+        if self.error is not None:
+            self.abort()
+            return False, f"Error writing columnar store: {self.error}", None
+
+        try:
+            wanted = set(categorical or [])
+            columns = []
+            for position, name in enumerate(self._names):
+                stem = f"col_{position:05d}"
+                entry: Dict[str, Any] = {"name": name, "dtype": str(self._dtypes[position]), "file": f"{stem}.npy"}
+                dictionary = self._dictionaries[position]
+                if dictionary is None:
+                    entry["kind"] = "values"
+                    self._arrays[position].flush()
+                    columns.append(entry)
+                    continue
+
+                values = list(dictionary)
+                remap = None
+                if name in wanted:
+                    try:
+                        categories = sorted(values)
+                    except TypeError:
+                        categories = values
+                    order = {value: code for code, value in enumerate(categories)}
+                    remap = np.array([order[value] for value in values], dtype=np.int64)
+                    entry.update({"dtype": "category", "kind": "category", "ordered": False})
+                else:
+                    categories = values
+                    entry["kind"] = "object"
+
+                entry["dictionary"] = f"{stem}.dict.json"
+                with open(os.path.join(self.tmp_path, entry["dictionary"]), "w", encoding="utf-8") as f:
+                    json.dump(categories, f)
+                self._finish_codes(position, remap, _smallest_code_dtype(len(categories)))
+                columns.append(entry)
+
+            self._arrays = []
+            _publish_store(self.tmp_path, self.store_path, self.rows, columns, metadata)
+            return True, "Columnar store written successfully", self.store_path
+
+        except Exception as e:
+            self.abort()
+            return False, f"Error writing columnar store: {str(e)}", None
+
+    def abort(self) -> None:
+        """Drop the partially written store"""
+        self._arrays = []
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+
+def read_columnar_store(file_path: str, columns: Optional[List[str]] = None) -> Tuple[bool, str, Optional[pd.DataFrame]]:
+    """
+    Load a dataset from its columnar store
+
+    Args:
+        file_path: Path to the original uploaded file
+        columns: Optional subset of columns to load (default: all)
+
+    Returns:
+        Tuple of (success, message, dataframe)
+    """
+    try:
+        manifest = read_store_manifest(file_path)
+        if manifest is None:
+            return False, "Columnar store not found", None
+
+        entries = _select_entries(manifest, columns)
+        store_dir = get_store_path(file_path)
+        with span("columnar_read"):
+            arrays = {position: _decode_column(entry, store_dir) for position, entry in enumerate(entries)}
+            df = pd.DataFrame(arrays, index=pd.RangeIndex(manifest["rows"]))
+            df.columns = [entry["name"] for entry in entries]
+
+        return True, "Columnar store read successfully", df
+
+    except Exception as e:
+        return False, f"Error reading columnar store: {str(e)}", None
+
+
+def iter_columnar_store(file_path: str, chunk_rows: int, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Read a dataset from its columnar store in row slices
+
+    Only the rows of the current slice are decoded, so memory use is
+    bounded by chunk_rows rather than the dataset size.
+
+    Args:
+        file_path: Path to the original uploaded file
+        chunk_rows: Number of rows per yielded DataFrame
+        columns: Optional subset of columns to load (default: all)
+
+    Yields:
+        DataFrames of at most chunk_rows rows, indexed by row position
+
+    Raises:
+        FileNotFoundError: If there is no usable store for the file
+    """
+    manifest = read_store_manifest(file_path)
+    if manifest is None:
+        raise FileNotFoundError("Columnar store not found")
+
+    entries = _select_entries(manifest, columns)
+    store_dir = get_store_path(file_path)
+    arrays = [_load_column_array(entry, store_dir) for entry in entries]
+    decoders = [_column_decoder(entry, store_dir) for entry in entries]
+    names = [entry["name"] for entry in entries]
+    chunk_rows = max(1, chunk_rows)
+
+    for start in range(0, manifest["rows"], chunk_rows):
+        stop = min(start + chunk_rows, manifest["rows"])
+        data = {position: decode(array[start:stop]) for position, (decode, array) in enumerate(zip(decoders, arrays))}
+        chunk = pd.DataFrame(data, index=pd.RangeIndex(start, stop))
+        chunk.columns = names
+        yield chunk
+
+
+def read_columnar_rows(file_path: str, start: int, stop: int) -> pd.DataFrame:
+    """
+    Read a range of rows from a dataset's columnar store
+
+    Only the requested rows are decoded from the memory-mapped columns.
+
+    Args:
+        file_path: Path to the original uploaded file
+        start: First row position to read
+        stop: Row position to stop before; clipped to the dataset's length
+
+    Returns:
+        DataFrame of the rows, indexed by row position
+
+    Raises:
+        FileNotFoundError: If there is no usable store for the file
+    """
+    manifest = read_store_manifest(file_path)
+    if manifest is None:
+        raise FileNotFoundError("Columnar store not found")
+
+    store_dir = get_store_path(file_path)
+    start = min(max(0, start), manifest["rows"])
+    stop = min(max(start, stop), manifest["rows"])
+    data = {
+        position: _column_decoder(entry, store_dir)(_load_column_array(entry, store_dir)[start:stop])
+        for position, entry in enumerate(manifest["columns"])
+    }
+    rows = pd.DataFrame(data, index=pd.RangeIndex(start, stop))
+    rows.columns = [entry["name"] for entry in manifest["columns"]]
+    return rows
+
+
+def remove_columnar_store(file_path: str) -> bool:
+    """
+    Remove the columnar store belonging to a dataset file
+
+    Args:
+        file_path: Path to the original uploaded file
+
+    Returns:
+        True if a store was removed, False otherwise
+    """
+    store_path = get_store_path(file_path)
+    _forget_manifest(store_path)
+    if not os.path.isdir(store_path):
+        return False
+    shutil.rmtree(store_path, ignore_errors=True)
+    return True
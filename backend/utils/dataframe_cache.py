@@ -0,0 +1,171 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple, Optional, Dict, Any
+import pandas as pd
+from utils.file_utils import load_dataset_frame, get_file_info
+
+# Memory budget for cached DataFrames, in bytes (default: 512 MB)
+DATAFRAME_CACHE_MAX_BYTES = int(os.getenv("DATAFRAME_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+class DataFrameCache:
+    """
+    In-process LRU cache of parsed datasets bounded by total memory
+
+    Entries are keyed by dataset file path and tagged with the file
+    version (mtime and size), so a changed file is treated as a miss.
+    Uploads are stored by content hash, so datasets with identical
+    content share one entry. Cached frames are shared between callers
+    and must not be modified in place.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Tuple[float, int], pd.DataFrame, int]]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file_path: str, version: Tuple[float, int]) -> Optional[pd.DataFrame]:
+        """
+        Look up a cached DataFrame
+
+        Args:
+            file_path: Path of the dataset file
+            version: (mtime, size) of the dataset file
+
+        Returns:
+            Cached DataFrame, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    self._remove(file_path)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(file_path)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, file_path: str, version: Tuple[float, int]) -> Optional[pd.DataFrame]:
+        """
+        Look up a cached DataFrame without counting a hit or miss
+
+        Unlike get, this does not refresh the entry's LRU position, so
+        callers that can do without the whole frame do not keep it alive.
+
+        Args:
+            file_path: Path of the dataset file
+            version: (mtime, size) of the dataset file
+
+        Returns:
+            Cached DataFrame, or None if absent or stale
+        """
+        with self._lock:
+            entry = self._entries.get(file_path)
+            if entry is None or entry[0] != version:
+                return None
+            return entry[1]
+
+    def put(self, file_path: str, version: Tuple[float, int], df: pd.DataFrame) -> bool:
+        """
+        Add a DataFrame to the cache, evicting least recently used entries
+
+        Args:
+            file_path: Path of the dataset file
+            version: (mtime, size) of the dataset file
+            df: DataFrame to cache
+
+        Returns:
+            True if cached, False if the frame alone exceeds the budget
+        """
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if file_path in self._entries:
+                self._remove(file_path)
+
+            while self._entries and self._current_bytes + size > self.max_bytes:
+                oldest_path = next(iter(self._entries))
+                self._remove(oldest_path)
+                self.evictions += 1
+
+            self._entries[file_path] = (version, df, size)
+            self._current_bytes += size
+            return True
+
+    def invalidate(self, file_path: str) -> bool:
+        """
+        Drop a dataset from the cache
+
+        Args:
+            file_path: Path of the dataset file
+
+        Returns:
+            True if an entry was removed, False otherwise
+        """
+        with self._lock:
+            if file_path not in self._entries:
+                return False
+            self._remove(file_path)
+            return True
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters and current memory usage"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, file_path: str) -> None:
+        """Remove an entry; the caller must hold the lock"""
+        _, _, size = self._entries.pop(file_path)
+        self._current_bytes -= size
+
+
+# Shared cache instance for the application
+dataframe_cache = DataFrameCache(DATAFRAME_CACHE_MAX_BYTES)
+
+
+def get_cached_dataset_frame(file_path: str) -> Tuple[bool, str, Optional[pd.DataFrame]]:
+    """
+    Load a dataset through the shared DataFrame cache
+
+    Args:
+        file_path: Path to the original uploaded file
+
+    Returns:
+        Tuple of (success, message, dataframe)
+    """
+    file_info = get_file_info(file_path)
+    if not file_info["exists"]:
+        dataframe_cache.invalidate(file_path)
+        return False, "Dataset file not found on disk", None
+
+    version = (file_info["modified"], file_info["size"])
+    df = dataframe_cache.get(file_path, version)
+    if df is not None:
+        return True, "Dataset loaded from cache", df
+
+    success, message, df = load_dataset_frame(file_path)
+    if success and df is not None:
+        dataframe_cache.put(file_path, version, df)
+    return success, message, df
@@ -0,0 +1,536 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Tuple, Dict, Any, Optional, List
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:
+    # Only public from pandas 2.2 on
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+# Text columns become categorical when at most this share of their values is distinct
+CATEGORY_MAX_UNIQUE_RATIO = float(os.getenv("CATEGORY_MAX_UNIQUE_RATIO", "0.5"))
+
+# Values tried before a text column is parsed as numbers in full
+NUMERIC_SNIFF_SIZE = 100
+
+# Numbers with a leading zero are identifiers (zip codes, account numbers), not quantities
+_LEADING_ZERO_PATTERN = r"^[+-]?0\d"
+
+# A date format must name a year and a month, so times of day and codes like "1-2" stay text
+_DATE_DIRECTIVES = (("%Y", "%y"), ("%m", "%b", "%B"))
+
+# Time zone directives; such columns stay text, since naive UTC would lose their offsets
+_ZONE_DIRECTIVES = ("%z", "%Z")
+
+# Date formats numpy can write directly, with the separator replacing its "T"
+_NUMPY_DATE_FORMATS = {
+    "%Y-%m-%d": ("D", "T"),
+    "%Y-%m-%dT%H:%M:%S": ("s", "T"),
+    "%Y-%m-%d %H:%M:%S": ("s", " "),
+}
+
+
+def _is_text(series: pd.Series) -> bool:
+    """Check whether every non-null value of an object column is a string"""
+    return series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == "string"
+
+
+def _parse_numeric_text(series: pd.Series) -> Optional[pd.Series]:
+    """
+    Parse a text column whose values are all numbers
+
+    Blank and whitespace-only values become missing. The column is left
+    alone if any other value fails to parse or has a leading zero.
+
+    Returns:
+        Parsed numeric series, or None if the column is not numeric text
+    """
+    # A cheap look at the first values rejects ordinary text columns early
+    sample = series.dropna().head(NUMERIC_SNIFF_SIZE).str.strip()
+    sample = sample[sample != ""]
+    if sample.empty or pd.to_numeric(sample, errors="coerce").isna().any():
+        return None
+
+    stripped = series.str.strip()
+    present = stripped.notna() & (stripped != "")
+    candidates = stripped[present]
+    if candidates.str.contains(_LEADING_ZERO_PATTERN, regex=True).any():
+        return None
+
+    parsed = _to_numbers(series)
+    if parsed[present].isna().any():
+        return None
+    return parsed
+
+
+def _to_numbers(series: pd.Series) -> pd.Series:
+    """Parse a text column as numbers, with blank and unparseable values missing"""
+    stripped = series.str.strip()
+    present = stripped.notna() & (stripped != "")
+    return pd.to_numeric(stripped.where(present), errors="coerce")
+
+
+def _date_format(value: str, dayfirst: bool) -> Optional[str]:
+    """Guess the strptime format of a date string, if it names a year and a month"""
+    fmt = guess_datetime_format(value, dayfirst=dayfirst)
+    if fmt is None or not all(any(directive in fmt for directive in group) for group in _DATE_DIRECTIVES):
+        return None
+    return fmt
+
+
+def _datetime_formats(series: pd.Series) -> List[str]:
+    """Guess the formats a text column of dates may use from its first values, month-first before day-first"""
+    sample = series.dropna().head(NUMERIC_SNIFF_SIZE)
+    if sample.empty or pd.api.types.infer_dtype(sample, skipna=True) != "string":
+        return []
+    sample = sample.str.strip()
+    sample = sample[sample != ""]
+    if sample.empty:
+        return []
+
+    formats = [_date_format(sample.iloc[0], dayfirst) for dayfirst in (False, True)]
+    formats = [fmt for fmt in dict.fromkeys(formats) if fmt is not None]
+    return [fmt for fmt in formats if pd.to_datetime(sample, format=fmt, errors="coerce", utc=True).notna().all()]
+
+
+def _parse_dates(series: pd.Series, fmt: str) -> Optional[pd.Series]:
+    """Parse a text column with one date format, or return None if a value does not match it"""
+    # Values that are not strings strip to NaN and then fail to parse
+    stripped = series.str.strip()
+    present = series.notna() & (stripped != "")
+    parsed = pd.to_datetime(stripped.where(present), format=fmt, errors="coerce", utc=True)
+    if parsed[present].notna().all():
+        return parsed.dt.tz_convert(None)
+    return None
+
+
+def _parse_datetime_text(series: pd.Series) -> Tuple[Optional[pd.Series], Optional[str]]:
+    """Parse a text column of dates as parse_datetime_text does, also returning the format used"""
+    for fmt in _datetime_formats(series):
+        parsed = _parse_dates(series, fmt)
+        if parsed is not None:
+            return parsed, fmt
+    return None, None
+
+
+def parse_datetime_text(series: pd.Series) -> Optional[pd.Series]:
+    """
+    Parse a text column whose values are all dates or date-times
+
+    The format is guessed from the first value, month-first and then
+    day-first, and every value must match it, so the column is parsed in
+    one vectorized pass instead of value by value. Blank values become
+    missing and time zones are converted to naive UTC.
+
+    Returns:
+        datetime64[ns] series, or None if the column is not date text
+    """
+    return _parse_datetime_text(series)[0]
+
+
+def _format_datetimes(series: pd.Series, fmt: str) -> pd.Series:
+    """Write a datetime64 column as text in the given strftime format, keeping missing values missing"""
+    values = series.to_numpy()
+    if fmt in _NUMPY_DATE_FORMATS:
+        unit, separator = _NUMPY_DATE_FORMATS[fmt]
+        text = np.datetime_as_string(values, unit=unit)
+        if separator != "T":
+            text = np.char.replace(text, "T", separator)
+    else:
+        text = series.dt.strftime(fmt).to_numpy()
+    return pd.Series(np.where(np.isnat(values), None, text).astype(object), index=series.index, dtype=object)
+
+
+def format_datetime_columns(df: pd.DataFrame, formats: Dict[str, str]) -> pd.DataFrame:
+    """
+    Write datetime columns back as text in the format they were parsed from
+
+    Records and exports use this so dates read as they did in the
+    upload, instead of as ISO timestamps with a time of day. Fractions
+    of a second are written with six digits.
+
+    Args:
+        df: DataFrame, typically compacted by compact_dataframe
+        formats: strftime format per column name, as in the
+            datetime_formats of a compaction report
+
+    Returns:
+        The frame itself if no column needs formatting, otherwise a
+        shallow copy with those columns as text
+    """
+    positions = [
+        position for position, col in enumerate(df.columns)
+        if str(col) in formats and pd.api.types.is_datetime64_dtype(df.dtypes.iloc[position])
+    ]
+    if not positions:
+        return df
+
+    df = df.copy(deep=False)
+    for position in positions:
+        df.isetitem(position, _format_datetimes(df.iloc[:, position], formats[str(df.columns[position])]))
+    return df
+
+
+def _downcast_numeric(series: pd.Series) -> pd.Series:
+    """
+    Store a numeric column in the narrowest dtype that keeps every value
+
+    Integers shrink to the smallest signed type holding their range.
+    Floats become float32 only when every value survives the round trip.
+    """
+    dtype = series.dtype
+    if not isinstance(dtype, np.dtype):
+        return series
+    if dtype.kind in "iu":
+        return pd.to_numeric(series, downcast="integer")
+    if dtype == np.float64:
+        with np.errstate(over="ignore"):
+            narrow = series.astype(np.float32)
+            lossless = ((narrow.astype(np.float64) == series) | series.isna()).all()
+        return narrow if lossless else series
+    return series
+
+
+def widen_compacted_floats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Give float32 columns back their float64 dtype before doing math on them
+
+    Compaction stores floats as float32 only where every value survives
+    the round trip, so the widened values equal the uploaded ones. Sums,
+    means and other reductions then accumulate in float64, exactly as on
+    the frame before compaction.
+
+    Args:
+        df: DataFrame, typically compacted by compact_dataframe
+
+    Returns:
+        The frame itself if it has no float32 column, otherwise a shallow
+        copy with those columns as float64
+    """
+    positions = [position for position, dtype in enumerate(df.dtypes) if dtype == np.float32]
+    if not positions:
+        return df
+
+    df = df.copy(deep=False)
+    for position in positions:
+        df.isetitem(position, df.iloc[:, position].astype(np.float64))
+    return df
+
+
+def as_text(series: pd.Series) -> pd.Series:
+    """Convert values to strings, keeping missing values missing"""
+    return series.astype(str).where(series.notna(), np.nan).astype(object)
+
+
+def widen_dtype(current: Any, incoming: Any) -> Any:
+    """
+    Get the dtype a column needs once a chunk of it was parsed differently
+
+    Numeric dtypes are promoted, so an int column that gains missing
+    values becomes float. Any other mismatch widens the column to object,
+    as a whole-file read would. The chunked reader, the streaming
+    profiler and ChunkedCompaction all use this rule, so they agree on
+    every column's type.
+
+    Args:
+        current: Dtype of the column so far
+        incoming: Dtype of the column in the new chunk
+
+    Returns:
+        The dtype able to hold both
+    """
+    if incoming == current:
+        return current
+    if (isinstance(current, np.dtype) and isinstance(incoming, np.dtype)
+            and current.kind in "iuf" and incoming.kind in "iuf"):
+        return np.promote_types(current, incoming)
+    return np.dtype(object)
+
+
+def compact_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Convert a freshly parsed DataFrame to compact dtypes
+
+    Text columns holding only numbers are parsed as numbers, text columns
+    holding only dates without a time zone become datetime64, other text
+    columns with few distinct values become categoricals, and numeric
+    columns are downcast to the smallest width that keeps every value.
+    Dates with a time zone stay text, so their offsets are kept. The
+    input frame is not modified.
+
+    Args:
+        df: Parsed dataset
+
+    Returns:
+        Tuple of (compacted dataframe, report) where report holds
+        original_bytes, compacted_bytes, the new dtype of every
+        converted column and the format each datetime column was parsed
+        from (see format_datetime_columns), keyed by column name
+    """
+    original_bytes = int(df.memory_usage(deep=True).sum())
+    columns = {}
+    converted: Dict[str, str] = {}
+    datetime_formats: Dict[str, str] = {}
+
+    for position, col in enumerate(df.columns):
+        series = df.iloc[:, position]
+        compacted = series
+
+        if _is_text(series):
+            parsed = _parse_numeric_text(series)
+            if parsed is None:
+                parsed, fmt = _parse_datetime_text(series)
+                if fmt is not None and any(directive in fmt for directive in _ZONE_DIRECTIVES):
+                    # Kept as plain text; as a categorical it would no longer be detected as dates
+                    parsed = series
+                elif fmt is not None:
+                    datetime_formats[str(col)] = fmt
+            if parsed is not None:
+                compacted = parsed
+            else:
+                distinct = series.nunique()
+                if distinct <= CATEGORY_MAX_UNIQUE_RATIO * series.count():
+                    compacted = series.astype("category")
+
+        if pd.api.types.is_numeric_dtype(compacted.dtype) and not pd.api.types.is_bool_dtype(compacted.dtype):
+            compacted = _downcast_numeric(compacted)
+
+        if compacted.dtype != series.dtype:
+            converted[str(col)] = str(compacted.dtype)
+        columns[position] = compacted
+
+    result = pd.DataFrame(columns, index=df.index)
+    result.columns = df.columns
+    return result, {
+        "original_bytes": original_bytes,
+        "compacted_bytes": int(result.memory_usage(deep=True).sum()),
+        "converted": converted,
+        "datetime_formats": datetime_formats,
+    }
+
+
+def _smallest_int_dtype(minimum: Any, maximum: Any) -> np.dtype:
+    """Pick the narrowest signed integer type holding a range, as pd.to_numeric(downcast="integer") does"""
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= minimum and maximum <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class _ChunkedColumn:
+    """What compact_dataframe would learn from one whole column, gathered chunk by chunk"""
+
+    def __init__(self, dtype: Any):
+        self.dtype = dtype
+        self.strings = False
+        self.text = True
+        self.present = False
+        self.numeric = True
+        self.numeric_dtype: Any = None
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.float32_lossless = True
+        self.date_formats: Optional[List[str]] = None
+        self.target: Any = dtype
+        self.datetime_format: Optional[str] = None
+        self.parse_numbers = False
+        self.parse_dates = False
+
+    def _observe_numbers(self, values: pd.Series) -> None:
+        """Track the range and float32 round trip of a chunk of numbers"""
+        self.numeric_dtype = values.dtype if self.numeric_dtype is None else widen_dtype(self.numeric_dtype, values.dtype)
+        present = values.dropna()
+        if len(present) > 0:
+            chunk_min, chunk_max = present.min(), present.max()
+            self.minimum = chunk_min if self.minimum is None else min(self.minimum, chunk_min)
+            self.maximum = chunk_max if self.maximum is None else max(self.maximum, chunk_max)
+        with np.errstate(over="ignore"):
+            floats = values.to_numpy(dtype=np.float64)
+            narrow = floats.astype(np.float32).astype(np.float64)
+            self.float32_lossless = self.float32_lossless and bool(((narrow == floats) | np.isnan(floats)).all())
+
+    def observe(self, series: pd.Series) -> None:
+        """Fold one chunk of the column, as parsed, into what is known about it"""
+        self.dtype = widen_dtype(self.dtype, series.dtype)
+        if series.dtype != object:
+            if not series.notna().any():
+                return
+            self.present = True
+            # Numbers and booleans written out as text are never dates
+            self.date_formats = []
+            if series.dtype.kind in "iuf":
+                self._observe_numbers(series)
+            else:
+                self.numeric = False
+            return
+
+        inferred = pd.api.types.infer_dtype(series, skipna=True)
+        if inferred not in ("string", "empty"):
+            self.text = False
+            return
+        self.strings = self.strings or inferred == "string"
+        stripped = series.str.strip()
+        if not (series.notna() & (stripped != "")).any():
+            return
+
+        self.present = True
+        if self.numeric:
+            parsed = _parse_numeric_text(series)
+            if parsed is None:
+                self.numeric = False
+            else:
+                self._observe_numbers(parsed)
+        if self.date_formats is None:
+            self.date_formats = _datetime_formats(series)
+        self.date_formats = [fmt for fmt in self.date_formats if _parse_dates(series, fmt) is not None]
+
+    def finish(self) -> None:
+        """Decide the column's compacted dtype once every chunk was observed"""
+        parsed_dtype = self.dtype
+        if self.dtype == object and self.text and self.present:
+            if self.numeric:
+                self.parse_numbers = True
+                parsed_dtype = self.numeric_dtype
+            elif self.date_formats:
+                self.datetime_format = self.date_formats[0]
+                # Dates with a time zone stay text, and are not made categorical
+                if not any(directive in self.datetime_format for directive in _ZONE_DIRECTIVES):
+                    self.parse_dates = True
+                    parsed_dtype = np.dtype("datetime64[ns]")
+
+        self.target = parsed_dtype
+        if isinstance(parsed_dtype, np.dtype) and parsed_dtype.kind in "iu" and self.minimum is not None:
+            self.target = _smallest_int_dtype(self.minimum, self.maximum)
+        elif parsed_dtype == np.float64 and self.float32_lossless:
+            self.target = np.dtype(np.float32)
+
+    @property
+    def may_be_categorical(self) -> bool:
+        """Whether the column stays text that compact_dataframe would test for few distinct values"""
+        return self.target == object and self.text and self.strings and self.datetime_format is None
+
+    def convert(self, series: pd.Series) -> pd.Series:
+        """Convert one chunk of the column to its compacted dtype"""
+        if self.dtype == object and series.dtype != object:
+            series = as_text(series)
+        if self.parse_numbers:
+            series = _to_numbers(series)
+        elif self.parse_dates:
+            parsed = _parse_dates(series, self.datetime_format)
+            if parsed is None:
+                raise ValueError("File changed while it was being read")
+            return parsed
+        if series.dtype != self.target:
+            series = series.astype(self.target)
+        return series
+
+
+class ChunkedCompaction:
+    """
+    Apply compact_dataframe to a file that is read in chunks
+
+    Column conversions depend on every value of a column, so the chunks
+    are read twice: observe() is fed every chunk as parsed, then apply()
+    converts each chunk of a second read. Columns end up with the dtypes
+    compact_dataframe gives the whole file, except that text columns are
+    never made categorical here, since that takes an exact distinct count;
+    categorical_columns() decides it once the distinct values are known.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.original_bytes = 0
+        self.compacted_bytes = 0
+        self._columns: Dict[Any, _ChunkedColumn] = {}
+        self._finished = False
+
+    def observe(self, chunk: pd.DataFrame) -> None:
+        """Fold one chunk of the first read into the plan"""
+        self.rows += len(chunk)
+        self.original_bytes += int(chunk.memory_usage(deep=True).sum())
+        for col, series in chunk.items():
+            if col not in self._columns:
+                self._columns[col] = _ChunkedColumn(series.dtype)
+            self._columns[col].observe(series)
+
+    def _finish(self) -> None:
+        if not self._finished:
+            for column in self._columns.values():
+                column.finish()
+            self._finished = True
+
+    def apply(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convert one chunk of the second read to the compacted dtypes
+
+        Raises:
+            ValueError: If the chunk does not match what was observed
+        """
+        self._finish()
+        columns = {
+            position: self._columns[col].convert(chunk.iloc[:, position])
+            for position, col in enumerate(chunk.columns)
+        }
+        result = pd.DataFrame(columns, index=chunk.index)
+        result.columns = chunk.columns
+        self.compacted_bytes += int(result.memory_usage(deep=True).sum())
+        return result
+
+    @property
+    def datetime_formats(self) -> Dict[str, str]:
+        """Format each datetime column was parsed from, as in compact_dataframe's report"""
+        self._finish()
+        return {
+            str(col): column.datetime_format for col, column in self._columns.items()
+            if column.parse_dates
+        }
+
+    @property
+    def datetime_columns(self) -> List[Any]:
+        """Columns holding dates, including dates with a time zone that stay text"""
+        self._finish()
+        return [col for col, column in self._columns.items() if column.datetime_format is not None]
+
+    def categorical_columns(self, counts: Dict[Any, Tuple[int, int]]) -> List[Any]:
+        """
+        Pick the text columns compact_dataframe would make categorical
+
+        Args:
+            counts: (distinct values, non-missing values) per text column
+
+        Returns:
+            Names of the columns with few enough distinct values
+        """
+        self._finish()
+        return [
+            col for col, (distinct, present) in counts.items()
+            if col in self._columns and self._columns[col].may_be_categorical
+            and distinct <= CATEGORY_MAX_UNIQUE_RATIO * present
+        ]
+
+    def report(self, categorical: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Describe the conversions in the format of compact_dataframe's report
+
+        compacted_bytes counts categorical columns at their text size.
+
+        Args:
+            categorical: Columns stored as categoricals
+
+        Returns:
+            Report with original_bytes, compacted_bytes, converted and
+            datetime_formats
+        """
+        self._finish()
+        converted = {str(col): str(column.target) for col, column in self._columns.items() if column.target != column.dtype}
+        for col in categorical or []:
+            converted[str(col)] = "category"
+        return {
+            "original_bytes": self.original_bytes,
+            "compacted_bytes": self.compacted_bytes,
+            "converted": converted,
+            "datetime_formats": self.datetime_formats,
+        }
@@ -1,38 +1,161 @@
 import os
+import hashlib
+import threading
 import pandas as pd
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Dict, Any, Iterator, List
 from pathlib import Path
 import uuid
 from fastapi import UploadFile
+from utils.columnar_store import read_columnar_store, read_columnar_rows, write_columnar_store, remove_columnar_store, store_exists
+from utils.dtype_compaction import as_text, compact_dataframe, widen_dtype
+from utils.metrics import span
 
 # Directory for storing uploaded files
 UPLOAD_DIR = "uploads"
 Path(UPLOAD_DIR).mkdir(exist_ok=True)
 
-def save_uploaded_file(file: UploadFile) -> Tuple[bool, str, Optional[str]]:
+# Upload streaming configuration
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(1024 * 1024 * 1024)))
+
+# Default rows per chunk for chunked reads
+READ_CHUNK_ROWS = int(os.getenv("READ_CHUNK_ROWS", "100000"))
+
+class UploadClaims:
+    """
+    Saved uploads that a request is about to hand to an ingestion job
+
+    Uploads are stored by content hash, so a new upload can land on the
+    file of a dataset that is being deleted at the same moment. The upload
+    claims its path while the lock is held, until its job is registered,
+    and files are only removed under the same lock when unclaimed. Claims
+    are per process, like the job registry.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._counts: Dict[str, int] = {}
+
+    def claim(self, file_path: str) -> None:
+        """Mark a file as about to be used"""
+        with self.lock:
+            self._counts[file_path] = self._counts.get(file_path, 0) + 1
+
+    def release(self, file_path: str) -> None:
+        """Drop one claim on a file"""
+        with self.lock:
+            remaining = self._counts.get(file_path, 0) - 1
+            if remaining > 0:
+                self._counts[file_path] = remaining
+            else:
+                self._counts.pop(file_path, None)
+
+    def is_claimed(self, file_path: str) -> bool:
+        """Check whether a file has an outstanding claim"""
+        with self.lock:
+            return file_path in self._counts
+
+
+# Shared claims for the application
+upload_claims = UploadClaims()
+
+def content_file_path(sha256: str, extension: str) -> str:
     """
-    Save uploaded file to disk
+    Get the storage path of an upload from its content hash
+    
+    Args:
+        sha256: Hex SHA-256 of the file content
+        extension: File extension including the dot
+        
+    Returns:
+        Path of the file in UPLOAD_DIR
+    """
+    return os.path.join(UPLOAD_DIR, f"{sha256}{extension.lower()}")
+
+def hash_file(file_path: str) -> str:
+    """
+    Compute the SHA-256 of a file, reading it in fixed-size chunks
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        Hex digest of the content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def save_uploaded_file(file: UploadFile) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """
+    Stream uploaded file to disk in fixed-size chunks
+    
+    The content is hashed while it is copied and the copy is aborted as
+    soon as it grows past MAX_UPLOAD_BYTES. Data goes to a temporary file
+    that is renamed into place only once the upload is complete. Files
+    are named by their SHA-256, so identical content is stored once: when
+    the file already exists the new copy is discarded. The saved path is
+    claimed in upload_claims, so it cannot be removed before the caller
+    hands it to a job and releases the claim. This is blocking I/O; async
+    callers should run it in a worker thread.
     
     Args:
         file: FastAPI UploadFile object
         
     Returns:
-        Tuple of (success, message, file_path)
+        Tuple of (success, message, file_info) where file_info holds
+        file_path, size, sha256 and whether the content was already stored
     """
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        return False, f"File exceeds the maximum upload size of {MAX_UPLOAD_BYTES} bytes", None
+    
+    # The final name depends on the content, so copy to a uniquely named partial file first
+    file_extension = Path(file.filename or "").suffix.lower()
+    partial_path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}{file_extension}.part")
+    
     try:
-        # Generate unique filename to avoid conflicts
-        file_extension = Path(file.filename or "").suffix
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(UPLOAD_DIR, unique_filename)
+        digest = hashlib.sha256()
+        size = 0
+        
+        # Copy chunk by chunk so memory use does not depend on file size
+        with open(partial_path, "wb") as buffer:
+            while True:
+                chunk = file.file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    break
+                digest.update(chunk)
+                buffer.write(chunk)
+        
+        if size > MAX_UPLOAD_BYTES:
+            cleanup_file(partial_path)
+            return False, f"File exceeds the maximum upload size of {MAX_UPLOAD_BYTES} bytes", None
+        
+        sha256 = digest.hexdigest()
+        file_path = content_file_path(sha256, file_extension)
         
-        # Save file to disk
-        with open(file_path, "wb") as buffer:
-            content = file.file.read()
-            buffer.write(content)
+        # Keep an existing copy untouched so its mtime, and every cache keyed on it, stays valid
+        with upload_claims.lock:
+            deduplicated = os.path.exists(file_path)
+            if deduplicated:
+                cleanup_file(partial_path)
+            else:
+                os.replace(partial_path, file_path)
+            upload_claims.claim(file_path)
         
-        return True, "File saved successfully", file_path
+        return True, "File saved successfully", {
+            "file_path": file_path,
+            "size": size,
+            "sha256": sha256,
+            "deduplicated": deduplicated
+        }
     
     except Exception as e:
+        cleanup_file(partial_path)
         return False, f"Error saving file: {str(e)}", None
 
 def read_file_with_pandas(file_path: str) -> Tuple[bool, str, Optional[pd.DataFrame]]:
@@ -48,14 +171,15 @@ def read_file_with_pandas(file_path: str) -> Tuple[bool, str, Optional[pd.DataFr
     try:
         file_extension = Path(file_path).suffix.lower()
         
-        if file_extension == '.csv':
-            df = pd.read_csv(file_path)
-        elif file_extension in ['.xlsx', '.xls']:
-            df = pd.read_excel(file_path)
-        elif file_extension == '.json':
-            df = pd.read_json(file_path)
-        else:
-            return False, f"Unsupported file type: {file_extension}", None
+        with span("parse"):
+            if file_extension == '.csv':
+                df = pd.read_csv(file_path)
+            elif file_extension in ['.xlsx', '.xls']:
+                df = pd.read_excel(file_path)
+            elif file_extension == '.json':
+                df = pd.read_json(file_path)
+            else:
+                return False, f"Unsupported file type: {file_extension}", None
         
         # Basic validation
         if df.empty:
@@ -66,6 +190,142 @@ def read_file_with_pandas(file_path: str) -> Tuple[bool, str, Optional[pd.DataFr
     except Exception as e:
         return False, f"Error reading file: {str(e)}", None
 
+def _reconcile_chunk_dtypes(chunk: pd.DataFrame, dtypes: Dict[Any, Any]) -> pd.DataFrame:
+    """
+    Cast a chunk to the dtypes seen so far, widening them where needed
+    
+    dtypes starts out as the first chunk's dtypes and is updated in place,
+    widened by widen_dtype. Chunks already yielded keep their narrower dtype.
+    
+    Args:
+        chunk: Chunk as parsed
+        dtypes: Column dtypes seen so far
+        
+    Returns:
+        The chunk with every column in its reconciled dtype
+    """
+    if not dtypes:
+        dtypes.update(chunk.dtypes.items())
+        return chunk
+    
+    for col, dtype in chunk.dtypes.items():
+        target = widen_dtype(dtypes.setdefault(col, dtype), dtype)
+        dtypes[col] = target
+        if dtype == target:
+            continue
+        
+        if target == object:
+            chunk[col] = as_text(chunk[col]) if dtype != object else chunk[col]
+        else:
+            chunk[col] = chunk[col].astype(target)
+    return chunk
+
+def read_file_in_chunks(
+    file_path: str,
+    chunksize: int = READ_CHUNK_ROWS,
+    usecols: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a file as a sequence of DataFrames with at most chunksize rows
+    
+    CSV files are parsed incrementally, so memory use depends on the chunk
+    size rather than the file size. Excel and JSON have no incremental
+    parser in pandas; they are read whole and then sliced. Column dtypes
+    follow the first chunk and are widened as later chunks need it.
+    
+    Args:
+        file_path: Path to the file to read
+        chunksize: Maximum rows per chunk
+        usecols: Optional columns to read; others are skipped while parsing
+        
+    Yields:
+        DataFrame chunks in file order
+        
+    Raises:
+        ValueError: If the file type is unsupported or a requested column
+            does not exist
+    """
+    file_extension = Path(file_path).suffix.lower()
+    
+    if file_extension == '.csv':
+        dtypes: Dict[Any, Any] = {}
+        with pd.read_csv(file_path, chunksize=chunksize, usecols=usecols) as reader:
+            for chunk in reader:
+                yield _reconcile_chunk_dtypes(chunk, dtypes)
+        return
+    
+    if file_extension in ['.xlsx', '.xls']:
+        df = pd.read_excel(file_path, usecols=usecols)
+    elif file_extension == '.json':
+        df = pd.read_json(file_path)
+        if usecols is not None:
+            labels = {str(col): col for col in df.columns}
+            missing = [col for col in usecols if col not in labels]
+            if missing:
+                raise ValueError(f"Columns not found: {', '.join(missing)}")
+            df = df[[labels[col] for col in usecols]]
+    else:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+    
+    for start in range(0, len(df), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+def read_file_rows(file_path: str, start: int, stop: int) -> pd.DataFrame:
+    """
+    Read a range of rows from a dataset
+    
+    With a columnar store only the requested rows are decoded. Otherwise
+    the file is read in chunks up to stop, so memory stays bounded but
+    the cost grows with start.
+    
+    Args:
+        file_path: Path to the original uploaded file
+        start: First row position to read
+        stop: Row position to stop before; clipped to the dataset's length
+        
+    Returns:
+        DataFrame of the rows, indexed by row position
+    """
+    if store_exists(file_path):
+        return read_columnar_rows(file_path, start, stop)
+    
+    pieces = []
+    position = 0
+    for chunk in read_file_in_chunks(file_path):
+        if position + len(chunk) > start:
+            pieces.append(chunk.iloc[max(0, start - position):stop - position])
+        position += len(chunk)
+        if position >= stop:
+            break
+    if not pieces:
+        return pd.DataFrame()
+    rows = pd.concat(pieces)
+    rows.index = pd.RangeIndex(start, start + len(rows))
+    return rows
+
+def load_dataset_frame(file_path: str) -> Tuple[bool, str, Optional[pd.DataFrame]]:
+    """
+    Load a dataset, preferring its columnar store over the original file
+
+    Datasets uploaded before the columnar store existed are parsed once,
+    compacted and converted, so later reads skip text parsing as well.
+
+    Args:
+        file_path: Path to the original uploaded file
+
+    Returns:
+        Tuple of (success, message, dataframe)
+    """
+    success, message, df = read_columnar_store(file_path)
+    if success and df is not None:
+        return True, message, df
+
+    success, message, df = read_file_with_pandas(file_path)
+    if success and df is not None:
+        df, compaction = compact_dataframe(df)
+        write_columnar_store(df, file_path, metadata={"compaction": compaction})
+    return success, message, df
+
 def get_file_info(file_path: str) -> dict:
     """
     Get basic information about a file
@@ -103,4 +363,17 @@ def cleanup_file(file_path: str) -> bool:
             return True
         return False
     except Exception:
-        return False
\ No newline at end of file
+        return False
+
+def cleanup_dataset_files(file_path: str) -> bool:
+    """
+    Remove an uploaded file together with its derived columnar store
+
+    Args:
+        file_path: Path to the original uploaded file
+
+    Returns:
+        True if the original file was removed, False otherwise
+    """
+    remove_columnar_store(file_path)
+    return cleanup_file(file_path)
\ No newline at end of file
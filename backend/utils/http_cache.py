@@ -0,0 +1,96 @@
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Mapping
+
+# Seconds a client may reuse a dataset response before revalidating; 0 revalidates every time
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+
+# Bump whenever the body of a dataset response changes for the same dataset, such as how
+# records are serialized, so clients holding the old body don't get a 304 for it
+RESPONSE_FORMAT_VERSION = 1
+
+
+class NotModified(Exception):
+    """Raised to answer a conditional request with 304 Not Modified"""
+
+    def __init__(self, headers: Dict[str, str]):
+        super().__init__("Not Modified")
+        self.headers = headers
+
+
+def dataset_etag(dataset_id: int, content_version: str) -> str:
+    """
+    Build a strong ETag for responses derived from one dataset
+
+    Args:
+        dataset_id: ID of the dataset
+        content_version: Identifies the dataset content and the format of
+            data derived from it, as returned by get_dataset_version
+
+    Returns:
+        Quoted entity tag
+    """
+    return f'"{dataset_id}-{content_version}"'
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC or aware datetime as an HTTP date"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def cache_headers(etag: str, last_modified: datetime) -> Dict[str, str]:
+    """
+    Get the validator and freshness headers of a cacheable response
+
+    Args:
+        etag: Entity tag of the response
+        last_modified: When the underlying data last changed
+
+    Returns:
+        Dictionary of ETag, Last-Modified and Cache-Control headers
+    """
+    return {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": f"private, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate",
+    }
+
+
+def is_not_modified(request_headers: Mapping[str, str], etag: str, last_modified: datetime) -> bool:
+    """
+    Evaluate If-None-Match and If-Modified-Since for a GET request
+
+    If-None-Match is compared weakly, as RFC 9110 requires, and when
+    present If-Modified-Since is ignored.
+
+    Args:
+        request_headers: Headers of the request
+        etag: Current entity tag of the response
+        last_modified: When the underlying data last changed
+
+    Returns:
+        True if the client's copy is current and 304 can be sent
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = (tag.strip() for tag in if_none_match.split(","))
+        return any(tag.removeprefix("W/") == etag for tag in tags)
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole seconds
+    return last_modified.replace(microsecond=0) <= since
@@ -0,0 +1,173 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+# Histogram bucket bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Route template of the request being handled; work outside a request, like ingestion jobs, is "background"
+current_route: contextvars.ContextVar[str] = contextvars.ContextVar("current_route", default="background")
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    """Render label pairs as {a="x",b="y"}, or nothing without labels"""
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter with labels"""
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add amount to the series with the given labels"""
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        """Get the counter in Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """
+    Thread-safe latency histogram with labels
+
+    Counts are kept per bucket and made cumulative only when rendered,
+    so an observation costs one binary search and two additions.
+    """
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        """Record one duration in the series with the given labels"""
+        key = tuple(str(labels[name]) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            # One slot per bucket plus +Inf, then the sum and the count
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 3))
+            series[index] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        """Get the histogram in Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        bucket_names = self.label_names + ("le",)
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets + (float("inf"),), series):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{self.name}_bucket{_format_labels(bucket_names, key + (le,))} {cumulative:g}")
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {series[-2]:.6f}")
+                lines.append(f"{self.name}_count{labels} {series[-1]:g}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together for the /metrics endpoint"""
+
+    def __init__(self):
+        self._metrics: List[object] = []
+
+    def counter(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> Counter:
+        """Create and register a counter"""
+        metric = Counter(name, description, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> Histogram:
+        """Create and register a latency histogram"""
+        metric = Histogram(name, description, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Get every registered metric in Prometheus text format"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry for the application
+metrics_registry = MetricsRegistry()
+
+http_request_duration = metrics_registry.histogram(
+    "dataviz_http_request_duration_seconds", "Time to produce an HTTP response, by route template", ("method", "route")
+)
+http_requests = metrics_registry.counter(
+    "dataviz_http_requests_total", "HTTP requests served, by route template and status code", ("method", "route", "status")
+)
+stage_duration = metrics_registry.histogram(
+    "dataviz_stage_duration_seconds", "Time spent in service-layer stages, by stage and route template", ("stage", "route")
+)
+ingest_stage_duration = metrics_registry.histogram(
+    "dataviz_ingest_stage_duration_seconds", "Time spent in each stage of background ingestion jobs", ("stage",)
+)
+ingest_jobs = metrics_registry.counter(
+    "dataviz_ingest_jobs_total", "Finished background ingestion jobs, by outcome", ("status",)
+)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Time the enclosed block as a service-layer stage
+
+    Spans are labeled with the route in current_route and recorded by
+    the process they run in, so work done in the CPU worker processes
+    is reported through ingestion job timings instead.
+
+    Args:
+        stage: Stage name, used as the metric label
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_duration.observe(time.perf_counter() - start, stage=stage, route=current_route.get())
+
+
+def record_ingest_job(status: str, timings: Dict[str, float]) -> None:
+    """
+    Record the outcome and stage durations of a finished ingestion job
+
+    Args:
+        status: "completed" or "failed"
+        timings: Stage durations in milliseconds, as kept by StageTimer;
+            the "total" entry is not a stage and is skipped
+    """
+    ingest_jobs.inc(status=status)
+    for stage, milliseconds in timings.items():
+        if stage != "total":
+            ingest_stage_duration.observe(milliseconds / 1000, stage=stage)
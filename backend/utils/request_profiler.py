@@ -0,0 +1,278 @@
+import contextvars
+import cProfile
+import hmac
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Admin secret a request must send in PROFILE_HEADER to be profiled; unset disables profiling
+REQUEST_PROFILING_TOKEN = os.getenv("REQUEST_PROFILING_TOKEN", "")
+
+# Directory that receives <profile_id>.prof (pstats format) and <profile_id>.json summaries
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "./profiles")
+
+# Functions listed in a profile summary, by cumulative time
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "30"))
+
+PROFILE_HEADER = "X-Profile-Token"
+
+logger = logging.getLogger(__name__)
+
+_active_profile: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("active_profile", default=None)
+
+
+class _StatsSnapshot:
+    """Raw cProfile stats in the shape pstats.Stats loads from"""
+
+    def __init__(self, stats: Dict[Any, Any]):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class RequestProfile:
+    """
+    Profile of one request and the worker pool tasks it starts
+
+    The request counts as one pending task until its response is sent,
+    and every pool task submitted on its behalf adds another, including
+    tasks chained from those, such as the stages of an ingestion job.
+    The profile is written when the last of them finishes.
+    """
+
+    def __init__(self, label: str):
+        self.profile_id = uuid.uuid4().hex
+        self.label = label
+        self.started = time.perf_counter()
+        self._stats = pstats.Stats()
+        self._tasks = 0
+        self._pending = 1
+        self._finished = False
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def task_started(self) -> None:
+        """Count a pool task submitted on behalf of the request"""
+        with self._lock:
+            self._pending += 1
+            self._tasks += 1
+
+    def task_finished(self, stats: Optional[Dict[Any, Any]]) -> None:
+        """Merge the stats of a finished pool task"""
+        with self._lock:
+            if stats:
+                self._stats.add(_StatsSnapshot(stats))
+            self._pending -= 1
+            done = self._pending == 0
+        if done:
+            self._write()
+
+    def request_finished(self) -> None:
+        """Release the request's own pending slot once its response is sent"""
+        self.task_finished(None)
+
+    def summary(self) -> Dict[str, Any]:
+        """Get the top functions by cumulative time"""
+        with self._lock:
+            rows = sorted(self._stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return {
+            "profile_id": self.profile_id,
+            "label": self.label,
+            "status": "complete" if self._finished else "running",
+            "wall_time_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "pool_tasks": self._tasks,
+            "top_functions": [_function_row(key, value) for key, value in rows[:PROFILE_TOP_FUNCTIONS]],
+        }
+
+    def _write(self) -> None:
+        """Write the merged stats and the summary to PROFILE_OUTPUT_DIR"""
+        self._finished = True
+        _running.pop(self.profile_id, None)
+        try:
+            os.makedirs(PROFILE_OUTPUT_DIR, exist_ok=True)
+            self._stats.dump_stats(os.path.join(PROFILE_OUTPUT_DIR, f"{self.profile_id}.prof"))
+            with open(os.path.join(PROFILE_OUTPUT_DIR, f"{self.profile_id}.json"), "w") as f:
+                json.dump(self.summary(), f, indent=2)
+        except OSError as e:
+            logger.warning("Error writing profile %s: %s", self.profile_id, e)
+
+
+# Profiles whose request or pool tasks are still running
+_running: Dict[str, RequestProfile] = {}
+
+
+def _function_row(key: Tuple[str, int, str], value: Tuple[Any, ...]) -> Dict[str, Any]:
+    """Format one pstats entry for a summary"""
+    filename, line, name = key
+    primitive_calls, calls, total_time, cumulative_time = value[:4]
+    return {
+        "function": name if filename == "~" else f"{filename}:{line}({name})",
+        "calls": calls,
+        "primitive_calls": primitive_calls,
+        "total_time_ms": round(total_time * 1000, 3),
+        "cumulative_time_ms": round(cumulative_time * 1000, 3),
+    }
+
+
+def profiling_authorized(token: Optional[str]) -> bool:
+    """
+    Check a request's profiling token against REQUEST_PROFILING_TOKEN
+
+    Args:
+        token: Value of the request's PROFILE_HEADER, if any
+
+    Returns:
+        True if profiling is enabled and the token matches
+    """
+    if not REQUEST_PROFILING_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), REQUEST_PROFILING_TOKEN.encode())
+
+
+def start_request_profile(label: str) -> Tuple[RequestProfile, contextvars.Token]:
+    """
+    Start profiling the current request
+
+    Args:
+        label: Description of the request, such as "POST /api/data/upload"
+
+    Returns:
+        The new profile and the context token to pass to end_request_profile
+    """
+    profile = RequestProfile(label)
+    _running[profile.profile_id] = profile
+    return profile, _active_profile.set(profile)
+
+
+def end_request_profile(profile: RequestProfile, token: contextvars.Token) -> None:
+    """Stop attaching new work to a profile once the response is sent"""
+    _active_profile.reset(token)
+    profile.request_finished()
+
+
+def get_profile_summary(profile_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the summary of a running or written profile
+
+    Args:
+        profile_id: ID returned in the X-Profile-Id response header
+
+    Returns:
+        Summary dictionary, or None if no such profile exists
+    """
+    profile = _running.get(profile_id)
+    if profile is not None:
+        return profile.summary()
+
+    # IDs are hex UUIDs; anything else can't name a file we wrote
+    if len(profile_id) != 32 or any(c not in "0123456789abcdef" for c in profile_id):
+        return None
+    try:
+        with open(os.path.join(PROFILE_OUTPUT_DIR, f"{profile_id}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def run_profiled(fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[Any, Optional[BaseException], Dict[Any, Any]]:
+    """
+    Run a callable under cProfile; module-level so process pools can pickle it
+
+    From Python 3.12 a profiler observes every thread of its process and
+    only one can be enabled at a time. A thread task that starts while
+    another is profiled runs unprofiled instead, and its work shows up
+    in the stats of the task that holds the profiler, as does anything
+    else the process's threads run meanwhile.
+
+    Returns:
+        Tuple of the result, the exception raised (or None) and the raw
+        stats, empty if the callable ran unprofiled
+    """
+    profiler: Optional[cProfile.Profile] = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Another profiler is already enabled in this process
+        profiler = None
+    try:
+        result, error = fn(*args, **kwargs), None
+    except Exception as e:
+        result, error = None, e
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    if profiler is None:
+        return result, error, {}
+    profiler.create_stats()
+    return result, error, profiler.stats
+
+
+def submit_profiled(
+    submit: Callable[..., Future],
+    fn: Callable[..., Any],
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any]
+) -> Optional[Future]:
+    """
+    Submit a pool task under the current request's profiler, if there is one
+
+    The returned future resolves to fn's own result. Thread pools run
+    tasks in a copy of the request's context and future callbacks run
+    with the profile active, so work chained onto a pool, like the
+    stages of an ingestion job, is profiled as well.
+
+    Args:
+        submit: The pool's raw submit function
+        fn: Callable to run
+        args: Positional arguments for fn
+        kwargs: Keyword arguments for fn
+
+    Returns:
+        Future with fn's result, or None if no profile is active
+    """
+    profile = _active_profile.get()
+    if profile is None or profile.finished:
+        return None
+
+    profile.task_started()
+    try:
+        inner = submit(run_profiled, fn, args, kwargs)
+    except Exception:
+        profile.task_finished(None)
+        raise
+    outer: Future = Future()
+
+    def _resolve(done: Future) -> None:
+        stats = None
+        token = _active_profile.set(profile)
+        try:
+            if done.cancelled():
+                outer.cancel()
+                return
+            if done.exception() is not None:
+                result, error = None, done.exception()
+            else:
+                result, error, stats = done.result()
+            # The awaiting request may have been cancelled while the task ran
+            if outer.cancelled():
+                return
+            if error is not None:
+                outer.set_exception(error)
+            else:
+                outer.set_result(result)
+        finally:
+            _active_profile.reset(token)
+            profile.task_finished(stats)
+
+    inner.add_done_callback(_resolve)
+    return outer
@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple, Optional, Dict, Any, Hashable
+
+# Size budget for cached query results, in bytes of their JSON encoding (default: 64 MB)
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def estimate_result_bytes(result: Any) -> int:
+    """
+    Estimate the size of a query result from its JSON encoding
+
+    Results are JSON responses, so the encoding is what they cost to send;
+    the Python objects behind them take a few times more memory.
+    """
+    return len(json.dumps(result, default=str))
+
+
+class ResultCache:
+    """
+    In-process LRU cache of computed query results bounded by total size
+
+    Entries are keyed by dataset file path and a hashable query key, and
+    tagged with the file version (mtime and size) so a changed file is
+    treated as a miss. Uploads are stored by content hash, so datasets
+    with identical content share their entries. Cached results are shared
+    between callers and must not be modified in place.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Tuple[float, int], Any, int]]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, file_path: str, key: Hashable, version: Tuple[float, int]) -> Optional[Any]:
+        """
+        Look up a cached result
+
+        Args:
+            file_path: Path of the dataset file
+            key: Hashable description of the query
+            version: (mtime, size) of the dataset file
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get((file_path, key))
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    self._remove((file_path, key))
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end((file_path, key))
+            self.hits += 1
+            return entry[1]
+
+    def put(self, file_path: str, key: Hashable, version: Tuple[float, int], result: Any) -> bool:
+        """
+        Add a result to the cache, evicting least recently used entries
+
+        Args:
+            file_path: Path of the dataset file
+            key: Hashable description of the query
+            version: (mtime, size) of the dataset file
+            result: JSON-serializable result to cache
+
+        Returns:
+            True if cached, False if the result alone exceeds the budget
+        """
+        size = estimate_result_bytes(result)
+        if size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if (file_path, key) in self._entries:
+                self._remove((file_path, key))
+
+            while self._entries and self._current_bytes + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+            self._entries[(file_path, key)] = (version, result, size)
+            self._current_bytes += size
+            return True
+
+    def invalidate_dataset(self, file_path: str) -> int:
+        """
+        Drop every cached result of a dataset
+
+        Args:
+            file_path: Path of the dataset file
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [entry_key for entry_key in self._entries if entry_key[0] == file_path]
+            for entry_key in keys:
+                self._remove(entry_key)
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters and current size"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, entry_key: Tuple[str, Hashable]) -> None:
+        """Remove an entry; the caller must hold the lock"""
+        _, _, size = self._entries.pop(entry_key)
+        self._current_bytes -= size
+
+
+# Shared cache instance for the application
+result_cache = ResultCache(RESULT_CACHE_MAX_BYTES)
@@ -0,0 +1,39 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+
+class StageTimer:
+    """
+    Collect wall-clock durations of named pipeline stages in milliseconds
+
+    When on_stage is given it is called with a stage's name each time
+    the stage is entered, so callers can report progress.
+    """
+
+    def __init__(self, on_stage: Optional[Callable[[str], None]] = None):
+        self.timings: Dict[str, float] = {}
+        self.on_stage = on_stage
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time the enclosed block and record it under the given stage name
+
+        A stage entered more than once accumulates its durations.
+
+        Args:
+            name: Stage name used as the key in timings
+        """
+        if self.on_stage is not None:
+            self.on_stage(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[name] = round(self.timings.get(name, 0.0) + elapsed, 2)
+
+    def total(self) -> float:
+        """Get the summed duration of all recorded stages"""
+        return round(sum(self.timings.values()), 2)
@@ -0,0 +1,205 @@
+import asyncio
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from multiprocessing.managers import SyncManager
+from typing import Callable, Dict, Any, MutableMapping, Optional
+from utils.request_profiler import submit_profiled
+
+# Worker counts; CPU_WORKERS=0 runs CPU-bound work on threads instead of processes
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+IO_WORKERS = int(os.getenv("IO_WORKERS", "16"))
+
+# Tasks allowed to wait for a free worker before new submissions are rejected
+CPU_QUEUE_LIMIT = int(os.getenv("CPU_QUEUE_LIMIT", "32"))
+IO_QUEUE_LIMIT = int(os.getenv("IO_QUEUE_LIMIT", "256"))
+
+
+class PoolSaturatedError(Exception):
+    """Raised when a worker pool's queue is full"""
+
+
+class WorkerPool:
+    """
+    Bounded wrapper around a concurrent.futures executor
+
+    Submissions beyond max_workers + queue_limit outstanding tasks are
+    rejected instead of queueing without limit, unless the submission
+    continues work that was already accepted. Thread pool tasks run in
+    a copy of the submitter's context. The executor is created on first
+    use, and a process pool whose workers died is rebuilt.
+    """
+
+    def __init__(self, name: str, kind: str, max_workers: int, queue_limit: int):
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.queue_limit = max(0, queue_limit)
+        self._executor: Optional[Executor] = None
+        self._manager: Optional[SyncManager] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use; the caller must hold the lock"""
+        if self._executor is None:
+            if self.kind == "process":
+                # Spawned workers do not inherit locks or open connections from this process
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"{self.name}-worker"
+                )
+        return self._executor
+
+    def submit(self, fn: Callable[..., Any], *args: Any, bypass_limit: bool = False, **kwargs: Any) -> Future:
+        """
+        Submit a callable to the pool
+
+        During a profiled request the callable runs under cProfile and
+        its stats are merged into the request's profile.
+
+        Args:
+            fn: Callable to run; must be picklable for process pools
+            *args: Positional arguments for fn
+            bypass_limit: Skip the queue limit; for follow-on stages of
+                work that was already accepted, which must not be dropped
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Future with the callable's result
+
+        Raises:
+            PoolSaturatedError: If the pool's queue is full
+        """
+        submit = partial(self._submit, bypass_limit=bypass_limit)
+        profiled = submit_profiled(submit, fn, args, kwargs)
+        return profiled if profiled is not None else submit(fn, *args, **kwargs)
+
+    def _submit(self, fn: Callable[..., Any], *args: Any, bypass_limit: bool = False, **kwargs: Any) -> Future:
+        """Submit a callable to the executor, enforcing the queue limit unless bypassed"""
+        with self._lock:
+            if not bypass_limit and self._in_flight >= self.max_workers + self.queue_limit:
+                self.rejected += 1
+                raise PoolSaturatedError(f"The {self.name} worker pool is at capacity, please retry shortly")
+
+            if self.kind != "process":
+                # Context variables, like the request's route and profile, follow the task; processes can't receive them
+                fn, args = contextvars.copy_context().run, (fn, *args)
+
+            try:
+                future = self._get_executor().submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                self._executor = None
+                future = self._get_executor().submit(fn, *args, **kwargs)
+
+            self._in_flight += 1
+            self.submitted += 1
+
+        future.add_done_callback(self._task_done)
+        return future
+
+    def shared_dict(self) -> MutableMapping[Any, Any]:
+        """
+        Create a dictionary that the pool's tasks can write to
+
+        Thread pools share memory, so a plain dict is returned. For
+        process pools the dict lives in a manager process, started on
+        first use, and tasks receive a picklable proxy to it.
+
+        Returns:
+            Dictionary, or a proxy to one, that can be passed to tasks
+        """
+        if self.kind != "process":
+            return {}
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+            return self._manager.dict()
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a callable in the pool and await its result
+
+        Args:
+            fn: Callable to run; must be picklable for process pools
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            The callable's return value
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool size, queue depth, utilization and task counters"""
+        with self._lock:
+            active = min(self._in_flight, self.max_workers)
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "queue_limit": self.queue_limit,
+                "active": active,
+                "queued": self._in_flight - active,
+                "utilization": round(active / self.max_workers, 3),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut the executor and any manager down; they are recreated on next use"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+        if manager is not None:
+            manager.shutdown()
+
+    def _task_done(self, future: Future) -> None:
+        """Update counters when a task finishes"""
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+
+
+# Shared pools for the application
+cpu_pool = WorkerPool("cpu", "process" if CPU_WORKERS > 0 else "thread", CPU_WORKERS or IO_WORKERS, CPU_QUEUE_LIMIT)
+io_pool = WorkerPool("io", "thread", IO_WORKERS, IO_QUEUE_LIMIT)
+
+
+async def run_cpu(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run CPU-bound work such as parsing and profiling on the CPU pool"""
+    return await cpu_pool.run(fn, *args, **kwargs)
+
+
+async def run_io(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run blocking I/O such as database queries and file writes on the I/O pool"""
+    return await io_pool.run(fn, *args, **kwargs)
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Get statistics for every shared pool"""
+    return {"cpu": cpu_pool.stats(), "io": io_pool.stats()}
+
+
+def shutdown_pools() -> None:
+    """Shut down every shared pool"""
+    cpu_pool.shutdown()
+    io_pool.shutdown()